@@ -0,0 +1,89 @@
+"""Допуск запросов: ограничение одновременно обрабатываемых запросов размером пула БД с короткой очередью"""
+import asyncio
+from typing import Optional
+from fastapi.responses import JSONResponse
+import config
+import metrics
+
+# Без обращений к БД или с долгими соединениями (/events ждет событий часами)
+EXEMPT_PATHS = frozenset(("/", "/health", "/metrics", "/openapi.json", "/docs", "/docs/oauth2-redirect",
+                          "/redoc", "/events"))
+
+ADMISSION_REJECTED = metrics.Counter("admission_rejected_total", "Запросы, отклоненные при перегрузке",
+                                     labels=("reason",))
+
+
+class AdmissionController:
+    """Не больше concurrency запросов в обработке и queue_size в ожидании; ждать дольше timeout нельзя"""
+
+    def __init__(self, concurrency: int, queue_size: int, timeout: float):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Семафор привязан к event loop (в тестах loop меняется)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+            self.active = self.waiting = 0
+        return self._semaphore
+
+    async def acquire(self) -> Optional[str]:
+        """None - запрос допущен (нужен release), иначе причина отказа"""
+        semaphore = self._get_semaphore()
+        if not semaphore.locked():
+            await semaphore.acquire()
+            self.active += 1
+            return None
+        if self.waiting >= self.queue_size:
+            return "queue_full"
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return None
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+
+controller = AdmissionController(config.ADMISSION_CONCURRENCY, config.ADMISSION_QUEUE_SIZE,
+                                 config.ADMISSION_QUEUE_TIMEOUT)
+
+metrics.Gauge("admission_in_flight", "Допущенные запросы в обработке", callback=lambda: controller.active)
+metrics.Gauge("admission_queue_depth", "Запросы, ожидающие допуска", callback=lambda: controller.waiting)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware: при перегрузке - 503 с Retry-After вместо неограниченной очереди к пулу БД"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await controller.acquire()
+        if rejected:
+            ADMISSION_REJECTED.inc(reason=rejected)
+            response = JSONResponse({"detail": "Сервер перегружен, повторите попытку позже"}, status_code=503,
+                                    headers={"Retry-After": str(config.ADMISSION_RETRY_AFTER)})
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
@@ -1,24 +1,72 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import config
+import hashing
+from cache import TTLCache
 from models import User
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+user_cache = TTLCache("auth_user", maxsize=config.AUTH_USER_CACHE_SIZE, ttl=config.AUTH_USER_CACHE_TTL)
+# Режим AUTH_TRUST_TOKEN_CLAIMS: {id: пользователь существует и активен}
+active_cache = TTLCache("auth_active", maxsize=config.AUTH_USER_CACHE_SIZE, ttl=config.AUTH_ACTIVE_CHECK_TTL)
+token_cache = TTLCache("jwt_payload", maxsize=config.TOKEN_CACHE_SIZE,
+                       ttl=config.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+class Principal:
+    """Пользователь, восстановленный из подписанных claims токена без обращения к БД"""
+
+    def __init__(self, id: int, role: str, is_active: bool):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+
+
+async def _run_in_hash_pool(func, *args):
+    try:
+        return await hashing.get_pool().run(func, *args)
+    except hashing.HashPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, повторите попытку позже",
+            headers={"Retry-After": str(config.PASSWORD_HASH_RETRY_AFTER)},
+        )
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_in_hash_pool(hashing.check_password, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Хеширование пароля"""
-    return pwd_context.hash(password)
+    return await _run_in_hash_pool(hashing.hash_password, password)
+
+
+def access_token_claims(user: User) -> dict:
+    """Claims access токена для пользователя"""
+    return {"sub": str(user.id), "role": user.role, "is_active": user.is_active}
+
+
+def invalidate_user(user_id: int):
+    """Сброс закэшированного пользователя после изменения или удаления"""
+    user_cache.pop(int(user_id))
+    active_cache.pop(int(user_id))
+
+
+async def _user_is_active(user_id: int) -> bool:
+    """Пользователь существует и активен: узкий запрос без загрузки строки, результат кэшируется"""
+    active = active_cache.get(user_id)
+    if active is None:
+        rows = await User.filter(id=user_id).values_list("is_active", flat=True)
+        active = bool(rows and rows[0])
+        active_cache.set(user_id, active)
+    return active
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -45,8 +93,16 @@ def create_refresh_token(data: dict) -> str:
 
 def decode_token(token: str) -> dict:
     """Декодирование JWT токена"""
+    # Ключ - дайджест всего токена: поддельный токен никогда не совпадет с проверенным
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+        if "exp" in payload:
+            token_cache.set(digest, payload, ttl=payload["exp"] - time.time())
         return payload
     except JWTError:
         raise HTTPException(
@@ -56,7 +112,7 @@ def decode_token(token: str) -> dict:
         )
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Union[User, Principal]:
     """Получение текущего пользователя из токена"""
     from crud import get_user
 
@@ -73,9 +129,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     if user_id is None or token_type != "access":
         raise credentials_exception
 
-    user = await get_user(user_id=int(user_id))
+    if config.AUTH_TRUST_TOKEN_CLAIMS and "role" in payload:
+        if not payload.get("is_active", True) or not await _user_is_active(int(user_id)):
+            raise credentials_exception
+        return Principal(id=int(user_id), role=payload["role"], is_active=payload.get("is_active", True))
+
+    user = user_cache.get(int(user_id))
     if user is None:
-        raise credentials_exception
+        user = await get_user(user_id=int(user_id))
+        if user is None:
+            raise credentials_exception
+        user_cache.set(user.id, user)
 
     return user
 
@@ -85,6 +149,21 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+class TaskAccess:
+    """Проверка доступа к задачам с мемоизацией в пределах одного запроса"""
+
+    def __init__(self, current_user: User = Depends(get_current_user)):
+        self.user = current_user
+        self._memo = {}
+
+    async def __call__(self, task_id: int) -> bool:
+        from crud import can_access_task
+
+        if task_id not in self._memo:
+            self._memo[task_id] = await can_access_task(task_id, user_id=self.user.id, user_role=self.user.role)
+        return self._memo[task_id]
+
+
 async def require_admin(current_user: User = Depends(get_current_user)) -> User:  # Типизация
     """Требуется роль администратора"""
     if current_user.role != "admin":
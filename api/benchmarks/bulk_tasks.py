@@ -0,0 +1,63 @@
+"""Бенчмарк массового создания задач: POST /tasks/bulk против цикла POST /tasks/.
+
+Запуск из каталога api:
+    python -m benchmarks.bulk_tasks --tasks 20000 --batch 5000
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+# Бенчмарк сам дает нагрузку с одного адреса: лимиты частоты не должны ее ограничивать
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from auth import create_access_token  # noqa: E402
+from database import close_db  # noqa: E402
+from main import app  # noqa: E402
+import models  # noqa: E402
+from benchmarks.common import setup_db, seed  # noqa: E402
+
+
+async def run(args):
+    await setup_db()
+    try:
+        await seed(users=100, projects=10, tasks=100)
+        project = await models.Project.filter(name__startswith="bench project").first()
+        assignees = await models.User.filter(username__startswith="bench_").limit(2).values_list("id", flat=True)
+        priority = await models.Priority.first()
+        token = create_access_token(data={"sub": str(project.created_by_id)})
+
+        def item(i):
+            return {"title": f"bulk task {i}", "project_id": project.id, "priority_id": priority.id,
+                    "assignee_ids": list(assignees)}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None,
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            started = time.perf_counter()
+            for i in range(args.single):
+                (await client.post("/tasks/", json=item(i))).raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"POST /tasks/ в цикле: {args.single / elapsed:,.0f} задач/с")
+
+            started = time.perf_counter()
+            for start in range(0, args.tasks, args.batch):
+                items = [item(i) for i in range(start, min(start + args.batch, args.tasks))]
+                (await client.post("/tasks/bulk", json={"items": items})).raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"POST /tasks/bulk (пакеты по {args.batch}): {args.tasks / elapsed:,.0f} задач/с")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--single", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Общие утилиты бенчмарков: подключение к БД, синтетические данные"""
+import math
+import random
+from tortoise import Tortoise
+import models
+from hashing import pwd_context
+from database import init_db, get_connection, SQLParams
+
+BENCH_PASSWORD = "password123"
+
+
+async def setup_db():
+    """Подключение к DATABASE_URL; для SQLite схема создается на лету"""
+    await init_db()
+    if get_connection().capabilities.dialect == "sqlite":
+        await Tortoise.generate_schemas(safe=True)
+
+
+async def _ensure_reference_data():
+    if not await models.Priority.all().count():
+        for level, name in enumerate(("Низкий", "Средний", "Высокий", "Критический"), start=1):
+            await models.Priority.create(name=name, level=level)
+    if not await models.Status.all().count():
+        for order_num, name in enumerate(("Новая", "В работе", "На проверке", "Завершена"), start=1):
+            await models.Status.create(name=name, order_num=order_num, is_final=order_num == 4)
+
+
+async def _insert_assignees(rows, batch_size: int):
+    connection = get_connection()
+    for start in range(0, len(rows), batch_size):
+        params = SQLParams(connection.capabilities.dialect)
+        values = ", ".join(f"({params.add(task_id)}, {params.add(user_id)})"
+                           for task_id, user_id in rows[start:start + batch_size])
+        await connection.execute_query(
+            f"INSERT INTO task_assignee (task_id, user_id) VALUES {values}", params.values
+        )
+
+
+async def seed(users: int, projects: int, tasks: int, assignees_per_task: int = 2, comments_per_task: int = 0,
+               batch_size: int = 5000, random_seed: int = 42):
+    """Наполнение БД синтетическими пользователями, проектами, задачами, назначениями и комментариями"""
+    if await models.User.filter(username__startswith="bench_").count() >= users:
+        print("Синтетические данные уже загружены")
+        return
+
+    rng = random.Random(random_seed)
+    await _ensure_reference_data()
+    priority_ids = await models.Priority.all().values_list("id", flat=True)
+    status_ids = await models.Status.all().values_list("id", flat=True)
+
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    await models.User.bulk_create(
+        [models.User(username=f"bench_{i}", email=f"bench_{i}@example.com", password_hash=password_hash)
+         for i in range(users)],
+        batch_size=batch_size,
+    )
+    user_ids = await models.User.filter(username__startswith="bench_").values_list("id", flat=True)
+
+    await models.Project.bulk_create(
+        [models.Project(name=f"bench project {i}", created_by_id=rng.choice(user_ids)) for i in range(projects)],
+        batch_size=batch_size,
+    )
+    project_ids = await models.Project.filter(name__startswith="bench project").values_list("id", flat=True)
+
+    await models.Task.bulk_create(
+        [models.Task(title=f"bench task {i}", project_id=rng.choice(project_ids),
+                     priority_id=rng.choice(priority_ids), status_id=rng.choice(status_ids),
+                     created_by_id=rng.choice(user_ids))
+         for i in range(tasks)],
+        batch_size=batch_size,
+    )
+    task_ids = await models.Task.filter(project_id__in=project_ids).values_list("id", flat=True)
+
+    rows = [(task_id, user_id) for task_id in task_ids
+            for user_id in rng.sample(user_ids, min(assignees_per_task, len(user_ids)))]
+    await _insert_assignees(rows, batch_size)
+
+    comments = [models.Comment(task_id=task_id, user_id=rng.choice(user_ids), content=f"bench comment {i}")
+                for task_id in task_ids for i in range(comments_per_task)]
+    await models.Comment.bulk_create(comments, batch_size=batch_size)
+    print(f"Загружено: {users} пользователей, {projects} проектов, {tasks} задач, {len(rows)} назначений, "
+          f"{len(comments)} комментариев")
+
+
+def percentile(values, pct: float) -> float:
+    """Перцентиль по методу ближайшего ранга"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
@@ -0,0 +1,66 @@
+"""Сравнение двух результатов benchmarks.api_load: задержки, пропускная способность и SQL-запросы.
+
+Завершается с кодом 1, если p95 или число SQL-запросов на запрос выросли больше порога.
+Запуск из каталога api:
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import json
+import sys
+
+# Метрика и направление: +1 - рост означает ухудшение, -1 - падение означает ухудшение
+METRICS = (
+    ("throughput_rps", -1),
+    ("p50_ms", 1),
+    ("p95_ms", 1),
+    ("p99_ms", 1),
+    ("queries_per_request", 1),
+)
+GATED = ("p95_ms", "queries_per_request")
+
+
+def _change(old, new):
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - old) / old * 100
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> bool:
+    print(f"{baseline['commit']} -> {candidate['commit']}{' (есть незакоммиченные изменения)' if candidate['dirty'] else ''}")
+    for key in ("target", "database"):
+        if baseline.get(key) != candidate.get(key):
+            print(f"Внимание: разные {key}: {baseline.get(key)} и {candidate.get(key)}")
+    ok = True
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            print(f"{name}: нет в базовом результате")
+            continue
+        cells = []
+        for metric, direction in METRICS:
+            change = _change(old[metric], new[metric])
+            if change is None:
+                cells.append(f"{metric}=-")
+                continue
+            regressed = metric in GATED and change * direction > threshold
+            ok = ok and not regressed
+            cells.append(f"{metric}={old[metric]}->{new[metric]} ({change:+.1f}%){' РЕГРЕССИЯ' if regressed else ''}")
+        print(f"{name:<14} " + ", ".join(cells))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10, help="Допустимое ухудшение, %%")
+    args = parser.parse_args()
+    with open(args.baseline) as baseline, open(args.candidate) as candidate:
+        ok = compare(json.load(baseline), json.load(candidate), args.threshold)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
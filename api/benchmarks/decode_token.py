@@ -0,0 +1,35 @@
+"""Микробенчмарк auth.decode_token: полная проверка подписи против кэша проверенных токенов.
+
+Запуск из каталога api:
+    python -m benchmarks.decode_token --iterations 100000
+"""
+import argparse
+import time
+from jose import jwt
+import config
+from auth import create_access_token, decode_token, token_cache
+
+
+def _measure(label: str, func, iterations: int):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {iterations / elapsed:,.0f} вызовов/с ({elapsed / iterations * 1e6:.2f} мкс на вызов)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    token = create_access_token(data={"sub": "1", "role": "user", "is_active": True})
+    _measure("jwt.decode (без кэша)",
+             lambda: jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM]), args.iterations)
+
+    token_cache.clear()
+    _measure("decode_token (повторный токен, из кэша)", lambda: decode_token(token), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Нагрузочный бенчмарк входа: пропускная способность /auth/login и задержка /tasks/ под нагрузкой.
+
+Сравнивает хеширование в event loop (PASSWORD_HASH_POOL=off) и в пуле.
+Запуск из каталога api:
+    python -m benchmarks.login_load --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+# Бенчмарк сам дает нагрузку с одного адреса: лимиты частоты не должны ее ограничивать
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import config  # noqa: E402
+import hashing  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import close_db  # noqa: E402
+from main import app  # noqa: E402
+import models  # noqa: E402
+from benchmarks.common import BENCH_PASSWORD, setup_db, seed, percentile  # noqa: E402
+
+
+async def _login_worker(client, usernames, deadline, results):
+    index = 0
+    while time.perf_counter() < deadline:
+        username = usernames[index % len(usernames)]
+        index += 1
+        response = await client.post("/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+        results[response.status_code] = results.get(response.status_code, 0) + 1
+
+
+async def _tasks_probe(client, token, deadline, latencies):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/tasks/", params={"limit": 20}, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+
+
+async def run_mode(mode: str, args, usernames, token):
+    config.PASSWORD_HASH_POOL = mode
+    hashing.shutdown_pool()
+
+    results, latencies = {}, []
+    deadline = time.perf_counter() + args.duration
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(
+            _tasks_probe(client, token, deadline, latencies),
+            *(_login_worker(client, usernames, deadline, results) for _ in range(args.concurrency)),
+        )
+    hashing.shutdown_pool()
+
+    logins = results.get(200, 0)
+    print(f"PASSWORD_HASH_POOL={mode}: входов/с={logins / args.duration:.1f}, ответы={results}")
+    print(f"  GET /tasks/ под нагрузкой: {len(latencies)} запросов, p50={percentile(latencies, 50):.2f} мс, "
+          f"p99={percentile(latencies, 99):.2f} мс")
+
+
+async def run(args):
+    await setup_db()
+    try:
+        await seed(users=args.users, projects=args.users // 10, tasks=args.users * 10)
+        users = await models.User.filter(username__startswith="bench_").limit(args.users).values("id", "username")
+        usernames = [user["username"] for user in users]
+        token = create_access_token(data={"sub": str(users[0]["id"])})
+        for mode in args.modes:
+            await run_mode(mode, args, usernames, token)
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", default=["off", "thread"])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Загрузка синтетических данных для бенчмарков (пропускается, если данные уже есть).
+
+Запуск из каталога api:
+    DATABASE_URL=postgres://... python -m benchmarks.seed --users 1000 --tasks 10000 --comments 3
+"""
+import argparse
+import asyncio
+from database import close_db
+from benchmarks.common import setup_db, seed
+
+
+async def run(args):
+    await setup_db()
+    try:
+        await seed(users=args.users, projects=args.projects, tasks=args.tasks,
+                   assignees_per_task=args.assignees, comments_per_task=args.comments, random_seed=args.seed)
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--assignees", type=int, default=2, help="Исполнителей на задачу")
+    parser.add_argument("--comments", type=int, default=3, help="Комментариев на задачу")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
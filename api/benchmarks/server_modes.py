@@ -0,0 +1,102 @@
+"""Бенчмарк режимов запуска: запросов в секунду на GET /tasks/ в SERVER_MODE=dev и prod.
+
+Сервер запускается через serve.sh (как в контейнере) на этой же машине, нагрузку дает
+benchmarks.api_load со сценарием task_list. Нужна PostgreSQL: воркеры prod - отдельные процессы.
+
+Запуск из каталога api:
+    DATABASE_URL=postgres://... python -m benchmarks.server_modes --workers 4 --concurrency 64
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import httpx
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервер завершился с кодом {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Сервер не ответил за {timeout} с")
+
+
+def stop(process: subprocess.Popen):
+    # SIGTERM, как при остановке контейнера: проверяет заодно graceful shutdown
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        raise RuntimeError("Сервер не остановился за 30 с после SIGTERM")
+
+
+def run_mode(mode: str, args) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, SERVER_MODE=mode, HOST="127.0.0.1", PORT=str(args.port),
+               WEB_CONCURRENCY=str(args.workers))
+    # Свой process group: при аварийной остановке убиваются и воркеры, и процесс --reload
+    process = subprocess.Popen(["bash", "serve.sh"], cwd=API_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+    try:
+        wait_ready(url, process, args.startup_timeout)
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.api_load", "--url", url, "--scenarios", "task_list",
+                 "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+                 "--users", str(args.users), "--projects", str(args.projects), "--tasks", str(args.tasks),
+                 "--output", output.name],
+                cwd=API_DIR, check=True, stdout=subprocess.DEVNULL,
+            )
+            return json.loads(Path(output.name).read_text())["scenarios"]["task_list"]
+    finally:
+        stop(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=("dev", "prod"), default=["dev", "prod"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="WEB_CONCURRENCY для prod")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--verbose", action="store_true", help="Показывать вывод сервера")
+    args = parser.parse_args()
+
+    if os.getenv("DATABASE_URL", "").startswith("sqlite"):
+        parser.error("Нужна PostgreSQL: воркеры prod не разделяют SQLite в памяти")
+
+    # Данные загружаются заранее, чтобы seed не шел параллельно с запущенным сервером
+    subprocess.run([sys.executable, "-m", "benchmarks.seed", "--users", str(args.users),
+                    "--projects", str(args.projects), "--tasks", str(args.tasks)], cwd=API_DIR, check=True)
+
+    results = {}
+    for mode in args.modes:
+        results[mode] = result = run_mode(mode, args)
+        print(f"{mode:<5} {result['throughput_rps']:>9.1f} запр/с, p50={result['p50_ms']:.2f} "
+              f"p95={result['p95_ms']:.2f} p99={result['p99_ms']:.2f} мс, ошибок {result['errors']}")
+    if "dev" in results and "prod" in results:
+        print(f"prod/dev: x{results['prod']['throughput_rps'] / results['dev']['throughput_rps']:.2f} "
+              f"(воркеров {args.workers})")
+
+
+if __name__ == "__main__":
+    main()
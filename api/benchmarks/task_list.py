@@ -0,0 +1,58 @@
+"""Регрессионный бенчмарк GET /tasks/: число SQL-запросов и перцентили задержки.
+
+Запуск из каталога api:
+    DATABASE_URL=postgres://... python -m benchmarks.task_list --users 10000 --tasks 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+import httpx
+from auth import create_access_token
+from database import close_db
+from main import app
+import models
+from query_tracking import track_queries
+from benchmarks.common import setup_db, seed, percentile
+
+
+async def run(args):
+    await setup_db()
+    try:
+        await seed(users=args.users, projects=args.projects, tasks=args.tasks)
+        user_ids = await models.User.filter(username__startswith="bench_").values_list("id", flat=True)
+        rng = random.Random(args.seed)
+        tokens = [create_access_token(data={"sub": str(user_id)}) for user_id in rng.sample(user_ids, 50)]
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            latencies = []
+            with track_queries() as counter:
+                for _ in range(args.requests):
+                    headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+                    started = time.perf_counter()
+                    response = await client.get("/tasks/", params={"limit": args.limit}, headers=headers)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+
+        print(f"GET /tasks/?limit={args.limit}: {args.requests} запросов")
+        print(f"  SQL-запросов на запрос: {counter.count / args.requests:.2f} (включая загрузку пользователя)")
+        print(f"  p50={percentile(latencies, 50):.2f} мс  p95={percentile(latencies, 95):.2f} мс  "
+              f"p99={percentile(latencies, 99):.2f} мс")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
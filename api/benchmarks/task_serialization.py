@@ -0,0 +1,80 @@
+"""Микробенчмарк сериализации списка TaskWithDetails: response_model FastAPI против TrustedSerializer.
+
+Строки задач собираются так же, как их возвращает visibility.fetch_task_page: время из PostgreSQL -
+datetime, из SQLite - строки, булевы поля SQLite - 0/1.
+
+Запуск из каталога api:
+    python -m benchmarks.task_serialization --tasks 1000 --iterations 50
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+import asyncio
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+import schemas
+from serialization import TrustedSerializer
+
+
+def make_rows(count: int, sqlite: bool) -> List[dict]:
+    """Задачи в форме TaskWithDetails: проект, приоритет, статус и два исполнителя"""
+    base = datetime(2026, 1, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+    def stamp(offset: int):
+        value = base + timedelta(minutes=offset)
+        return str(value) if sqlite else value
+
+    project = {"id": 1, "name": "Проект", "description": "Описание проекта", "created_by_id": 1,
+               "created_at": stamp(0), "updated_at": stamp(1)}
+    priority = {"id": 2, "name": "Средний", "level": 2, "color": "#6B7280"}
+    status = {"id": 1, "name": "Новая", "order_num": 1, "is_final": False}
+    users = [{"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com",
+              "full_name": f"Пользователь {user_id}", "role": "user", "is_active": 1 if sqlite else True,
+              "created_at": stamp(user_id)} for user_id in (1, 2)]
+    return [{
+        "id": task_id, "title": f"Задача {task_id}", "description": "Текст задачи " * 5,
+        "project_id": 1, "priority_id": 2, "status_id": 1, "created_by_id": 1,
+        "due_date": stamp(task_id) if task_id % 2 else None,
+        "created_at": stamp(task_id), "updated_at": stamp(task_id + 1),
+        "priority": priority, "status": status, "project": project, "assignees": users,
+    } for task_id in range(1, count + 1)]
+
+
+def _measure(label: str, func, iterations: int, count: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - started) / iterations
+    print(f"  {label}: {elapsed * 1000:.2f} мс на {count} задач ({count / elapsed:,.0f} задач/с)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    annotation = List[schemas.TaskWithDetails]
+    field = create_model_field("Response_read_tasks", annotation, mode="serialization")
+    trusted = TrustedSerializer(annotation)
+    loop = asyncio.new_event_loop()
+
+    def response_model(rows):
+        # То же, что делает FastAPI для response_model: валидация и dump_json
+        return loop.run_until_complete(serialize_response(field=field, response_content=rows, dump_json=True))
+
+    for label, sqlite in (("PostgreSQL", False), ("SQLite", True)):
+        rows = make_rows(args.tasks, sqlite)
+        assert trusted.dumps(rows) == response_model(rows), "Результаты сериализации различаются"
+        print(f"{label}:")
+        slow = _measure("response_model", lambda: response_model(rows), args.iterations, args.tasks)
+        fast = _measure("TrustedSerializer", lambda: trusted.dumps(rows), args.iterations, args.tasks)
+        print(f"  ускорение: x{slow / fast:.1f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Бенчмарк записи задач: SQL-запросов и время на создание, обновление и удаление.
+
+Запуск из каталога api (по умолчанию на SQLite в памяти):
+    python -m benchmarks.task_writes --iterations 200
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+# Бенчмарк сам дает нагрузку с одного адреса: лимиты частоты не должны ее ограничивать
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from auth import create_access_token  # noqa: E402
+from database import close_db  # noqa: E402
+from main import app  # noqa: E402
+import models  # noqa: E402
+import refdata  # noqa: E402
+from query_tracking import track_queries  # noqa: E402
+from benchmarks.common import setup_db, percentile  # noqa: E402
+
+
+async def run(args):
+    await setup_db()
+    try:
+        owner = await models.User.create(username="tw_owner", email="tw_owner@example.com", password_hash="-")
+        assignees = [await models.User.create(username=f"tw_user{i}", email=f"tw_user{i}@example.com",
+                                              password_hash="-") for i in range(2)]
+        project = await models.Project.create(name="tw project", created_by=owner)
+        priority = await models.Priority.create(name="tw priority", level=100)
+        status = await models.Status.create(name="tw status", order_num=100)
+        await refdata.load_all()
+
+        token = create_access_token(data={"sub": str(owner.id)})
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            (await client.get("/auth/me")).raise_for_status()
+            stats = {}
+
+            async def measure(label, method, url, **kwargs):
+                with track_queries() as counter:
+                    started = time.perf_counter()
+                    response = await client.request(method, url, **kwargs)
+                    elapsed = time.perf_counter() - started
+                response.raise_for_status()
+                queries, timings = stats.setdefault(label, ([], []))
+                queries.append(counter.count)
+                timings.append(elapsed)
+                return response
+
+            for i in range(args.iterations):
+                created = await measure("POST /tasks/", "POST", "/tasks/", json={
+                    "title": f"task {i}", "project_id": project.id, "priority_id": priority.id,
+                    "status_id": status.id, "assignee_ids": [assignees[0].id],
+                })
+                task_id = created.json()["id"]
+                updated = await measure("PUT /tasks/{id} (поля)", "PUT", f"/tasks/{task_id}",
+                                        json={"title": f"task {i} v2", "status_id": status.id})
+                await measure("PUT /tasks/{id} (If-Match)", "PUT", f"/tasks/{task_id}",
+                              json={"title": f"task {i} v3"}, headers={"If-Match": updated.headers["etag"]})
+                await measure("PUT /tasks/{id} (исполнители)", "PUT", f"/tasks/{task_id}",
+                              json={"assignee_ids": [assignees[1].id]})
+                await measure("PATCH /tasks/{id}/assignees", "PATCH", f"/tasks/{task_id}/assignees",
+                              json={"add": [assignees[0].id]})
+                await measure("DELETE /tasks/{id}", "DELETE", f"/tasks/{task_id}")
+
+            print(f"{'маршрут':<32} {'SQL':>5} {'p50, мс':>9} {'p95, мс':>9}")
+            for label, (queries, timings) in stats.items():
+                print(f"{label:<32} {max(queries):>5} {percentile(timings, 50) * 1000:>9.2f} "
+                      f"{percentile(timings, 95) * 1000:>9.2f}")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
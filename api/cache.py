@@ -0,0 +1,52 @@
+"""Внутрипроцессные кэши с ограничением размера и времени жизни"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import metrics
+
+CACHE_HITS = metrics.Counter("cache_hits_total", "Попадания в кэш", labels=("cache",))
+CACHE_MISSES = metrics.Counter("cache_misses_total", "Промахи кэша", labels=("cache",))
+CACHE_EVICTIONS = metrics.Counter("cache_evictions_total", "Вытеснения из кэша по размеру", labels=("cache",))
+
+
+class TTLCache:
+    """LRU-кэш, записи которого истекают через ttl секунд (или собственный срок записи)"""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                CACHE_HITS.inc(cache=self.name)
+                return value
+            del self._data[key]
+        CACHE_MISSES.inc(cache=self.name)
+        return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            CACHE_EVICTIONS.inc(cache=self.name)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,165 @@
+"""Журнал изменений для инкрементальной синхронизации (/sync): правки объектов и надгробия удаленных"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import config
+import models
+import visibility
+from database import get_connection, SQLParams
+from pagination import encode_cursor
+
+UPSERT = "upsert"
+DELETE = "delete"
+ENTITIES = ("project", "task", "comment", "attachment")
+COLUMNS = ("entity", "entity_id", "op", "project_id", "task_id", "audience", "created_at")
+# Строк в одном INSERT (ограничение на число параметров запроса)
+CHUNK_SIZE = 1000
+
+PROJECT_FIELDS = ("id", "name", "description", "created_by_id", "created_at", "updated_at")
+COMMENT_FIELDS = ("id", "task_id", "user_id", "content", "created_at", "updated_at")
+ATTACHMENT_FIELDS = ("id", "task_id", "user_id", "filename", "filepath", "size", "mime_type", "uploaded_at")
+
+
+def audience_of(user_ids: Iterable[Optional[int]]) -> Optional[str]:
+    """Снимок круга пользователей, видевших объект: ",1,5," (ищется через LIKE '%,id,%')"""
+    ids = sorted({user_id for user_id in user_ids if user_id})
+    return f",{','.join(map(str, ids))}," if ids else None
+
+
+def project_change(project_id: int, op: str = UPSERT, audience: Optional[str] = None) -> tuple:
+    return "project", project_id, op, project_id, None, audience
+
+
+def task_change(task_id: int, project_id: int, op: str = UPSERT, audience: Optional[str] = None) -> tuple:
+    return "task", task_id, op, project_id, task_id, audience
+
+
+def comment_change(comment_id: int, task_id: int, op: str = UPSERT) -> tuple:
+    # Доступ к комментариям и вложениям проверяется по задаче; удаление задачи покрывает и их
+    return "comment", comment_id, op, None, task_id, None
+
+
+def attachment_change(attachment_id: int, task_id: int, op: str = UPSERT) -> tuple:
+    return "attachment", attachment_id, op, None, task_id, None
+
+
+async def record(changes: List[tuple], connection=None):
+    """Запись изменений в журнал (в транзакции изменения, если connection - ее соединение)"""
+    if not changes:
+        return
+    connection = connection or get_connection()
+    now = datetime.now(timezone.utc)
+    for start in range(0, len(changes), CHUNK_SIZE):
+        params = SQLParams(connection.capabilities.dialect)
+        values = ", ".join("(" + params.add_many([*change, now]) + ")"
+                           for change in changes[start:start + CHUNK_SIZE])
+        await connection.execute_query(
+            f"INSERT INTO change_log ({', '.join(COLUMNS)}) VALUES {values}", params.values
+        )
+
+
+async def task_audiences(connection=None, task_ids: Optional[List[int]] = None,
+                         project_id: Optional[int] = None) -> Dict[int, Tuple[int, Optional[str]]]:
+    """{task_id: (project_id, снимок круга пользователей)} для задач по ID или всех задач проекта"""
+    connection = connection or get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    if task_ids is not None:
+        if not task_ids:
+            return {}
+        where = f"t.id IN ({params.add_many(task_ids)})"
+    else:
+        where = f"t.project_id = {params.add(project_id)}"
+    rows = await connection.execute_query_dict(
+        f"SELECT t.id AS id, t.project_id AS project_id, t.created_by_id AS created_by_id, "
+        f"p.created_by_id AS owner_id, ta.user_id AS user_id FROM task t "
+        f"JOIN project p ON p.id = t.project_id LEFT JOIN task_assignee ta ON ta.task_id = t.id WHERE {where}",
+        params.values
+    )
+    users: Dict[int, set] = {}
+    projects: Dict[int, int] = {}
+    for row in rows:
+        projects[row["id"]] = row["project_id"]
+        users.setdefault(row["id"], set()).update((row["created_by_id"], row["owner_id"], row["user_id"]))
+    return {task_id: (projects[task_id], audience_of(user_ids)) for task_id, user_ids in users.items()}
+
+
+async def _changed_since(connection, since: int, user_id: Optional[int], user_role: Optional[str],
+                         limit: int) -> List[dict]:
+    params = SQLParams(connection.capabilities.dialect)
+    conditions = [f"c.id > {params.add(since)}"]
+    if user_role != "admin" and user_id:
+        # Видимые сейчас объекты, свои проекты или объекты, которые пользователь видел до удаления/смены доступа
+        conditions.append(
+            f"((t.id IS NOT NULL AND {visibility.visibility_predicate(params, user_id, user_role)}) "
+            f"OR (c.entity = 'project' AND p.created_by_id = {params.add(user_id)}) "
+            f"OR c.audience LIKE {params.add(f'%,{user_id},%')})"
+        )
+    sql = (
+        f"SELECT c.id AS id, c.entity AS entity, c.entity_id AS entity_id, c.task_id AS task_id "
+        f"FROM change_log c LEFT JOIN task t ON t.id = c.task_id "
+        f"LEFT JOIN project p ON p.id = COALESCE(t.project_id, c.project_id) "
+        f"WHERE {' AND '.join(conditions)} ORDER BY c.id LIMIT {params.add(limit)}"
+    )
+    return await connection.execute_query_dict(sql, params.values)
+
+
+async def _settled_head(connection) -> int:
+    # Номера выдаются до фиксации транзакций: более свежие записи могут появиться с меньшим номером,
+    # поэтому токен не продвигается дальше записей моложе SYNC_SETTLE_SECONDS (они придут повторно)
+    params = SQLParams(connection.capabilities.dialect)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=config.SYNC_SETTLE_SECONDS)
+    rows = await connection.execute_query_dict(
+        f"SELECT MAX(id) AS id FROM change_log WHERE created_at < {params.add(cutoff)}", params.values
+    )
+    return rows[0]["id"] or 0
+
+
+async def changes_since(since: Optional[int], user_id: Optional[int], user_role: Optional[str],
+                        limit: int = 500) -> dict:
+    """Актуальные версии объектов, измененных после токена, и надгробия удаленных или ставших недоступными"""
+    connection = get_connection()
+    result = {entity: [] for entity in ("projects", "tasks", "comments", "attachments", "deleted")}
+    if since is None:
+        # Первая синхронизация: только токен; данные клиент загружает обычными списками
+        return {**result, "next_token": encode_cursor(await _settled_head(connection)), "has_more": False}
+
+    rows = await _changed_since(connection, since, user_id, user_role, limit)
+    head = await _settled_head(connection)
+    has_more = len(rows) == limit
+    token = min(rows[-1]["id"], head) if has_more else head
+    token = max(token, since)
+    has_more = has_more and token > since
+
+    changed = {entity: set() for entity in ENTITIES}
+    task_ids = set()
+    for row in rows:
+        changed[row["entity"]].add(row["entity_id"])
+        if row["task_id"] is not None:
+            task_ids.add(row["task_id"])
+    visible = await visibility.visible_task_ids(task_ids, user_id, user_role)
+
+    if changed["project"]:
+        query = models.Project.filter(id__in=changed["project"])
+        if user_role != "admin" and user_id:
+            query = query.filter(created_by_id=user_id)
+        result["projects"] = await query.order_by("id").values(*PROJECT_FIELDS)
+    visible_tasks = sorted(changed["task"] & visible)
+    if visible_tasks:
+        tasks = await models.Task.filter(id__in=visible_tasks).order_by("id").values(*visibility.TASK_COLUMNS)
+        assignees = await visibility.fetch_assignees([task["id"] for task in tasks])
+        for task in tasks:
+            task["assignee_ids"] = [user["id"] for user in assignees[task["id"]]]
+        result["tasks"] = tasks
+    if changed["comment"] and visible:
+        result["comments"] = await models.Comment.filter(
+            id__in=changed["comment"], task_id__in=visible).order_by("id").values(*COMMENT_FIELDS)
+    if changed["attachment"] and visible:
+        result["attachments"] = await models.Attachment.filter(
+            id__in=changed["attachment"], task_id__in=visible).order_by("id").values(*ATTACHMENT_FIELDS)
+
+    # Все, что было в журнале, но не вернулось, удалено или больше не видно пользователю
+    for entity, key in (("project", "projects"), ("task", "tasks"), ("comment", "comments"),
+                        ("attachment", "attachments")):
+        found = {item["id"] for item in result[key]}
+        result["deleted"].extend({"entity": entity, "id": entity_id}
+                                 for entity_id in sorted(changed[entity] - found))
+    return {**result, "next_token": encode_cursor(token), "has_more": has_more}
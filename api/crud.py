@@ -1,8 +1,31 @@
+from datetime import datetime, timezone
 from typing import List, Optional
 from tortoise.exceptions import DoesNotExist
+from tortoise.transactions import in_transaction
+import changelog
+import config
+import etags
+import fulltext
 import models
+import notifications
+import project_stats
+import refdata
 import schemas
-from auth import get_password_hash
+import visibility
+from auth import get_password_hash, invalidate_user
+from database import get_connection, SQLParams
+
+# Строк в одном многострочном INSERT (ограничение на число параметров запроса)
+BULK_CHUNK_SIZE = 1000
+
+
+class WriteError(Exception):
+    """Запись отклонена: ответ status_code с detail (транзакция откатывается)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
 
 
 async def get_user(user_id: int):
@@ -26,13 +49,18 @@ async def get_user_by_email(email: str):
         return None
 
 
-async def get_users(skip: int = 0, limit: int = 100):
-    return await models.User.all().offset(skip).limit(limit)
+async def get_users(skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = models.User.all().order_by('id')
+    if after_id is not None:
+        query = query.filter(id__gt=after_id)
+    else:
+        query = query.offset(skip)
+    return await query.limit(limit)
 
 
 async def create_user(user: schemas.UserCreate):
     user_data = user.model_dump(exclude={'password'})
-    user_data['password_hash'] = get_password_hash(user.password)
+    user_data['password_hash'] = await get_password_hash(user.password)
     user_obj = await models.User.create(**user_data)
     return user_obj
 
@@ -44,20 +72,68 @@ async def update_user(user_id: int, user: schemas.UserUpdate):
 
         # Если передан новый пароль, хешируем его
         if user.password:
-            update_data['password_hash'] = get_password_hash(user.password)
+            update_data['password_hash'] = await get_password_hash(user.password)
 
         await user_obj.update_from_dict(update_data)
         await user_obj.save()
+        invalidate_user(user_id)
     return user_obj
 
 
 async def delete_user(user_id: int):
-    user_obj = await get_user(user_id)
-    if user_obj:
-        await user_obj.delete()
+    async with in_transaction() as connection:
+        user_obj = await _lock_for_delete(connection, models.User, user_id)
+        if user_obj is None:
+            return None
+        changes, events = await _referencing_changes(connection, "user", user_id)
+        await user_obj.delete(using_db=connection)
+        # Назначения пользователя удаляются каскадно в обход CounterDelta
+        await project_stats.rebuild_referencing("assignee", user_id, connection)
+        await changelog.record(changes, connection)
+    invalidate_user(user_id)
+    await notifications.publish(events)
     return user_obj
 
 
+async def _lock_for_delete(connection, model, object_id: int):
+    # Блокировка строки: пока идет удаление, на нее не сошлется новая задача, назначение или комментарий,
+    # поэтому выборка затронутых записей полна
+    return await model.filter(id=object_id).using_db(connection).select_for_update().first()
+
+
+async def _referencing_changes(connection, kind: str, ref_id: int):
+    """Записи журнала и события для строк, которые изменят FK-действия при удалении (SET NULL, каскад).
+
+    kind - user (задачи автора и исполнителя, комментарии и вложения), priority или status.
+    """
+    params = SQLParams(connection.capabilities.dialect)
+    if kind == "user":
+        sql = (
+            f"SELECT 'task' AS entity, t.id AS id, t.id AS task_id, t.project_id AS project_id FROM task t "
+            f"WHERE t.created_by_id = {params.add(ref_id)} "
+            f"OR t.id IN (SELECT task_id FROM task_assignee WHERE user_id = {params.add(ref_id)}) "
+            f"UNION ALL SELECT 'comment', c.id, c.task_id, NULL FROM comment c WHERE c.user_id = {params.add(ref_id)} "
+            f"UNION ALL SELECT 'attachment', a.id, a.task_id, NULL FROM attachment a "
+            f"WHERE a.user_id = {params.add(ref_id)}"
+        )
+    else:
+        sql = (f"SELECT 'task' AS entity, t.id AS id, t.id AS task_id, t.project_id AS project_id FROM task t "
+               f"WHERE t.{kind}_id = {params.add(ref_id)}")
+    rows = await connection.execute_query_dict(sql, params.values)
+    changes, events = [], []
+    for row in rows:
+        if row["entity"] == "task":
+            changes.append(changelog.task_change(row["id"], row["project_id"]))
+            events.append(notifications.task_event("updated", row["id"], row["project_id"]))
+        elif row["entity"] == "comment":
+            changes.append(changelog.comment_change(row["id"], row["task_id"]))
+            events.append(notifications.comment_event("updated", row["id"], row["task_id"]))
+        else:
+            changes.append(changelog.attachment_change(row["id"], row["task_id"]))
+            events.append(notifications.attachment_event("updated", row["id"], row["task_id"]))
+    return changes, events
+
+
 async def get_project(project_id: int, user_id: Optional[int] = None, user_role: Optional[str] = None):
     """Получение проекта с проверкой доступа"""
     try:
@@ -70,37 +146,73 @@ async def get_project(project_id: int, user_id: Optional[int] = None, user_role:
         return None
 
 
-async def get_projects(skip: int = 0, limit: int = 100, user_id: Optional[int] = None, user_role: Optional[str] = None):
+async def get_projects(skip: int = 0, limit: int = 100, user_id: Optional[int] = None, user_role: Optional[str] = None,
+                       after_id: Optional[int] = None):
     """Получение проектов с фильтрацией по пользователю"""
-    query = models.Project.all()
+    query = models.Project.all().order_by('id')
     # Обычные пользователи видят только свои проекты
     if user_role != "admin" and user_id:
         query = query.filter(created_by_id=user_id)
-    return await query.offset(skip).limit(limit)
+    if after_id is not None:
+        query = query.filter(id__gt=after_id)
+    else:
+        query = query.offset(skip)
+    return await query.limit(limit)
+
+
+async def get_project_version(project_id: int, user_id: Optional[int] = None,
+                              user_role: Optional[str] = None) -> Optional[dict]:
+    """updated_at проекта с проверкой доступа, без загрузки объекта (для ETag)"""
+    row = await models.Project.filter(id=project_id).first().values("created_by_id", "updated_at")
+    if row is None or (user_role != "admin" and user_id and row["created_by_id"] != user_id):
+        return None
+    return row
 
 
 async def create_project(project: schemas.ProjectCreate, user_id: int):
     project_data = project.model_dump()
     project_data['created_by_id'] = user_id
-    project_obj = await models.Project.create(**project_data)
+    async with in_transaction() as connection:
+        project_obj = await models.Project.create(**project_data, using_db=connection)
+        await changelog.record([changelog.project_change(project_obj.id)], connection)
     return project_obj
 
 
 async def update_project(project_id: int, project: schemas.ProjectUpdate, user_id: Optional[int] = None,
-                         user_role: Optional[str] = None):
-    """Обновление проекта с проверкой доступа"""
-    project_obj = await get_project(project_id, user_id, user_role)
-    if project_obj:
+                         user_role: Optional[str] = None, if_match: Optional[str] = None):
+    """Обновление проекта одной транзакцией (None - нет проекта или доступа; If-Match сверяется под блокировкой)"""
+    async with in_transaction() as connection:
+        project_obj = await models.Project.filter(id=project_id).using_db(connection).select_for_update().first()
+        if project_obj is None or (user_role != "admin" and user_id and project_obj.created_by_id != user_id):
+            return None
+        if etags.if_match_failed(if_match, etags.object_etag("project", project_id, project_obj.updated_at)):
+            raise WriteError(412, "Проект изменен другим запросом, получите актуальную версию")
         await project_obj.update_from_dict(project.model_dump(exclude_unset=True))
-        await project_obj.save()
+        await project_obj.save(using_db=connection)
+        await changelog.record([changelog.project_change(project_obj.id)], connection)
     return project_obj
 
 
 async def delete_project(project_id: int, user_id: Optional[int] = None, user_role: Optional[str] = None):
-    """Удаление проекта с проверкой доступа"""
-    project_obj = await get_project(project_id, user_id, user_role)
-    if project_obj:
-        await project_obj.delete()
+    """Удаление проекта с проверкой доступа одной транзакцией"""
+    async with in_transaction() as connection:
+        # Блокировка строки проекта: пока идет удаление, в нем не появится новая задача без надгробия
+        project_obj = await _lock_for_delete(connection, models.Project, project_id)
+        if project_obj is None or (user_role != "admin" and user_id and project_obj.created_by_id != user_id):
+            return None
+        # Задачи удаляются каскадно - надгробия для них пишутся до удаления, пока известен круг доступа
+        audiences = await changelog.task_audiences(connection, project_id=project_id)
+        await project_obj.delete(using_db=connection)
+        owner = changelog.audience_of([project_obj.created_by_id])
+        await changelog.record(
+            [changelog.project_change(project_id, changelog.DELETE, owner)]
+            + [changelog.task_change(task_id, project_id, changelog.DELETE, audience)
+               for task_id, (_, audience) in audiences.items()],
+            connection
+        )
+    fulltext.invalidate()
+    await notifications.publish([notifications.task_event("deleted", task_id, project_id, audience)
+                                 for task_id, (_, audience) in audiences.items()])
     return project_obj
 
 
@@ -129,9 +241,16 @@ async def update_priority(priority_id: int, priority: schemas.PriorityUpdate):
 
 
 async def delete_priority(priority_id: int):
-    priority_obj = await get_priority(priority_id)
-    if priority_obj:
-        await priority_obj.delete()
+    async with in_transaction() as connection:
+        priority_obj = await _lock_for_delete(connection, models.Priority, priority_id)
+        if priority_obj is None:
+            return None
+        changes, events = await _referencing_changes(connection, "priority", priority_id)
+        await priority_obj.delete(using_db=connection)
+        # SET NULL в задачах проходит в обход CounterDelta
+        await project_stats.rebuild_referencing("priority", priority_id, connection)
+        await changelog.record(changes, connection)
+    await notifications.publish(events)
     return priority_obj
 
 
@@ -160,9 +279,16 @@ async def update_status(status_id: int, status: schemas.StatusUpdate):
 
 
 async def delete_status(status_id: int):
-    status_obj = await get_status(status_id)
-    if status_obj:
-        await status_obj.delete()
+    async with in_transaction() as connection:
+        status_obj = await _lock_for_delete(connection, models.Status, status_id)
+        if status_obj is None:
+            return None
+        changes, events = await _referencing_changes(connection, "status", status_id)
+        await status_obj.delete(using_db=connection)
+        # SET NULL в задачах проходит в обход CounterDelta
+        await project_stats.rebuild_referencing("status", status_id, connection)
+        await changelog.record(changes, connection)
+    await notifications.publish(events)
     return status_obj
 
 
@@ -178,7 +304,7 @@ async def get_task(task_id: int, user_id: Optional[int] = None, user_role: Optio
             # 2. Он создатель задачи
             # 3. Он назначен на задачу
             project = await task.project
-            assignee_ids = [assignee.id for assignee in await task.assignees.all()]
+            assignee_ids = [assignee.id for assignee in task.assignees]
 
             if (project.created_by_id != user_id and
                     task.created_by_id != user_id and
@@ -190,128 +316,522 @@ async def get_task(task_id: int, user_id: Optional[int] = None, user_role: Optio
         return None
 
 
+async def get_task_version(task_id: int, user_id: Optional[int] = None,
+                           user_role: Optional[str] = None) -> Optional[dict]:
+    """updated_at задачи с проверкой доступа одним узким запросом (для ETag)"""
+    return await visibility.task_version(task_id, user_id, user_role)
+
+
+async def can_access_task(task_id: int, user_id: Optional[int] = None, user_role: Optional[str] = None) -> bool:
+    """Проверка доступа к задаче без загрузки самой задачи"""
+    return await visibility.task_visible(task_id, user_id, user_role)
+
+
 async def get_tasks(skip: int = 0, limit: int = 100, project_id: Optional[int] = None,
                     status_id: Optional[int] = None, priority_id: Optional[int] = None,
-                    user_id: Optional[int] = None, user_role: Optional[str] = None):
+                    user_id: Optional[int] = None, user_role: Optional[str] = None,
+                    after_id: Optional[int] = None):
     """Получение задач с фильтрацией по пользователю"""
-    query = models.Task.all().prefetch_related('priority', 'status', 'project', 'assignees')
+    return await visibility.fetch_task_page(
+        skip=skip,
+        after_id=after_id,
+        limit=limit,
+        project_id=project_id,
+        status_id=status_id,
+        priority_id=priority_id,
+        user_id=user_id,
+        user_role=user_role
+    )
 
-    # Фильтрация для обычных пользователей
-    if user_role != "admin" and user_id:
-        # Получаем ID проектов пользователя
-        user_projects = await models.Project.filter(created_by_id=user_id).values_list('id', flat=True)
 
-        # Получаем задачи где пользователь назначен
-        from tortoise.expressions import Q
-        query = query.filter(
-            Q(project_id__in=user_projects) |  # Задачи из его проектов
-            Q(created_by_id=user_id) |  # Задачи которые он создал
-            Q(assignees__id=user_id)  # Задачи на которые он назначен
-        ).distinct()
+class TaskWriteError(WriteError):
+    """Запись задачи отклонена"""
 
-    if project_id:
-        query = query.filter(project_id=project_id)
-    if status_id:
-        query = query.filter(status_id=status_id)
-    if priority_id:
-        query = query.filter(priority_id=priority_id)
 
-    return await query.offset(skip).limit(limit)
+def _returning() -> str:
+    return ", ".join(visibility.TASK_COLUMNS)
 
 
-async def create_task(task: schemas.TaskCreate, user_id: int):
-    task_data = task.model_dump(exclude={'assignee_ids'})
-    task_data['created_by_id'] = user_id
-    task_obj = await models.Task.create(**task_data)
+async def _check_refs(connection, data: dict, user_id: Optional[int], user_role: Optional[str]):
+    """Проект (с доступом), приоритет и статус задачи одним запросом; TaskWriteError при ошибке"""
+    params = SQLParams(connection.capabilities.dialect)
+    checks = []
+    if data.get("project_id"):
+        project = f"SELECT COUNT(*) FROM project WHERE id = {params.add(data['project_id'])}"
+        if user_role != "admin" and user_id:
+            project += f" AND created_by_id = {params.add(user_id)}"
+        checks.append(("project", f"({project})", "Проект не найден или нет доступа"))
+    if data.get("priority_id"):
+        checks.append(("priority", f"(SELECT COUNT(*) FROM priority WHERE id = {params.add(data['priority_id'])})",
+                       "Приоритет не найден"))
+    if data.get("status_id"):
+        checks.append(("status", f"(SELECT COUNT(*) FROM status WHERE id = {params.add(data['status_id'])})",
+                       "Статус не найден"))
+    if not checks:
+        return
+    rows = await connection.execute_query_dict(
+        "SELECT " + ", ".join(f"{sql} AS {name}" for name, sql, _ in checks), params.values
+    )
+    for name, _, detail in checks:
+        if not rows[0][name]:
+            raise TaskWriteError(404, detail)
+
+
+async def _load_task_for_write(connection, task_id: int, user_id: Optional[int],
+                               user_role: Optional[str]) -> Optional[dict]:
+    """Задача, владелец проекта и исполнители одним запросом; строка задачи блокируется до конца транзакции.
+
+    None - задачи нет или пользователь не видит ее по правилам get_task.
+    """
+    params = SQLParams(connection.capabilities.dialect)
+    columns = ", ".join(f"t.{column}" for column in visibility.TASK_COLUMNS)
+    lock = " FOR UPDATE OF t" if connection.capabilities.dialect == "postgres" else ""
+    rows = await connection.execute_query_dict(
+        f"SELECT {columns}, p.created_by_id AS owner_id, ta.user_id AS assignee_id FROM task t "
+        f"JOIN project p ON p.id = t.project_id LEFT JOIN task_assignee ta ON ta.task_id = t.id "
+        f"WHERE t.id = {params.add(task_id)}{lock}",
+        params.values
+    )
+    if not rows:
+        return None
+    task = {column: rows[0][column] for column in visibility.TASK_COLUMNS}
+    task["owner_id"] = rows[0]["owner_id"]
+    task["assignee_ids"] = sorted(row["assignee_id"] for row in rows if row["assignee_id"] is not None)
+    if user_role != "admin" and user_id and user_id not in (task["owner_id"], task["created_by_id"],
+                                                           *task["assignee_ids"]):
+        return None
+    return task
+
+
+def _audience(task: dict) -> Optional[str]:
+    return changelog.audience_of([task["owner_id"], task["created_by_id"], *task["assignee_ids"]])
 
-    if task.assignee_ids:
-        assignees = await models.User.filter(id__in=task.assignee_ids)
-        await task_obj.assignees.add(*assignees)
-    await task_obj.fetch_related('assignees')
 
-    return task_obj
+def _count_task(counters: project_stats.CounterDelta, task: dict, assignee_ids, sign: int = 1):
+    counters.add(task["project_id"], task["status_id"], task["priority_id"], assignee_ids, sign)
+
+
+async def create_task(task: schemas.TaskCreate, user_id: int, user_role: Optional[str] = None) -> dict:
+    """Создание задачи одной транзакцией: проверка ссылок, INSERT ... RETURNING и исполнители"""
+    task_data = task.model_dump(exclude={'assignee_ids'})
+    now = datetime.now(timezone.utc)
+    async with in_transaction() as connection:
+        await _check_refs(connection, task_data, user_id, user_role)
+        params = SQLParams(connection.capabilities.dialect)
+        values = params.add_many([task.title, task.description, task.project_id, task.priority_id,
+                                  task.status_id, user_id, task.due_date, now, now])
+        rows = await connection.execute_query_dict(
+            "INSERT INTO task (title, description, project_id, priority_id, status_id, created_by_id, "
+            f"due_date, created_at, updated_at) VALUES ({values}) RETURNING {_returning()}",
+            params.values
+        )
+        created = rows[0]
+        assignee_ids = []
+        if task.assignee_ids:
+            assignee_ids = await _apply_assignee_diff(connection, created["id"], set(), set(task.assignee_ids), set())
+        counters = project_stats.CounterDelta()
+        _count_task(counters, created, assignee_ids)
+        await counters.apply(connection)
+        await changelog.record([changelog.task_change(created["id"], created["project_id"])], connection)
+    fulltext.invalidate()
+    await notifications.publish([notifications.task_event("created", created["id"], created["project_id"])])
+    return created
+
+
+async def _apply_assignee_diff(connection, task_id: int, current: set, add: set, remove: set) -> List[int]:
+    """Изменение исполнителей разностью: один DELETE снятых и один INSERT новых; итоговый список ID"""
+    remove = remove & current
+    add = add - current - remove
+    if remove:
+        params = SQLParams(connection.capabilities.dialect)
+        task_ref = params.add(task_id)
+        if connection.capabilities.dialect == "postgres":
+            removed = f"user_id = ANY({params.add(sorted(remove))})"
+        else:
+            removed = f"user_id IN ({params.add_many(sorted(remove))})"
+        await connection.execute_query(f"DELETE FROM task_assignee WHERE task_id = {task_ref} AND {removed}",
+                                       params.values)
+    added = set()
+    if add:
+        # Несуществующие пользователи отсеиваются в том же запросе
+        params = SQLParams(connection.capabilities.dialect)
+        rows = await connection.execute_query_dict(
+            f'INSERT INTO task_assignee (task_id, user_id) SELECT CAST({params.add(task_id)} AS INTEGER), u.id '
+            f'FROM "user" u WHERE u.id IN ({params.add_many(sorted(add))}) ON CONFLICT DO NOTHING RETURNING user_id',
+            params.values
+        )
+        added = {row["user_id"] for row in rows}
+    return sorted((current - remove) | added)
 
 
 async def update_task(task_id: int, task: schemas.TaskUpdate, user_id: Optional[int] = None,
-                      user_role: Optional[str] = None):
-    """Обновление задачи с проверкой доступа"""
-    task_obj = await get_task(task_id, user_id, user_role)
-    if task_obj:
-        update_data = task.model_dump(exclude_unset=True, exclude={'assignee_ids'})
-        await task_obj.update_from_dict(update_data)
-        await task_obj.save()
-        
+                      user_role: Optional[str] = None, if_match: Optional[str] = None) -> Optional[dict]:
+    """Обновление задачи одной транзакцией (None - нет задачи или доступа; If-Match сверяется под блокировкой)"""
+    update_data = task.model_dump(exclude_unset=True, exclude={'assignee_ids'})
+    error = _null_required_field(update_data)
+    if error:
+        raise TaskWriteError(422, error)
+    now = datetime.now(timezone.utc)
+    async with in_transaction() as connection:
+        current = await _load_task_for_write(connection, task_id, user_id, user_role)
+        if current is None:
+            return None
+        if etags.if_match_failed(if_match, etags.object_etag("task", task_id, current["updated_at"])):
+            raise TaskWriteError(412, "Задача изменена другим запросом, получите актуальную версию")
+        await _check_refs(connection, update_data, user_id, user_role)
+
+        params = SQLParams(connection.capabilities.dialect)
+        assignments = ", ".join(f"{field} = {params.add(value)}"
+                                for field, value in {**update_data, "updated_at": now}.items())
+        rows = await connection.execute_query_dict(
+            f"UPDATE task SET {assignments} WHERE id = {params.add(task_id)} RETURNING {_returning()}",
+            params.values
+        )
+        updated = rows[0]
+        assignee_ids = current["assignee_ids"]
         if task.assignee_ids is not None:
-            await task_obj.assignees.clear()
-            if task.assignee_ids:
-                assignees = await models.User.filter(id__in=task.assignee_ids)
-                await task_obj.assignees.add(*assignees)
-        await task_obj.fetch_related('assignees')
-
-    return task_obj
+            old, desired = set(assignee_ids), set(task.assignee_ids)
+            assignee_ids = await _apply_assignee_diff(connection, task_id, old, desired - old, old - desired)
+
+        counters = project_stats.CounterDelta()
+        _count_task(counters, current, current["assignee_ids"], sign=-1)
+        _count_task(counters, updated, assignee_ids)
+        await counters.apply(connection)
+        # Прежний круг доступа: кто потеряет доступ, получит задачу в /sync как удаленную
+        audience = _audience(current)
+        await changelog.record([changelog.task_change(task_id, updated["project_id"], audience=audience)],
+                               connection)
+    fulltext.invalidate()
+    # Новый круг доступа (с учетом смены проекта) hub вычислит сам
+    await notifications.publish([notifications.task_event("updated", task_id, updated["project_id"],
+                                                          revoked=audience)])
+    return updated
+
+
+async def update_task_assignees(task_id: int, add: List[int], remove: List[int], user_id: Optional[int] = None,
+                                user_role: Optional[str] = None):
+    """Добавление и снятие исполнителей без перезаписи всего набора: (задача, итоговые ID) или None"""
+    now = datetime.now(timezone.utc)
+    async with in_transaction() as connection:
+        current = await _load_task_for_write(connection, task_id, user_id, user_role)
+        if current is None:
+            return None
+        old = set(current["assignee_ids"])
+        if not (set(add) - old) and not (set(remove) & old):
+            return current, current["assignee_ids"]
+
+        assignee_ids = await _apply_assignee_diff(connection, task_id, old, set(add), set(remove))
+        # Смена исполнителей - изменение задачи: новый updated_at меняет ETag и версию списков
+        params = SQLParams(connection.capabilities.dialect)
+        rows = await connection.execute_query_dict(
+            f"UPDATE task SET updated_at = {params.add(now)} WHERE id = {params.add(task_id)} "
+            f"RETURNING {_returning()}",
+            params.values
+        )
+        updated = rows[0]
+        counters = project_stats.CounterDelta()
+        _count_task(counters, current, old, sign=-1)
+        _count_task(counters, updated, assignee_ids)
+        await counters.apply(connection)
+        audience = _audience(current)
+        await changelog.record([changelog.task_change(task_id, updated["project_id"], audience=audience)],
+                               connection)
+    await notifications.publish([notifications.task_event("updated", task_id, updated["project_id"],
+                                                          revoked=audience)])
+    return updated, assignee_ids
 
 
 async def delete_task(task_id: int, user_id: Optional[int] = None, user_role: Optional[str] = None):
-    """Удаление задачи с проверкой доступа"""
-    task_obj = await get_task(task_id, user_id, user_role)
-    if task_obj:
-        await task_obj.delete()
-    return task_obj
+    """Удаление задачи одной транзакцией (комментарии, вложения и назначения удаляются каскадно)"""
+    async with in_transaction() as connection:
+        current = await _load_task_for_write(connection, task_id, user_id, user_role)
+        if current is None:
+            return None
+        params = SQLParams(connection.capabilities.dialect)
+        await connection.execute_query(f"DELETE FROM task WHERE id = {params.add(task_id)}", params.values)
+        counters = project_stats.CounterDelta()
+        _count_task(counters, current, current["assignee_ids"], sign=-1)
+        await counters.apply(connection)
+        audience = _audience(current)
+        await changelog.record([changelog.task_change(task_id, current["project_id"], changelog.DELETE, audience)],
+                               connection)
+    fulltext.invalidate()
+    await notifications.publish([notifications.task_event("deleted", task_id, current["project_id"], audience)])
+    return current
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _accessible_project_ids(project_ids, user_id: Optional[int], user_role: Optional[str]) -> set:
+    if not project_ids:
+        return set()
+    query = models.Project.filter(id__in=list(project_ids))
+    if user_role != "admin" and user_id:
+        query = query.filter(created_by_id=user_id)
+    return set(await query.values_list('id', flat=True))
+
+
+async def _existing_user_ids(user_ids) -> set:
+    if not user_ids:
+        return set()
+    return set(await models.User.filter(id__in=list(user_ids)).values_list('id', flat=True))
+
+
+# NOT NULL-поля задачи: явный null в обновлении - ошибка клиента, а не IntegrityError при записи
+REQUIRED_TASK_FIELDS = ("title", "project_id")
+
+
+def _null_required_field(update_data: dict) -> Optional[str]:
+    """Ошибка, если обязательному полю задачи явно передан null, иначе None"""
+    field = next((field for field in REQUIRED_TASK_FIELDS if field in update_data and update_data[field] is None),
+                 None)
+    return f"Поле {field} не может быть пустым" if field else None
+
+
+async def _check_task_refs(task, allowed_projects: set) -> Optional[str]:
+    """Ошибка проверки ссылок задачи (проект, приоритет, статус) или None"""
+    if task.project_id and task.project_id not in allowed_projects:
+        return "Проект не найден или нет доступа"
+    if task.priority_id and not await refdata.priorities.get(task.priority_id):
+        return "Приоритет не найден"
+    if task.status_id and not await refdata.statuses.get(task.status_id):
+        return "Статус не найден"
+    return None
+
+
+async def _task_project_ids(connection, task_ids: list) -> set:
+    params = SQLParams(connection.capabilities.dialect)
+    rows = await connection.execute_query_dict(
+        f"SELECT DISTINCT project_id FROM task WHERE id IN ({params.add_many(task_ids)})", params.values
+    )
+    return {row["project_id"] for row in rows}
+
+
+async def _insert_assignees(connection, rows: list):
+    """Назначения (task_id, user_id) многострочными INSERT"""
+    for chunk in _chunks(rows, BULK_CHUNK_SIZE):
+        params = SQLParams(connection.capabilities.dialect)
+        values = ", ".join(f"({params.add(task_id)}, {params.add(user_id)})" for task_id, user_id in chunk)
+        await connection.execute_query(
+            f"INSERT INTO task_assignee (task_id, user_id) VALUES {values} ON CONFLICT DO NOTHING",
+            params.values
+        )
+
+
+async def create_tasks_bulk(tasks: List[schemas.TaskCreate], user_id: int, user_role: Optional[str] = None):
+    """Массовое создание задач: ссылки проверяются один раз на пакет, запись - одной транзакцией"""
+    results = [None] * len(tasks)
+    allowed_projects = await _accessible_project_ids({task.project_id for task in tasks}, user_id, user_role)
+    existing_users = await _existing_user_ids({uid for task in tasks for uid in task.assignee_ids or []})
+
+    valid = []
+    for index, task in enumerate(tasks):
+        error = await _check_task_refs(task, allowed_projects)
+        if error:
+            results[index] = {"index": index, "status_code": 404, "detail": error}
+        else:
+            valid.append((index, task))
+
+    now = datetime.now(timezone.utc)
+    counters = project_stats.CounterDelta()
+    async with in_transaction() as connection:
+        for chunk in _chunks(valid, BULK_CHUNK_SIZE):
+            params = SQLParams(connection.capabilities.dialect)
+            values = ", ".join(
+                "(" + params.add_many([task.title, task.description, task.project_id, task.priority_id,
+                                       task.status_id, user_id, task.due_date, now, now]) + ")"
+                for _, task in chunk
+            )
+            rows = await connection.execute_query_dict(
+                "INSERT INTO task (title, description, project_id, priority_id, status_id, created_by_id, "
+                f"due_date, created_at, updated_at) VALUES {values} RETURNING id",
+                params.values
+            )
+
+            assignee_rows = []
+            for (index, task), row in zip(chunk, rows):
+                results[index] = {"index": index, "status_code": 201, "id": row["id"]}
+                assignee_ids = [uid for uid in dict.fromkeys(task.assignee_ids or []) if uid in existing_users]
+                assignee_rows.extend((row["id"], uid) for uid in assignee_ids)
+                counters.add(task.project_id, task.status_id, task.priority_id, assignee_ids)
+            await _insert_assignees(connection, assignee_rows)
+        await counters.apply(connection)
+        await changelog.record([changelog.task_change(results[index]["id"], task.project_id)
+                                for index, task in valid], connection)
+
+    fulltext.invalidate()
+    # Круг доступа новых задач hub вычислит сам, если есть подписчики
+    await notifications.publish([notifications.task_event("created", results[index]["id"], task.project_id)
+                                 for index, task in valid])
+    return results
+
+
+async def update_tasks_bulk(items: List[schemas.TaskBulkUpdateItem], user_id: Optional[int] = None,
+                            user_role: Optional[str] = None):
+    """Массовое обновление задач: доступ и ссылки проверяются на пакет, запись - одной транзакцией"""
+    results = [None] * len(items)
+    visible = await visibility.visible_task_ids({item.id for item in items}, user_id, user_role)
+    allowed_projects = await _accessible_project_ids(
+        {item.project_id for item in items if item.project_id}, user_id, user_role
+    )
+    existing_users = await _existing_user_ids({uid for item in items for uid in item.assignee_ids or []})
+
+    # Обновления группируются по набору полей, каждая группа - один executemany
+    groups = {}
+    reassigned = []
+    for index, item in enumerate(items):
+        update_data = item.model_dump(exclude_unset=True, exclude={'id', 'assignee_ids'})
+        error = _null_required_field(update_data)
+        if error:
+            results[index] = {"index": index, "status_code": 422, "detail": error}
+            continue
+        error = "Задача не найдена или нет доступа" if item.id not in visible else None
+        error = error or await _check_task_refs(item, allowed_projects)
+        if error:
+            results[index] = {"index": index, "status_code": 404, "detail": error}
+            continue
+        groups.setdefault(tuple(sorted(update_data)), []).append((item.id, update_data))
+        if item.assignee_ids is not None:
+            reassigned.append(item)
+        results[index] = {"index": index, "status_code": 200, "id": item.id}
+
+    now = datetime.now(timezone.utc)
+    async with in_transaction() as connection:
+        # Прежние значения полей здесь не загружаются, поэтому счетчики затронутых проектов пересчитываются
+        stale_projects = set()
+        if config.PROJECT_STATS_MATERIALIZED and groups:
+            stale_projects = await _task_project_ids(connection, [task_id for group in groups.values()
+                                                                  for task_id, _ in group])
+            stale_projects.update(data["project_id"] for group in groups.values() for _, data in group
+                                  if data.get("project_id"))
+        # Прежний круг доступа нужен только задачам, у которых меняются исполнители или проект
+        reassigned_ids = {item.id for item in reassigned}
+        audiences = await changelog.task_audiences(connection, task_ids=[
+            task_id for group in groups.values() for task_id, data in group
+            if data.get("project_id") or task_id in reassigned_ids
+        ])
+
+        for fields, group in groups.items():
+            params = SQLParams(connection.capabilities.dialect)
+            assignments = ", ".join(f"{field} = {params.reserve()}" for field in fields + ('updated_at',))
+            sql = f"UPDATE task SET {assignments} WHERE id = {params.reserve()}"
+            await connection.execute_many(
+                sql, [[data[field] for field in fields] + [now, task_id] for task_id, data in group]
+            )
+
+        if reassigned:
+            params = SQLParams(connection.capabilities.dialect)
+            task_ids = params.add_many([item.id for item in reassigned])
+            await connection.execute_query(f"DELETE FROM task_assignee WHERE task_id IN ({task_ids})", params.values)
+            await _insert_assignees(connection, [
+                (item.id, uid) for item in reassigned for uid in dict.fromkeys(item.assignee_ids)
+                if uid in existing_users
+            ])
+
+        if stale_projects:
+            await project_stats.rebuild(sorted(stale_projects), connection)
+        changes, events = [], []
+        for group in groups.values():
+            for task_id, data in group:
+                old_project_id, audience = audiences.get(task_id, (None, None))
+                project_id = data.get("project_id") or old_project_id
+                changes.append(changelog.task_change(task_id, project_id, audience=audience))
+                events.append(notifications.task_event("updated", task_id, project_id, revoked=audience))
+        await changelog.record(changes, connection)
+
+    fulltext.invalidate()
+    await notifications.publish(events)
+    return results
 
 
 async def get_comment(comment_id: int):
     try:
-        return await models.Comment.get(id=comment_id).prefetch_related('user')
+        return await models.Comment.get(id=comment_id)
     except DoesNotExist:
         return None
 
 
-async def get_comments_by_task(task_id: int):
-    return await models.Comment.filter(task_id=task_id).prefetch_related('user').all()
+async def get_comments_by_task(task_id: int, after_id: Optional[int] = None, limit: Optional[int] = None):
+    query = models.Comment.filter(task_id=task_id).prefetch_related('user').order_by('id')
+    if after_id is not None:
+        query = query.filter(id__gt=after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return await query
 
 
 async def create_comment(comment: schemas.CommentCreate, user_id: int):
     comment_data = comment.model_dump()
     comment_data['user_id'] = user_id
-    comment_obj = await models.Comment.create(**comment_data)
+    async with in_transaction() as connection:
+        comment_obj = await models.Comment.create(**comment_data, using_db=connection)
+        await changelog.record([changelog.comment_change(comment_obj.id, comment_obj.task_id)], connection)
+    fulltext.invalidate()
+    await notifications.publish([notifications.comment_event("created", comment_obj.id, comment_obj.task_id)])
     return comment_obj
 
 
 async def update_comment(comment_id: int, comment: schemas.CommentUpdate):
     comment_obj = await get_comment(comment_id)
     if comment_obj:
-        await comment_obj.update_from_dict(comment.model_dump(exclude_unset=True))
-        await comment_obj.save()
+        async with in_transaction() as connection:
+            await comment_obj.update_from_dict(comment.model_dump(exclude_unset=True))
+            await comment_obj.save(using_db=connection)
+            await changelog.record([changelog.comment_change(comment_obj.id, comment_obj.task_id)], connection)
+        fulltext.invalidate()
+        await notifications.publish([notifications.comment_event("updated", comment_obj.id, comment_obj.task_id)])
     return comment_obj
 
 
 async def delete_comment(comment_id: int):
     comment_obj = await get_comment(comment_id)
     if comment_obj:
-        await comment_obj.delete()
+        async with in_transaction() as connection:
+            await comment_obj.delete(using_db=connection)
+            await changelog.record([changelog.comment_change(comment_id, comment_obj.task_id, changelog.DELETE)],
+                                   connection)
+        fulltext.invalidate()
+        await notifications.publish([notifications.comment_event("deleted", comment_id, comment_obj.task_id)])
     return comment_obj
 
 
 async def get_attachment(attachment_id: int):
     try:
-        return await models.Attachment.get(id=attachment_id).prefetch_related('user')
+        return await models.Attachment.get(id=attachment_id)
     except DoesNotExist:
         return None
 
 
-async def get_attachments_by_task(task_id: int):
-    return await models.Attachment.filter(task_id=task_id).prefetch_related('user').all()
+async def get_attachments_by_task(task_id: int, after_id: Optional[int] = None, limit: Optional[int] = None):
+    query = models.Attachment.filter(task_id=task_id).prefetch_related('user').order_by('id')
+    if after_id is not None:
+        query = query.filter(id__gt=after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return await query
 
 
 async def create_attachment(attachment: schemas.AttachmentCreate, user_id: int):
     attachment_data = attachment.model_dump()
     attachment_data['user_id'] = user_id
-    attachment_obj = await models.Attachment.create(**attachment_data)
+    async with in_transaction() as connection:
+        attachment_obj = await models.Attachment.create(**attachment_data, using_db=connection)
+        await changelog.record([changelog.attachment_change(attachment_obj.id, attachment_obj.task_id)], connection)
+    await notifications.publish([notifications.attachment_event("created", attachment_obj.id,
+                                                                attachment_obj.task_id)])
     return attachment_obj
 
 
 async def delete_attachment(attachment_id: int):
     attachment_obj = await get_attachment(attachment_id)
     if attachment_obj:
-        await attachment_obj.delete()
+        async with in_transaction() as connection:
+            await attachment_obj.delete(using_db=connection)
+            await changelog.record([changelog.attachment_change(attachment_id, attachment_obj.task_id,
+                                                                changelog.DELETE)], connection)
+        await notifications.publish([notifications.attachment_event("deleted", attachment_id,
+                                                                    attachment_obj.task_id)])
     return attachment_obj
@@ -1,27 +1,94 @@
-from tortoise import Tortoise
+import asyncio
+from tortoise import Tortoise, connections
+from tortoise.backends.base.config_generator import expand_db_url
 import config
+import instrumentation
+
+
+def _connection_config(db_url: str) -> dict:
+    """Параметры подключения; для PostgreSQL - с настройками пула из окружения"""
+    db = expand_db_url(db_url)
+    if db["engine"] == "tortoise.backends.asyncpg":
+        db["engine"] = "db_pool"
+        db["credentials"].update({
+            "minsize": config.DB_POOL_MIN_SIZE,
+            "maxsize": config.DB_POOL_MAX_SIZE,
+            "max_inactive_connection_lifetime": config.DB_POOL_MAX_INACTIVE_LIFETIME,
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": config.DB_COMMAND_TIMEOUT,
+        })
+    return db
+
 
 TORTOISE_ORM = {
     "connections": {
-        "default": config.DATABASE_URL
+        "default": _connection_config(config.DATABASE_URL)
     },
     "apps": {
         "models": {
-            "models": ["models", "aerich.models"],
+            "models": ["models"],
             "default_connection": "default",
         },
     },
     "use_tz": True,
 }
 
+# Конфигурация для aerich (pyproject.toml): приложению модель таблицы миграций не нужна
+MIGRATIONS_ORM = {
+    **TORTOISE_ORM,
+    "apps": {
+        "models": {
+            "models": ["models", "aerich.models"],
+            "default_connection": "default",
+        },
+    },
+}
+
 
 async def init_db():
     """Инициализация подключения к базе данных"""
-    await Tortoise.init(config=TORTOISE_ORM)
+    # uvicorn выполняет lifespan в отдельной задаче: без глобального контекста запросы не видят соединения
+    await Tortoise.init(config=TORTOISE_ORM, _enable_global_fallback=True)
+    if config.METRICS_ENABLED or config.QUERY_TRACKING != "off":
+        instrumentation.ensure_query_hook()
     # Генерация схем
     # await Tortoise.generate_schemas()
 
 
+async def warm_up_pool():
+    """Открытие соединений пула до первых запросов"""
+    connection = get_connection()
+    if connection.capabilities.dialect != "postgres":
+        return
+    await asyncio.gather(*(connection.execute_query("SELECT 1") for _ in range(config.DB_POOL_WARMUP)))
+
+
 async def close_db():
     """Закрытие подключения к базе данных"""
     await Tortoise.close_connections()
+
+
+def get_connection():
+    """Соединение по умолчанию для запросов в обход ORM"""
+    return connections.get("default")
+
+
+class SQLParams:
+    """Накопитель параметров сырого SQL с плейсхолдерами под диалект соединения"""
+
+    def __init__(self, dialect: str):
+        self.dialect = dialect
+        self.values = []
+
+    def add(self, value) -> str:
+        self.values.append(value)
+        if self.dialect == "postgres":
+            return f"${len(self.values)}"
+        return "?"
+
+    def reserve(self) -> str:
+        """Плейсхолдер для значения, которое передается отдельно (executemany)"""
+        return self.add(None)
+
+    def add_many(self, values) -> str:
+        return ", ".join(self.add(value) for value in values)
@@ -0,0 +1,46 @@
+"""Клиент asyncpg с метриками пула соединений (движок Tortoise "db_pool")"""
+import time
+from tortoise import connections
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+from tortoise.backends.base.client import PoolConnectionWrapper
+import metrics
+
+POOL_ACQUIRE_SECONDS = metrics.Histogram(
+    "db_pool_acquire_seconds", "Ожидание свободного соединения в пуле",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+class TimedPoolConnectionWrapper(PoolConnectionWrapper):
+    async def __aenter__(self):
+        await self.ensure_connection()
+        started = time.perf_counter()
+        self.connection = await self.client._pool.acquire()
+        POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - started)
+        return self.connection
+
+
+class InstrumentedAsyncpgClient(AsyncpgDBClient):
+    def acquire_connection(self):
+        return TimedPoolConnectionWrapper(self, self._pool_init_lock)
+
+
+client_class = InstrumentedAsyncpgClient
+
+
+def _pool_stat(stat) -> float:
+    try:
+        pool = getattr(connections.get("default"), "_pool", None)
+    except Exception:
+        return 0
+    return stat(pool) if pool is not None else 0
+
+
+metrics.Gauge("db_pool_size", "Открытые соединения пула",
+              callback=lambda: _pool_stat(lambda pool: pool.get_size()))
+metrics.Gauge("db_pool_idle", "Свободные соединения пула",
+              callback=lambda: _pool_stat(lambda pool: pool.get_idle_size()))
+metrics.Gauge("db_pool_in_use", "Занятые соединения пула",
+              callback=lambda: _pool_stat(lambda pool: pool.get_size() - pool.get_idle_size()))
+metrics.Gauge("db_pool_max_size", "Максимальный размер пула",
+              callback=lambda: _pool_stat(lambda pool: pool.get_max_size()))
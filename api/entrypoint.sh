@@ -5,8 +5,24 @@ echo "Ожидание готовности PostgreSQL..."
 while ! pg_isready -h postgres -p 5432 > /dev/null 2>&1; do
     sleep 1
 done
-echo "Инициализация базовых данных..."
-python init_data.py || echo "Данные уже существуют"
-echo "Инициализация тестовых пользователей..."
-python init_users.py || echo "Пользователи уже существуют"
-exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+
+# Проверки через psql: запуск Python с Tortoise стоит секунды на каждый шаг
+db_value() {
+    psql "$DATABASE_URL" -tAc "$1" 2> /dev/null || true
+}
+
+LATEST_MIGRATION=$(ls migrations/models | grep -E '^[0-9]+_.*\.py$' | sort -n | tail -1)
+if [ "$(db_value "SELECT version FROM aerich WHERE app = 'models' ORDER BY id DESC LIMIT 1")" = "$LATEST_MIGRATION" ]; then
+    echo "Миграции уже применены ($LATEST_MIGRATION)"
+else
+    echo "Применение миграций..."
+    aerich upgrade
+fi
+
+if [ "$(db_value "SELECT 1 FROM app_state WHERE key = 'seed'")" = "1" ] && [ "${FORCE_SEED:-false}" != "true" ]; then
+    echo "Начальные данные уже загружены"
+else
+    echo "Инициализация базовых данных и тестовых пользователей..."
+    python init_seed.py || echo "Данные уже существуют"
+fi
+exec bash serve.sh
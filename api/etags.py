@@ -0,0 +1,66 @@
+"""Слабые ETag задач и проектов и проверка заголовков If-None-Match / If-Match.
+
+ETag списков считается по самой странице, а не по агрегату всего видимого набора: страница
+все равно загружается, и отдельного запроса версии нет.
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def _timestamp(value) -> str:
+    # SQLite возвращает время строкой, PostgreSQL и ORM - datetime; приводим к микросекундам UTC
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return str(round(value.timestamp() * 1_000_000))
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def object_etag(kind: str, object_id: int, updated_at) -> str:
+    """ETag объекта по (id, updated_at)"""
+    return make_etag(kind, object_id, _timestamp(updated_at))
+
+
+def list_etag(kind: str, items, *scope) -> str:
+    """ETag страницы списка по (id, updated_at) ее элементов; scope - то, что еще входит в ответ (next_cursor)"""
+    return make_etag(kind, *(f"{item.id}@{_timestamp(item.updated_at)}" for item in items), *scope)
+
+
+def body_etag(kind: str, body: bytes) -> str:
+    """ETag по уже сериализованному телу ответа"""
+    return make_etag(kind, hashlib.sha1(body).hexdigest())
+
+
+def _tags(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def none_match(header: Optional[str], etag: str) -> bool:
+    """If-None-Match совпадает с текущим ETag - можно ответить 304"""
+    if not header:
+        return False
+    tags = _tags(header)
+    return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+
+def if_match_failed(header: Optional[str], etag: str) -> bool:
+    """If-Match задан и не совпадает с текущим ETag - ответ 412.
+
+    Сравнение слабое: сервер выдает только слабые ETag, а строгое сравнение их никогда не совпадает.
+    """
+    if not header:
+        return False
+    tags = _tags(header)
+    return "*" not in tags and _opaque(etag) not in {_opaque(tag) for tag in tags}
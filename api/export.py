@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from visibility import TASK_COLUMNS
+
+EXPORT_COLUMNS = TASK_COLUMNS + ("assignee_ids",)
+DATETIME_COLUMNS = frozenset(("due_date", "created_at", "updated_at"))
+
+
+def _plain(column: str, value):
+    # SQLite в сыром SQL возвращает время строкой ("2026-10-18 06:46:49+00:00"), PostgreSQL - datetime;
+    # в выгрузке время всегда ISO 8601 в UTC, независимо от БД
+    if column not in DATETIME_COLUMNS or value is None:
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+async def ndjson_lines(tasks):
+    """Задачи построчно в формате NDJSON"""
+    async for task in tasks:
+        yield json.dumps({key: _plain(key, value) for key, value in task.items()}, ensure_ascii=False) + "\n"
+
+
+async def csv_lines(tasks):
+    """Задачи построчно в формате CSV (исполнители через пробел)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield flush()
+    async for task in tasks:
+        row = [_plain(column, task[column]) for column in TASK_COLUMNS]
+        row.append(" ".join(str(user_id) for user_id in task["assignee_ids"]))
+        writer.writerow(row)
+        yield flush()
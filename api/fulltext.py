@@ -0,0 +1,186 @@
+"""Полнотекстовый поиск по задачам и комментариям с проверкой доступа на стороне SQL.
+
+Фрагмент (snippet) - HTML: текст экранирован, найденные слова в <b></b>.
+"""
+import html
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+import config
+import models
+from database import get_connection, SQLParams
+from visibility import visibility_predicate, visible_task_ids
+
+TS_CONFIG = "russian"
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=30, MinWords=10, MaxFragments=2"
+SNIPPET_WORDS = 30
+# Экранирование как у html.escape: ts_headline вставляет текст в разметку как есть
+_HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+_TOKEN = re.compile(r"\w+")
+
+
+async def search(q: str, user_id: Optional[int], user_role: Optional[str], skip: int = 0,
+                 limit: int = 20) -> List[dict]:
+    """Найденные задачи и комментарии по убыванию релевантности (только видимые пользователю)"""
+    connection = get_connection()
+    if connection.capabilities.dialect == "postgres":
+        return await _search_postgres(connection, q, user_id, user_role, skip, limit)
+    return await fallback_index.search(q, user_id, user_role, skip, limit)
+
+
+async def _search_postgres(connection, q: str, user_id: Optional[int], user_role: Optional[str],
+                           skip: int, limit: int) -> List[dict]:
+    # Сначала отбираем и ранжируем по GIN-индексам, ts_headline считаем только для страницы результатов
+    params = SQLParams(connection.capabilities.dialect)
+    query = params.add(q)
+    task_visible = visibility_predicate(params, user_id, user_role)
+    comment_visible = visibility_predicate(params, user_id, user_role)
+    source = _escape_html_sql("CASE WHEN h.type = 'task' THEN concat_ws(' ', t.title, t.description) "
+                              "ELSE c.content END")
+    sql = (
+        f"WITH q AS (SELECT websearch_to_tsquery('{TS_CONFIG}', {query}) AS query), "
+        f"hits AS ("
+        f"SELECT 'task' AS type, t.id AS task_id, NULL::integer AS comment_id, "
+        f"ts_rank(t.search_vector, q.query) AS rank "
+        f"FROM q, task t JOIN project p ON p.id = t.project_id "
+        f"WHERE t.search_vector @@ q.query AND {task_visible} "
+        f"UNION ALL "
+        f"SELECT 'comment', c.task_id, c.id, ts_rank(c.search_vector, q.query) "
+        f"FROM q, comment c JOIN task t ON t.id = c.task_id JOIN project p ON p.id = t.project_id "
+        f"WHERE c.search_vector @@ q.query AND {comment_visible} "
+        f"ORDER BY rank DESC, task_id, comment_id NULLS FIRST "
+        f"LIMIT {params.add(limit)} OFFSET {params.add(skip)}"
+        f") "
+        f"SELECT h.type, h.task_id, h.comment_id, h.rank, t.title, "
+        f"ts_headline('{TS_CONFIG}', {source}, q.query, '{HEADLINE_OPTIONS}') AS snippet "
+        f"FROM hits h CROSS JOIN q JOIN task t ON t.id = h.task_id LEFT JOIN comment c ON c.id = h.comment_id "
+        f"ORDER BY h.rank DESC, h.task_id, h.comment_id NULLS FIRST"
+    )
+    return await connection.execute_query_dict(sql, params.values)
+
+
+def _escape_html_sql(expression: str) -> str:
+    # Сущности (&lt; и т.п.) парсер tsvector не считает словами: совпадения и ранги не меняются
+    for char, entity in _HTML_ESCAPES:
+        literal = char.replace("'", "''")
+        expression = f"replace({expression}, '{literal}', '{entity}')"
+    return expression
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Слова в нижнем регистре (ё приравнивается к е), без однобуквенных"""
+    return [_normalize(token) for token in _TOKEN.findall(text or "") if len(token) > 1]
+
+
+def _normalize(token: str) -> str:
+    return token.lower().replace("ё", "е")
+
+
+def highlight(text: Optional[str], terms: Set[str], max_words: int = SNIPPET_WORDS) -> str:
+    """Фрагмент текста вокруг первого совпадения: экранированный HTML, найденные слова в <b></b>"""
+    words = list(_TOKEN.finditer(text or ""))
+    if not words:
+        return ""
+    first = next((index for index, word in enumerate(words) if _normalize(word.group()) in terms), 0)
+    start = max(0, first - max_words // 3)
+    end = min(len(words), start + max_words)
+    parts, position = [], words[start].start()
+    for word in words[start:end]:
+        parts.append(html.escape(text[position:word.start()]))
+        parts.append(f"<b>{word.group()}</b>" if _normalize(word.group()) in terms else word.group())
+        position = word.end()
+    return "".join(parts)
+
+
+class InvertedIndex:
+    """Инвертированный индекс в памяти процесса - замена tsvector для SQLite (без морфологии)"""
+
+    # Веса полей как у ts_rank для setweight A и B
+    WEIGHTS = {"title": 1.0, "description": 0.4, "content": 0.4}
+
+    def __init__(self):
+        # {слово: {("task"|"comment", id): вес}}
+        self._postings: Dict[str, Dict[Tuple[str, int], float]] = {}
+        self._docs: Dict[Tuple[str, int], dict] = {}
+        self._stale = True
+        self._loaded_at = 0.0
+
+    def _add(self, key: Tuple[str, int], field: str, text: Optional[str]):
+        for token in tokenize(text):
+            postings = self._postings.setdefault(token, {})
+            postings[key] = postings.get(key, 0.0) + self.WEIGHTS[field]
+
+    async def load(self):
+        self._postings, self._docs = {}, {}
+        for task in await models.Task.all().values("id", "title", "description"):
+            key = ("task", task["id"])
+            self._docs[key] = task
+            self._add(key, "title", task["title"])
+            self._add(key, "description", task["description"])
+        for comment in await models.Comment.all().values("id", "task_id", "content"):
+            key = ("comment", comment["id"])
+            self._docs[key] = comment
+            self._add(key, "content", comment["content"])
+        self._stale = False
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._stale = True
+
+    async def _ensure_loaded(self):
+        # TTL страхует от изменений, сделанных в другом воркере
+        if self._stale or time.monotonic() - self._loaded_at > config.SEARCH_INDEX_TTL:
+            await self.load()
+
+    async def search(self, q: str, user_id: Optional[int], user_role: Optional[str], skip: int = 0,
+                     limit: int = 20) -> List[dict]:
+        terms = set(tokenize(q))
+        if not terms:
+            return []
+        await self._ensure_loaded()
+
+        # Все слова запроса должны встретиться в документе, как у websearch_to_tsquery
+        scores: Optional[Dict[Tuple[str, int], float]] = None
+        for term in terms:
+            postings = self._postings.get(term, {})
+            if scores is None:
+                scores = dict(postings)
+            else:
+                scores = {key: score + postings[key] for key, score in scores.items() if key in postings}
+            if not scores:
+                return []
+
+        task_ids = {self._task_id(key) for key in scores}
+        # Права доступа проверяются в SQL тем же условием, что и у списка задач
+        visible = await visible_task_ids(task_ids, user_id, user_role)
+        keys = sorted((key for key in scores if self._task_id(key) in visible),
+                      key=lambda key: (-scores[key], self._task_id(key), key[0] == "comment", key[1]))
+
+        hits = []
+        for key in keys[skip:skip + limit]:
+            task = self._docs.get(("task", self._task_id(key)), {})
+            if key[0] == "task":
+                text = " ".join(filter(None, (task.get("title"), task.get("description"))))
+            else:
+                text = self._docs[key]["content"]
+            hits.append({
+                "type": key[0],
+                "task_id": self._task_id(key),
+                "comment_id": key[1] if key[0] == "comment" else None,
+                "rank": scores[key],
+                "title": task.get("title", ""),
+                "snippet": highlight(text, terms),
+            })
+        return hits
+
+    def _task_id(self, key: Tuple[str, int]) -> int:
+        return key[1] if key[0] == "task" else self._docs[key]["task_id"]
+
+
+fallback_index = InvertedIndex()
+
+
+def invalidate():
+    """Сброс индекса SQLite после изменения задач или комментариев (в PostgreSQL tsvector обновляется сам)"""
+    fallback_index.invalidate()
@@ -0,0 +1,102 @@
+"""Пул для хеширования паролей Argon2 вне event loop"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from passlib.context import CryptContext
+import config
+import metrics
+
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+
+class HashPoolSaturated(Exception):
+    """Очередь пула хеширования заполнена"""
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHashPool:
+    """Пул потоков или процессов с ограниченной очередью"""
+
+    def __init__(self, mode: str, workers: int, queue_size: int):
+        self.mode = mode
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        elif mode == "thread":
+            # argon2-cffi отпускает GIL, поэтому потоки дают настоящий параллелизм
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, func, *args):
+        if self._executor is None:
+            # Пул выключен: хешируем прямо в event loop, как раньше
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                HASH_LATENCY.observe(time.perf_counter() - started, operation=func.__name__)
+
+        if self.pending >= self.capacity:
+            HASH_REJECTED.inc()
+            raise HashPoolSaturated()
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            HASH_LATENCY.observe(time.perf_counter() - started, operation=func.__name__)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_pool: Optional[PasswordHashPool] = None
+
+
+def get_pool() -> PasswordHashPool:
+    global _pool
+    if _pool is None:
+        _pool = PasswordHashPool(
+            mode=config.PASSWORD_HASH_POOL,
+            workers=config.PASSWORD_HASH_WORKERS,
+            queue_size=config.PASSWORD_HASH_QUEUE_SIZE,
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """Остановка пула (при следующем обращении он будет создан заново по config)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+HASH_LATENCY = metrics.Histogram(
+    "password_hash_seconds", "Время хеширования/проверки пароля, включая ожидание в очереди",
+    labels=("operation",),
+)
+HASH_REJECTED = metrics.Counter(
+    "password_hash_rejected_total", "Операции, отклоненные из-за переполненной очереди пула"
+)
+metrics.Gauge("password_hash_queue_depth", "Операции в очереди пула хеширования",
+              callback=lambda: _pool.queue_depth if _pool else 0)
+metrics.Gauge("password_hash_in_flight", "Операции, принятые пулом хеширования",
+              callback=lambda: _pool.pending if _pool else 0)
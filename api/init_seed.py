@@ -0,0 +1,30 @@
+"""Начальные данные за один запуск: справочники, тестовые пользователи и отметка seed в app_state.
+
+entrypoint.sh запускает скрипт, только если отметки еще нет (или FORCE_SEED=true):
+init_data.py и init_users.py по отдельности - это два процесса и два Tortoise.init.
+"""
+import asyncio
+from datetime import datetime, timezone
+from database import init_db, close_db
+from init_data import create_base_data
+from init_users import create_test_users
+from models import AppState
+
+SEED_MARKER = "seed"
+
+
+async def init_seed():
+    await init_db()
+
+    try:
+        await create_base_data()
+        await create_test_users()
+        await AppState.update_or_create(key=SEED_MARKER,
+                                        defaults={"value": datetime.now(timezone.utc).isoformat()})
+        print("Начальные данные загружены")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(init_seed())
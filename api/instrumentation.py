@@ -0,0 +1,203 @@
+"""Инструментирование HTTP-запросов и SQL-запросов Tortoise для /metrics"""
+import re
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from tortoise import connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+import config
+import metrics
+
+QUERY_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many")
+OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = metrics.Counter(
+    "http_requests_total", "Обработанные HTTP-запросы", labels=("method", "route", "status"),
+)
+HTTP_LATENCY = metrics.Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", labels=("method", "route"),
+)
+HTTP_IN_FLIGHT = metrics.Gauge("http_requests_in_flight", "HTTP-запросы в обработке")
+REQUEST_QUERIES = metrics.Histogram(
+    "http_request_db_queries", "Количество SQL-запросов на HTTP-запрос", labels=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_DB_TIME = metrics.Histogram(
+    "http_request_db_seconds", "Суммарное время SQL-запросов на HTTP-запрос", labels=("method", "route"),
+)
+DB_QUERY_LATENCY = metrics.Histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запроса", labels=("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+
+def statement_shape(sql: str, max_length: int = 300) -> str:
+    """Форма запроса без литералов и плейсхолдеров: одинакова для запросов, отличающихся только данными"""
+    shape = _LITERALS.sub("?", _WHITESPACE.sub(" ", sql).strip())
+    shape = _REPEATED_LISTS.sub("(...)", _PLACEHOLDER_LIST.sub("(...)", shape))
+    return shape[:max_length]
+
+
+def _operation(sql: str) -> str:
+    words = sql[:16].split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+class SlowStatements:
+    """Top-N самых медленных форм запросов (максимальное время по каждой форме)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._slowest: Dict[str, float] = {}
+        self._floor = 0.0
+
+    def record(self, sql: str, duration: float):
+        # Быстрый выход без нормализации SQL, пока запрос не претендует на место в списке
+        if len(self._slowest) >= self.size and duration <= self._floor:
+            return
+        shape = statement_shape(sql)
+        if duration <= self._slowest.get(shape, 0.0):
+            return
+        self._slowest[shape] = duration
+        if len(self._slowest) > self.size:
+            del self._slowest[min(self._slowest, key=self._slowest.get)]
+        if len(self._slowest) >= self.size:
+            self._floor = min(self._slowest.values())
+
+    def snapshot(self) -> Dict[tuple, float]:
+        return {(shape,): duration for shape, duration in self._slowest.items()}
+
+    def clear(self):
+        self._slowest.clear()
+        self._floor = 0.0
+
+
+slow_statements = SlowStatements(config.METRICS_SLOW_STATEMENTS)
+metrics.Gauge("db_slow_statement_seconds", "Самые медленные формы SQL-запросов с момента старта",
+              labels=("statement",), callback=slow_statements.snapshot)
+
+
+class RequestStats:
+    """SQL-нагрузка одного HTTP-запроса"""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_listeners: List[Callable[[str, Optional[list], float], None]] = []
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def add_query_listener(listener: Callable[[str, Optional[list], float], None]):
+    """Подписка на выполненные SQL-запросы: listener(sql, values, duration)"""
+    _listeners.append(listener)
+
+
+def remove_query_listener(listener: Callable[[str, Optional[list], float], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _record_query(sql: str, values: Optional[list], duration: float):
+    DB_QUERY_LATENCY.observe(duration, operation=_operation(sql))
+    if slow_statements.size > 0:
+        slow_statements.record(sql, duration)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += duration
+    for listener in _listeners:
+        listener(sql, values, duration)
+
+
+def _wrap(method):
+    async def timed(client, query, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(client, query, *args, **kwargs)
+        finally:
+            _record_query(query, args[0] if args else kwargs.get("values"), time.perf_counter() - started)
+
+    timed.__wrapped__ = method
+    timed.__name__ = method.__name__
+    timed._instrumented = True
+    return timed
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def install_query_hook(client_class):
+    """Замер execute_* у классов клиента БД и его транзакционных оберток.
+
+    Оборачиваются только классы, где метод определен, чтобы запрос не учитывался дважды.
+    """
+    for name in QUERY_METHODS:
+        owner = next((cls for cls in client_class.__mro__ if name in cls.__dict__), None)
+        if owner is None or owner is BaseDBAsyncClient:
+            continue
+        for cls in (owner, *_subclasses(owner)):
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "_instrumented", False):
+                setattr(cls, name, _wrap(method))
+
+
+def ensure_query_hook():
+    """Установка замера для класса соединения по умолчанию (повторный вызов ничего не делает)"""
+    install_query_hook(type(connections.get("default")))
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware: задержка по шаблону маршрута, запросы в обработке, SQL на запрос"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            # Шаблон маршрута вместо фактического пути, чтобы не плодить метки
+            route = scope.get("route")
+            route = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=status_code)
+            HTTP_LATENCY.observe(duration, method=method, route=route)
+            REQUEST_QUERIES.observe(stats.queries, method=method, route=route)
+            REQUEST_DB_TIME.observe(stats.db_time, method=method, route=route)
@@ -1,15 +1,36 @@
+import startup  # первым: отсчет времени импорта приложения
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-from database import init_db, close_db
-from routers import auth, users, projects, priorities, statuses, tasks, comments, attachments
+from database import init_db, close_db, warm_up_pool
+from hashing import shutdown_pool
+import admission
+import config
+import instrumentation
+import metrics
+import notifications
+import query_tracking
+import refdata
+from routers import auth, users, projects, priorities, statuses, tasks, comments, attachments, search, sync, events
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    with startup.phase("init_db"):
+        await init_db()
+    with startup.phase("warm_up_pool"):
+        await warm_up_pool()
+    with startup.phase("refdata"):
+        await refdata.load_all()
+    with startup.phase("openapi"):
+        startup.load_openapi(app)
+    notifications.check_backend()
+    startup.report()
     yield
+    await notifications.hub.stop()
     await close_db()
+    shutdown_pool()
 
 
 app = FastAPI(
@@ -18,14 +39,26 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if config.ADMISSION_ENABLED:
+    # Внутри CORS: ответ 503 тоже получает CORS-заголовки и виден браузерному клиенту
+    app.add_middleware(admission.AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Браузерным клиентам нужен ETag ответа для If-None-Match и If-Match
+    expose_headers=["ETag"],
 )
 
+if config.METRICS_ENABLED:
+    app.add_middleware(instrumentation.InstrumentationMiddleware)
+
+if config.QUERY_TRACKING != "off":
+    app.add_middleware(query_tracking.QueryTrackingMiddleware)
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(projects.router)
@@ -34,6 +67,9 @@ app.include_router(statuses.router)
 app.include_router(tasks.router)
 app.include_router(comments.router)
 app.include_router(attachments.router)
+app.include_router(search.router)
+app.include_router(sync.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -48,3 +84,11 @@ async def read_root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    return metrics.render()
+
+
+startup.mark("imports")
@@ -0,0 +1,123 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "priority" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(20) NOT NULL UNIQUE,
+    "level" INT NOT NULL,
+    "color" VARCHAR(7) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "status" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(30) NOT NULL UNIQUE,
+    "order_num" INT NOT NULL,
+    "is_final" BOOL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "user" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "username" VARCHAR(50) NOT NULL UNIQUE,
+    "email" VARCHAR(100) NOT NULL UNIQUE,
+    "password_hash" VARCHAR(255) NOT NULL,
+    "full_name" VARCHAR(100),
+    "role" VARCHAR(20) NOT NULL,
+    "is_active" BOOL NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "project" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(100) NOT NULL,
+    "description" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "created_by_id" INT REFERENCES "user" ("id") ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS "task" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "title" VARCHAR(200) NOT NULL,
+    "description" TEXT,
+    "due_date" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "created_by_id" INT REFERENCES "user" ("id") ON DELETE SET NULL,
+    "priority_id" INT REFERENCES "priority" ("id") ON DELETE SET NULL,
+    "project_id" INT NOT NULL REFERENCES "project" ("id") ON DELETE CASCADE,
+    "status_id" INT REFERENCES "status" ("id") ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS "attachment" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "filename" VARCHAR(255) NOT NULL,
+    "filepath" VARCHAR(500) NOT NULL,
+    "size" BIGINT,
+    "mime_type" VARCHAR(100),
+    "uploaded_at" TIMESTAMPTZ NOT NULL,
+    "task_id" INT NOT NULL REFERENCES "task" ("id") ON DELETE CASCADE,
+    "user_id" INT REFERENCES "user" ("id") ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS "comment" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "content" TEXT NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL,
+    "task_id" INT NOT NULL REFERENCES "task" ("id") ON DELETE CASCADE,
+    "user_id" INT REFERENCES "user" ("id") ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS "aerich" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "version" VARCHAR(255) NOT NULL,
+    "app" VARCHAR(100) NOT NULL,
+    "content" JSONB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "task_assignee" (
+    "task_id" INT NOT NULL REFERENCES "task" ("id") ON DELETE CASCADE,
+    "user_id" INT NOT NULL REFERENCES "user" ("id") ON DELETE CASCADE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS "uidx_task_assign_task_id_9674dd" ON "task_assignee" ("task_id", "user_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
+
+
+MODELS_STATE = (
+    "eJztXW1zmzgQ/ise7ks74+skOIlz981O3TbXxO407l2nNzeMDIrNBZAP5Ka+Xv77SYBAvA"
+    "hD/AZUXzKJtAvSo2W1+6wg3xUbGdDyXg0wBvrChg5Wfu18VxxgQ/JLTm+3o4DlMu6jDRjM"
+    "LF8cJOVmHnaBTq94DywPkiYDerprLrGJHNLqrCyLNiKdCJrOPG5aOeY/K6hhNId4AV3S8e"
+    "dfpNl0DPgNeuzP5YN2b0LLSAzZNOi9/XYNr5d+27WD3/iC9G4zTUfWynZi4eUaL5ATSZvB"
+    "8OfQgS7AkF4euys6fDq6cK5sRsFIY5FgiJyOAe/BysLcdGda3KZo2ngy1e5GU01TKgCkI4"
+    "eCS4bq+bOf0yH8rJ6e9c8uexdnl0TEH2bU0n8Kbh0DEyj68IynypPfDzAIJHyMY1DvTQv6"
+    "v2egvVoANx9bXieFMBl6GmGGZxHErCHGOLarQ4Bsg28amdMcLyiy5+cFkP4++Hj1bvDxBZ"
+    "F6SW+JyIMQPCPjsEsN+ijuSZyXgFy/Is5Mp4U4n5+clMCZSAlx9vuSOHvmvzm2PDTnQk/B"
+    "NDb7ihyEQ1dQG4ADb/GLqvZ6ffWkd3F5ftbvn1+eRG4j21XkP4bXb6kLScDPfAq3l5g2DH"
+    "CrYNwJpWdZd92wTxj3aSnjPi0w7tOsca+WFgIGNDSAs1C/JkhhAmo+3CnVFOBGqPuK/dJE"
+    "5+JCYEwcax2aRgH80+vb0d10cPuB3s72vH8sH8DBdER7VL91nWp9cZFaqeginT+up+869M"
+    "/Ol8l45MOLPDx3/TvGctMvCh0TWGGkOehRAwYXTLBWhlpi3THwHrRK4Q+n8Sy/VrvF3UkY"
+    "xD1JHnSrIcpptGin2ApQGqnfP+SGldT+suC+QS405857uPYxviYjAo6etwOE6ck0vEzDrP"
+    "WJGQ9rjdffBY9RasM/pWTuZMYQB7vm4O5q8HqkZEx2B5B+Ci/TLHMtiyj3lCYQJffvjD/d"
+    "3Ci+0c6A/vAIXENLWC/tQSpKtUSy2S5btdMtwAFzHx06DTroEPUrZItScNbVLcq/dU5IJt"
+    "9NcpLdguSb3A6Hq5pEdgq/CaDlVFqREhZFaaPP00SAxmLjF7eDzy8TQdrNZPyWiXOx9NXN"
+    "ZJja+HUSJeJnRdBJTRlANymAXi2NZ656UlOuel1WnWHELXs4epk2ybSp1oDKtEmmTTVDtK"
+    "5p0wfXRK6J10pO3hT1dYsSpyUvJTOnJvnJbkHmVLVkudty5XGhTRYry5QZVHGVQc0UGSz4"
+    "FVoVTDaSlxFTTsREcEI5+4/YUiOFw6X3yk8Xw756eaIcxGKL8GMG2xfaa/9lXgQl3p2SsZ"
+    "WXUxoO1d68/wgt4E9t27iqIUHA0353bvQ31HMJT9a1Yd+OheS23SzvV9dt+9hby/4PCPAj"
+    "y8AsJpVTam04jSF55dosRUMZRskr/4irXoZXZk/sbF2NC83oSUZ0IyMaYyZJvA0kXsa8Kl"
+    "N5x0iW6ua3jpIt3WGAV8FTkUqWwp5uUa7kxTIyVWqS3+vWNlWqEcPZK5Mn9cRpUi+TJSHX"
+    "gK7mrOwKZpvQORzTeVJr6+VcgEcEHZDDGw8RsiBwBM6AU0uBOiN6+0I1ajls4jmcTG4SIe"
+    "7wOp1ZfrodjkjW7xszETKDvVsQJdVrI29I1LTXfdyHKmcXZxCK93BW+Zc7eGt2cGxiq9IW"
+    "Him0kO5US9GdagHdqUq6sz50p0EcDSWnqtJevN4OSK8GrUK9Oa4stSkJbbFnaya1KQntH3"
+    "HVJaF95NSYnUCsBm1KSwKbB6x/RKQqrrySPLKWg2tAJ1eDNaEjjXVjWYs73rRlTYs7TdUw"
+    "uy1b10o+sptP/PNHvrcGN75Us+y3PLiJfUZQMsy6hx2AG5e22gltwieWAFaWuo9S6o4/bb"
+    "clT578ll5LnHHqMLu9A5y4Dx60BaQtawqcMXoeecwhzIH4FjjrKaI/d+sC6kXKF3gAf1pa"
+    "qrLCJulSsyMeIQUkgS8qgCHXX4wHSDN4/pW3aJ3CLu79Qrxw0Wq+iFrZ+ggjEdKuZQB/Ki"
+    "wa+VPIKRqxqYmLRuzdRlk0alRe0C0oGtElrXr0g9dp3fGP83IfiSz4RmS6agRtYOYcVBDj"
+    "Gym0Dty9vISwJE7yERF3ugBepe+dZhTbWAfdy8dlyY21yl/x5ZXaUAM9gGm7qFpFn8kf8F"
+    "1OFhM08dVj09NIFGN+zfuC74ZjZLHeAc+RMcfdqGNksshbztabWe4TFXmfdXjwONRIzbaV"
+    "WjIjjcQodBkhn78lVuXrHk3GSh7f3TfVJsS4Mt/23BeeGsW3sUkK+DaYR7VxfFqaauNYuK"
+    "2ptsg8hEzbALqmvlDy/g9O0NMt/B84sYzk2w4Whu2Zb/sKXS/3+LA4qeNUJEFRjqCgD1UF"
+    "hEPxFqK7F1ZC+Bnp3+4mY0H6JvyMtGHquPNfxzK9Blfo8sClYCQStMw5+PSR924y86IXGF"
+    "Z7D2v37xo9/Q+eSkmi"
+)
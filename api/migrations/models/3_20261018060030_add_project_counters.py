@@ -0,0 +1,71 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "project_counter" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "dimension" VARCHAR(20) NOT NULL,
+    "ref_id" INT NOT NULL,
+    "task_count" INT NOT NULL,
+    "project_id" INT NOT NULL REFERENCES "project" ("id") ON DELETE CASCADE,
+    CONSTRAINT "uid_project_cou_project_ca25d7" UNIQUE ("project_id", "dimension", "ref_id")
+);
+        INSERT INTO "project_counter" ("project_id", "dimension", "ref_id", "task_count")
+        SELECT "project_id", 'status', COALESCE("status_id", 0), COUNT(*) FROM "task" GROUP BY 1, 3
+        UNION ALL
+        SELECT "project_id", 'priority', COALESCE("priority_id", 0), COUNT(*) FROM "task" GROUP BY 1, 3
+        UNION ALL
+        SELECT t."project_id", 'assignee', ta."user_id", COUNT(*)
+        FROM "task" t JOIN "task_assignee" ta ON ta."task_id" = t."id" GROUP BY 1, 3;
+        CREATE INDEX IF NOT EXISTS "idx_task_project_due" ON "task" ("project_id", "due_date");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_task_project_due";
+        DROP TABLE IF EXISTS "project_counter";"""
+
+
+MODELS_STATE = (
+    "eJztXVtzmzgU/ise9iWZ8XYSO4mz+2anbpttYncSZ7fTToeRQbHZYOSC3NTt5r+vBAgkbg"
+    "Zfgeol40jngPTpcK5C/FRmSIem86qLMdCmM2hh5c/GT8UCM0h+JPQ2GwqYz8M+2oDB2HTJ"
+    "gUg3drANNHrFR2A6kDTp0NFsY44NZJFWa2GatBFphNCwJmHTwjK+LqCK0QTiKbRJx+cvpN"
+    "mwdPgdOuzf+ZP6aEBTF4Zs6PTebruKl3O37drCb1xCerexqiFzMbNC4vkST5EVUBve8CfQ"
+    "gjbAkF4e2ws6fDo6f65sRt5IQxJviByPDh/BwsTcdMdq2Kao6mA4Uu/7I1VVCgCkIYuCS4"
+    "bquLOf0CH83jo965xdti/OLgmJO8ygpfPi3ToExmN04RmMlBe3H2DgUbgYh6A+GiZ0f8eg"
+    "vZoCOxlbnieCMBl6FGGGZxbErCHEOJSrfYA8A99VMqcJnlJkz88zIP27e3f1rnt3RKiO6S"
+    "0ReRC8Z2Tgd7W8Poq7iPMckOsXxJnx1BDn85OTHDgTqlSc3T4RZ8f4kSDLPWOSqikYx2pd"
+    "kYCwrwpKA7CnLf5otdrtTuukfXF5ftbpnF+eBGoj3pWlP3rXb6kKEeBnOoWzJcYMergVEG"
+    "6BaS3pLhv2gnCf5hLu0wzhPo0L92JuIqBDXQU4DvVrghQmoCbDHWGNAK77vK/YjyoqFxsC"
+    "fWiZS180MuAfXd/270fd2w/0djPH+Wq6AHZHfdrTcluXkdaji8hKBRdp/HM9eteg/zY+DQ"
+    "d9F17k4Int3jGkG31S6JjAAiPVQs8q0DlngrUy1IR1x8B5Ugu5PxzHWnqtdIu7FTeIe5Ic"
+    "aBdDlOOokaXYCFDqqT8+JbqVVP7i4L5BNjQm1nu4dDG+JiMClpZkAfzwZORfpmLS+sKEh7"
+    "WG62+D5yC04Z9SMncyY4g9q9m9v+q+7isxkd0CpA/+ZaolrnkR5Z5SAVFy/8bg4eZGcYV2"
+    "DLSnZ2DrqiC9tAe1UKQloI13zVqzaAuwwMRFh06DDtpH/QrN0kJw1tXMir81jkgG31VSks"
+    "2M4JvcDvurKiI7gt9ToOVYahESZnlp/Y8jwUFjvvHRbffjseCk3QwHbxk550tf3Qx7EcOv"
+    "ES8Rr+VBi5zSga6SA72Y62uuusgpV70sq84w4pbdH70Mm2TYVGpAZdgkw6aSIVrWsOmDbS"
+    "DbwEslIW4K+ppZgdOcp5KRU5X0ZDMjcipastxuufKw0IrFyjxlhlZ6laEVKzKY8Bs0C4hs"
+    "QC89pgSPieCEEuxPuqQGDPsL75XfLnqd1uWJsheJzcKPCWwnVV47x0keVLp1En0rJ6E07L"
+    "O9eX8HTeBObVO/qiJOwMtuLTf6F2qJCU/WtcJuh0TSbFdL+5XVbB/atOx+gwA/shjM6Unl"
+    "CFsddmPIvHJplqKiGUaZV/4VVz1PXpk9seNlsVxojE9mRFdmREPMZBJvRRIvJl6FU3l82L"
+    "qwMLQ3jJd8T//Ku1gFlVhq6BQtM+0nsKwMPHuILJlQpQeYnNitjDNVjSPearz5mQ9ldWLL"
+    "LccXBRs+0gf1i4xIDxiRCiuSNywVmGoYm24/qezLen75DRn2l1Y+KbUMR/Y1uAqrAKAikw"
+    "Q1CiozBIWkVGSSBZDV/jxnDDd05rk0csUgzuvQi9KVvNXhMHX5ewzwwknyvfyeTJ/LCWlk"
+    "ar9Kz3WWIyUr8r7z1M7jPLXTnad2zHlCtg5t1VrMCoitwCOtfdTaGw4htEDCPoceQiYEVo"
+    "oy4NgioI4J365QDVr2WyjpDYc3Qkq2dx2thDzc9vp3R6euMBMiw7NOKV6ArNKXLZfiQpVg"
+    "xRmE6Tac7VSVFrw2Fhwb2CxkwgOGWqZA8uVAspIgsjy/jtXZSXleJ4qGFlOLlml5vi0UaS"
+    "u0CuWuycZL8XIDRrpmq2YpXm7A+BVXXW7AOHgi3HtjpmgmXOCSwMoKw75w9dLJxWAVeKSw"
+    "yrLNnss2SQp3K+CGl6qW/OYHV7AzKVvc4uphC+CGpa16QivoxBzAyq2ZB9maGR7FvGGeXD"
+    "z7uSbKOPLy5WwLOHEHdNUFpA1rCpwwOg55zCFMgPgWWMsRon+3qwLKlZTP0ADutNRIZYVN"
+    "0qZiRzRCBEgCX1AAQ7a7GE+QRvD8EQ3BOvld3HkYeGqjxWQatLL1SfVESLsaA/wls2jkTi"
+    "GhaMSmll40YmdxyKJRpeKCZkbRiC5p0a0fPE/ttn+c5zvUPONM82jVCM6AkbBRIR3fgKF2"
+    "4O7kpdk5UZLPiKjTKXAKnc8fY6xjHXQnH0MgN1YLf3WCZ6pDDXQPom2jYhV9Rr/Hs0eYT1"
+    "DFtxoMRyVejPEt6YsTK7aRhXx73EfGFHeltpHJIm8+Wa9muS+tyLvW5sHDpEZKZlZKmRmp"
+    "JEa+yvDz+dt5F7rmWMntu7tOtaViXDjftu5L55XKt7FJpuTbYFKqjcunRVNtXBZu41RbIB"
+    "6pmbYutA1tqiTk2vyeZuY3G0MamW/bmxu243zbN2gXfVudY5EJinwJCvpQFUDYJ68hujvJ"
+    "SqR+9uSv++EgJXxL/eyJbmi48V/DNJwKV+iSwKVgCAFabB98dMt7U4y86AV6xd7D2v67Ri"
+    "//Az/quas="
+)
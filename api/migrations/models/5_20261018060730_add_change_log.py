@@ -0,0 +1,66 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "change_log" (
+    "id" BIGSERIAL NOT NULL PRIMARY KEY,
+    "entity" VARCHAR(20) NOT NULL,
+    "entity_id" INT NOT NULL,
+    "op" VARCHAR(10) NOT NULL,
+    "project_id" INT,
+    "task_id" INT,
+    "audience" TEXT,
+    "created_at" TIMESTAMPTZ NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "change_log";"""
+
+
+MODELS_STATE = (
+    "eJztXW1zmzgQ/ise7ks64+skdhLn7pudOm2uid1J3LtOOx1GBsXmgpELclO3l/9+EiCQeA"
+    "vENgaiLxlH2gXxaFntPivgl7JAOjSd132MgTZfQAsrf7Z+KRZYQPIjobfdUsByGfbRBgym"
+    "pisORLmpg22g0SPeAdOBpEmHjmYbS2wgi7RaK9OkjUgjgoY1C5tWlvFtBVWMZhDPoU06vn"
+    "wlzYalwx/QYf8u79U7A5q6MGRDp+d221W8Xrptlxa+cAXp2aaqhszVwgqFl2s8R1YgbXjD"
+    "n0EL2gBDenhsr+jw6ej8a2VX5I00FPGGyOno8A6sTMxd7lQN2xRVHY0n6u1woqpKAYA0ZF"
+    "FwyVAd9+pndAi/d46Oe8dn3dPjMyLiDjNo6T16pw6B8RRdeEYT5dHtBxh4Ei7GIah3hgnd"
+    "3zFoz+fATsaW14kgTIYeRZjhmQUxawgxDu2qDJAX4IdKrmmG5xTZk5MMSP/u35y/698cEK"
+    "lX9JSI3AjePTLyuzpeH8VdxHkJyPEL4sx0GojzyeFhDpyJVCrObp+Is2P8TLDlgTFL9RRM"
+    "42lfkYCw7woqA7DnLf7odLrdXuewe3p2ctzrnZwdBm4j3pXlPwaXb6kLEeBnPoVbS4wF9H"
+    "ArYNyC0rOsu2rYC8Z9lMu4jzKM+yhu3KuliYAOdRXgONRvCFKYgJoMd0Q1Arju675mP+ro"
+    "XGwI9LFlrn3TyIB/cnk9vJ30rz/Q0y0c55vpAtifDGlPx21dR1oPTiMzFRyk9c/l5F2L/t"
+    "v6PB4NXXiRg2e2e8ZQbvJZoWMCK4xUCz2oQOeCCdbKUBPmHQPnXi0U/nAaz/JrlZvcrYRB"
+    "3J3kQLsYopxGg1aKjQClkfrdfWJYSe0vDu4FsqExs97DtYvxJRkRsLSkFcBPTyb+YWpmrY"
+    "/MeFhrOP82eAhSG/4uJddOrhhib9Xs35733wyVmMluAdKP/mHqZa55EeXuUgFRcv7W6OPV"
+    "leIa7RRo9w/A1lXBemkP6qBISyAb71p0FtEWYIGZiw69DDpoH3USB1kzeIVmSkISHna2s3"
+    "JwzRVTTV+uMjl4VnDdsDS8lMA6PVmHFjbwukiUHWo0MIHs5AmxO+kRdicWYHtwFQsMBB0Z"
+    "bCUEW2hZxGQ96Qaa61G+jDAjIYya69JG/0INF7NXUUnGsnF7LT/dajigYKUb0I9KRUQn8E"
+    "cKpLxOE+ihLDpi+GkiMBHsnj+47n96JbARV+PRWybO+Yjzq/EggrlmQ4rNM6giUVMyRVVn"
+    "imJp+J5SHLRIqzKyrnZmesMJVSa3eSmJzc7qi+R02J/VvJ6fU2lEFCg9f2WmomGeX6wN6c"
+    "+cdVFTznpVZp1hxE27P3pZGZKVoUoDKitDsjJUMUSrWhn6YBvIphx9Qt4U9LWzEqclLyUz"
+    "pzr5yXZG5lR0V+Z2d2TuF9odl3lM+B2aBUw2kJcRU0LERHBCCetPuqUGCuWl98pvp4Ne5+"
+    "xQKcVis/BjBttLtdfeq6QIKn11EmMrJz4TA1/t4v0NNIF7aZvGVTUJAh53u3K7hbTkhdvr"
+    "emLdDoXksl0v71fVZXvfS8vu90DzI4vBnE4qR9RkRVHyypJhlLzyS5z1PLwyu2OnBTfDxf"
+    "QkI/okIxpiJkm8J0i8mHkVpvL4tHVlYWhvmC/5kf65d7AaOrHU1ClaZionsawNPCVklsyo"
+    "0hNMzuyezDNVjRPear75hU9ldbKWW45vCja8ozfqV5mR7jEjFWYkb1oqKDUwN90+qezben"
+    "77DRXKo5UPK23DkX0NrsMqAKioJEGNgrqvxwUq5wl2G89zi+GGwTxHI9cM4rwBvWhdyVsd"
+    "9lOXv8UAr5yk2MvvyYy5nFBGUvt1uq+zAilZkfeDp26e4KmbHjx1Y8ETsnVoq9ZqUcBsBR"
+    "252kdXe8MhghZI2OcwQMiEwEpxBpxaBNQp0dsVqkFLuYWSwXh8JVCyg8toJeTj9WB4c3Dk"
+    "GjMRMrzVKSUKkFX6qnEpLlQJqziDMH0NZztV5QremBUcG9gstIQHCo2kQPJxIFkkiCzPP2"
+    "fV2Ul5XieOhhZTi5Zpeb0tFGlrNAvVrsnGS/FyA0a6Z6tnKV5uwHiJsy43YOydCPeemCnK"
+    "hAtaElhZYSgLV49OLgaroCONVZZtSi7bJDncrYAbHqpe9psfXGGdSdniFncPWwA3LG01E1"
+    "rBJ+YAVm7N3MvWzPBrMxvy5OLnbRrijCMPXy62gBP3gq6mgLRhTYEzRschtzmECRBfA2s9"
+    "QfTvdl1AtUj5DA/gXpYaqaywi7Sp2RGPEAGSwBcUwJDtTsY9pBk8/4qGYJ78Lu59GHhuo9"
+    "VsHrSy+UmNREi7GgP8MbNo5F5CQtGIXVp60Yi9i0MWjWqVF7QzikZ0Sotu/eB1Grf94yTf"
+    "d5syPtsUe+/2AhgJGxUy3mvOFBoH7k4eml0SJ/mAiDudA6fQJ8hiik2sg+7ke2/kxGrhD+"
+    "vxSk2ogZZg2jYqVtFn8iW+e4TFBHV8qsFwVBLFGN+TPqr3xDayUK/EfWTMcddqG5ks8uaz"
+    "9XqW+7bw3u59UyMVW1YqyYzUEiPfZfh8/naehW44VnL77q6ptlSMC/Ntz33ovFZ8G7vIFL"
+    "4NJlFtHJ8Wpdo4Fm5jqi0wj1SmrQ9tQ5srCVyb39PO/Cx9KCP5ttLCsB3zbd+hXfRpdU5F"
+    "EhT5CAp6UxVA2BdvILo7YSVSP3vy1+14lJK+pX72RDc03PqvZRpOjSt0SeBSMIQELbYPPr"
+    "rlvS1mXvQAg2LPYW3/WaPH/wH5nMxn"
+)
@@ -0,0 +1,62 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "app_state" (
+    "key" VARCHAR(50) NOT NULL PRIMARY KEY,
+    "value" TEXT,
+    "updated_at" TIMESTAMPTZ NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "app_state";"""
+
+
+MODELS_STATE = (
+    "eJztXVtzmzgU/ise70s64+04zsXZvtlp2mab2J3E3e2002EUo9hsuBVELtvNf18JEEiACC"
+    "QYA9VLJpbOAenT0bkK+Nk3LBXq7uuJbV8igGD/Te9n3wQG+SfVN+j1gW3HPaQBgSvdJ8Y9"
+    "ihuRXbnIAUuEO66B7kLcpEJ36Wg20iwTt5qerpNGa4kJNXMVN3mm9sODCrJWEK2hgzu+fc"
+    "fNmqnCe+jSn/aNcq1BXeXGewMfyM39DgU92H7j8Ro473xScr8rZWnpnmEy5PYDWltmRI/H"
+    "Q1pX0IQOno3KTIGMMJwubQpGixuQ48FomGrcoMJr4OmImfKVErf1FWU2XyiXJwtF6ZcAaW"
+    "mZBGDNRK6PgAHuFR2aK7TGPw+Gj8F9YiACKnLDvyYXxx8mFzsHw1fkhhZepWD9ZmHPyO96"
+    "9C8BEAgu4uMeA30LdA+moV7Ae5QNdcTwLLBDKCOsKUkMdixkNaCdg+7i5MuCXNlw3R86i+"
+    "rO+eSLD7jxEPaczWfvKTmzCsdn86mPfoy2Z6sEGwWgNORvcQ/SDJgNO8+ZwF4NWV/Tf54j"
+    "9lteir4DgTo39YdQSvKW5vT85HIxOf/Erc/byeKE9Iy4taGtO4eJTRJdpPf36eJDj/zsfZ"
+    "3PTnx4LRetHP+OMd3ia5+MCXjIUkzrTgEqixFtpqMnmu36htlypOEKLG/ugKMqqR5rZIlo"
+    "013GyEi2ABOs/DUj4JJhUoWPEFiuDWiiTHMQ9+YbBJ5uKxZBU9Nb5tQUKKmAOLFLtGD47L"
+    "4I1VFzrcGKDOH30e7+eP9o73D/CJP4w4xaxjn75HS2eEL7X2vY1AAjwwCIbS3LU43B3bbm"
+    "4Uzu6OCggM3FVEKj6/fxep9gZgN8/ZI4U54O4nwwLObb5Dk3wyTOrvZvhixPtZVQU1COp3"
+    "VF872ZUFv8MRrt7Y1Hw73Do4P98fjgaBipjXRXnv6Ynr4nKoSDn+oUxpZgfyPArYRwc0xd"
+    "8CR54d4tJNy7OcK9mxZuz9YtoD7Te+RYpfvYFPcxlGLGe/RR49YdAfdGKeX+MBzP0muNW9"
+    "xK3CBmJ7nQKYcow9EhS/EiQFMRDi+xaXDfWQ7UVuZH+OBjfIpHBMxllgUIw5NFeJmWSesj"
+    "FR7aGq+/A+6i0IbdpXjueMYQBVZzcnk8eXvST4lsBZB+Di/TLnEtiiizSzlE8f17s89nZ/"
+    "3H7UTh2A8yV/DMWvUzgvC4c5AXgy99MkUP6RoTg+c51x0Lw2txrMXBOjSRhkqlxWOODgaQ"
+    "oyIu9kjsYY9SDnYAVznHgOORzlaGs2XZZUQ2oO6guO4WiwhzAsKkuNqO9Q9conLyyjNJXz"
+    "Ytr/WHWx0HFHiqBkOvtGiVkeXpQnqo7kLj0oHPLDTynDJT1PRMUUMKjceWIaoy0q5BbnjD"
+    "EDUmtvlVApuN1Rfx7VC4qkU1P8PSCS9Qav7GLEXHNL88WNTlVRcdLJKVIVkZajigsjIkK0"
+    "MNQ7SplaFPjmY5JEefETdFfYO8wMlmqWTk1CY9OciJnMqeyqz2RGaDHoGovsyjw1uolxDZ"
+    "iF56TBkeE8bJyrA/YkmNGOoL7/u/HU7Ho6NhvxaJzcOPCuxYKK/jV1kelNg68b6Vm16Jac"
+    "j27uMF1IE/tZf6VS1xAh43a7n9Qlq24Q66nrDbMZE02+3Sfk0129s2LZs/A82OLAWzOKmc"
+    "YJMVRZlXlhlGmVf+FVe9SF6Z7tirkofhUnwyI/pkRjTGTCbxnkjipcSrdCqPDVs9E0Hnhf"
+    "FS6OkfBxdroRIThk7JMlM9gWVr4KkhsqRCJQ4wGbF7Ms5UlgxxpfHmNzaUVbEtN91QFBx4"
+    "TTbqdxmRbjEi5VakaFjKMXUwNq0+qRzKenH5jRnqSysPGy3DiXMNvsIqASjPJEFNgrqtxw"
+    "Uapwk2688zxvCFzjyTRm4ZxEUdel66so86bKcuT96S57lZvlfYk+tzuTGNTO23aV/nOVKy"
+    "Ih86T3tFnKc9sfO0l3KeLEeFjmJ6Rgmx5XiktU9ae83FhCbIOOcwtSwdAlOgDBi2BKhXmG"
+    "9TqEYt9RZKpvP5GZeSnZ4mKyGfz6cnFzu7vjBjIi2wTgIvQFbpm5ZL8aHKsOIUQrENpydV"
+    "pQXvjAVHGtJLmfCIoZMpkGI5kLwkiCzPP8fqbKQ8r2JFo4av7C5TpmX5KijStmgVml2TTZ"
+    "fi5QEMsWZrZyleHsD4FVddHsDYeiI8eGKmbCac45LAygpDXbgG6eRysHI8Ulhl2abmsk2W"
+    "wq0E3PhS7ZLf4uBydkZwxC2tHioANy5tdRNaTicWAFYezdzK0cz4azMvzJPzn7fpiDJOPH"
+    "xpVIAT84KuroD0wpoCI4yui7c5hBkQnwPzYWGRv9WqgGYl5XM0gD8tJVFZoZN0iNhhjZAA"
+    "EsMXFcAsx18M8vG+N9wrGqJ1CruY92GgtWN5q3XUStdH6IngdiUF+GNu0cifQkbRiE5NXD"
+    "Si7+KQRaNWxQWDnKIRWdKyRz9Yns4d/6jqm5TMe7cNoGUcVMh5rzll6By4G3lo1sZK8s7C"
+    "6nQN3FKfIEsxdrEOupHvveEbK6U/rMcydaEGWoNoO1a5ij6lr/HdI9QnaONTDZqrYC9Gu8"
+    "36qN4Tx8hivhrPkVHF3apjZLLIW0zW21nuq+C93dtOjTTMrDQyM9JKjEKVEebzq3kWuuNY"
+    "yeO7m061CTEunW977kPnrcq30UkK8m0wK9XG5NOSqTYmC/fiVFskHuLP00NHW677Gbm2sG"
+    "eQ+1n6mEbm22pzwzacb7uFTtmn1RkWmaAolqAgm6oEwiF5B9HdSFZC+NmTPy/nM0H4Jvzs"
+    "iaotUe+/nq65La7QZYFLwOACtNQ5+OSR9wEfeZELTMs9h1X9s0aP/wNFA7tX"
+)
@@ -0,0 +1,65 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # UNLOGGED: состояние лимитов не пишется в WAL и не нужно после сбоя
+    return """
+        CREATE UNLOGGED TABLE IF NOT EXISTS "rate_limit_bucket" (
+    "key" VARCHAR(200) NOT NULL PRIMARY KEY,
+    "tokens" DOUBLE PRECISION NOT NULL,
+    "updated_at" DOUBLE PRECISION NOT NULL
+);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "rate_limit_bucket";"""
+
+
+MODELS_STATE = (
+    "eJztXVtzmzgU/ise70s64+04zsXZvtmJ23rr2J3E2e2002Fko9hsALkgctlu/vtKXCVuhg"
+    "RjoHrJxNI5ID4dzh342daQDFXz7WCzucYAw/a71s+2DjT6T2Su02qDzSaYoQMYLFSbmMxI"
+    "pk+2MLEBlphM3ALVhGRIhubSUDZYQToZ1S1VpYNoSQgVfRUMWbryw4ISRiuI19AgE9++k2"
+    "FFl+EjNL2fmzvpVoGqzK33Dj7Rk9sTEn7a2IPna2C8t0np+RbSEqmWpjPkmye8RrpPT9ZD"
+    "R1dQhwa5Gpm5BLpC93K9IWe1ZAAbFvSXKQcDMrwFloqZS15IwVhbkqazuXQ9mktSOwdIS6"
+    "RTgBUdmzYCGniUVKiv8Jr8POk+O+cJgHCo6An/GlydfxxcHZx039ATIrJLzv5N3ZmePfVs"
+    "HwJg4BzExj0A+h6oFoxCPYePOB5qn+FFYLtQ+lh7JAHYgZCVgHYKuvPRlzk9smaaP1QW1Y"
+    "PLwRcbcO3JnZnMph88cmYXziezoY1+gLa1kSk2EsBRyC/IDFY0GA87zxnCXnZZ33r/vETs"
+    "97wVbQMCeaarT66UpG3N+HJ0PR9cfub252IwH9GZHrc33ujBaegm8Q/S+ns8/9iiP1tfZ9"
+    "ORDS8y8cqwzxjQzb+26ZqAhZGkowcJyCxG3rC3eqrZbu+YW44OLMDy7gEYshSZQT2URBud"
+    "0npaeAToYGXvGQWXLtNT+BiD5VqDOo41B8FsukHg6fZiERQ5esuM9QQl5RCH7hLFWT57X7"
+    "jqqLrWYEWX8Hvv8Lh/fHZ0enxGSOxl+iP9lPtkPJ1v0f63CjE1QIsxAMm2luUpxuDuW/Nw"
+    "Jrd3cpLB5hKqRKNrz/F6n2K2AeT4OXH2eBqI80k3m2+T5tx0wzibyr8xsjxUVomawuPYri"
+    "uq78242uKPXu/oqN/rHp2enRz3+ydnXV9tRKfS9Mdw/IGqEA5+T6cwtoT4Gw5uOYSbY2qC"
+    "J8kL92Em4T5MEe7DqHBbGxUB+YXeI8cq3MequI+uFDPeo40at+8YmHdSLveH4XiRXqvc5h"
+    "biBjF3kgmNfIgyHA2yFK8CNBLh8BIbBfc9MqCy0j/BJxvjMVkR0JdxFsANT+buYWomrc+e"
+    "8Hijwf4b4MEPbdi7lFw7uWKIHas5uD4fXIzaEZEtANIb9zD1EtesiDJ3KYcoOX9rejOZtJ"
+    "/3E4UTP0hfwQlatWOC8GCykxaDL20ySXXpKhODpznXDQvDS3Gsk4N1qGMF50qLBxwNDCB7"
+    "WVzsXrKH3Ys42A5c+RwDjkc4WzHOFtrkEVmHuoHiepgtIkwJCMPiujHQP3CJ88krzyR82a"
+    "i8lh9uNRxQYMkKdL3SrFVGlqcJ6aGyC41LA76w0MhzikxR1TNFFSk0niMtqcroTXVSwxuG"
+    "qDKxza8S2OysvkhOh91dzar5GZZGeIFC81dmKxqm+UVjUZN3PamxSFSGRGWo4oCKypCoDF"
+    "UM0apWhj4bCjJojj4mbvLnOmmB04alEpFTnfRkJyVyytuVWWxHZoUegSi+zKPCe6jmEFmf"
+    "XnhMMR4TwQnF2J9kSfUZygvv27+dDvu9s267FIlNw88T2H6ivPbfxHlQydaJ963M6E4MXb"
+    "b3n66gCuxLe61fVRMn4Hm3ltsupMUbbmdqi90OiITZrpf2q6rZ3rdp2X0PNLuyCMzJSeUQ"
+    "m6goiryyyDCKvPKvuOtZ8sreHbvI2QwX4RMZ0a0Z0QAzkcTbksSLiFfuVB4btlo6hsYr4y"
+    "XX0z93DlZDJZYYOoXLTOUElrWBp4TI0hOq5ACTEbutcaa0ZIgLjTe/saGsTGy5brqiYMBb"
+    "eqN+FxHpHiNSbkeyhqUcUwNj0+KTyq6sZ5ffgKG8tHK30jIc6muwFVYOQHkmAWoY1H09Ll"
+    "A5TbBbf54xhq905pk0cs0gzurQ89IV3+qwn7r8FQF7omgKHlrLOxib5Q+TpHphdPMklVJL"
+    "i4BcvFpvn3XlbD5AmhOw9e16GN0RPypGF6gIJJkxnyUE+S3lqa8yiEP5YnYznIxan69G5+"
+    "Pr8WzKJ8LsSTpEBhRHK1yNBpMcr9RLgTk1PSmg9qGuyOMl9K2llhmnht2ZVO1rBjSi1Fon"
+    "PytNt4oOKdeSHWUxZEfJduwoEswiQ4aGpFtaDrHleET0FY6+FJMQ6iCm72yIkAqBnqAMGL"
+    "YQqAvCtytU/ZFyjdRwNptwJbLhOFyZvrkcjq4ODt/wxiohKhNdU1XLbdtQxVhxD8JkG+49"
+    "OSAseGMsOFawmsuE+wyNTEkXFo+KdqlcVmcn7VIyUTSy+wmFPG0zLF8BTTM12oVq98hEW6"
+    "NEQ1yyZqtna5RoiPsVd100xO29MOk8wZi3MslxCWBFxbcsXJ10cj5YOR4hrKKMXnIZPU7h"
+    "FgJucKh6yW92cDk7k9ByHFUPBYAblLaaCS2nEzMAK1rl99IqH3z965V5cv5zYw1RxqGH4b"
+    "UCcGJemNgUkF5ZU2CE0TTJbQ5hDMSXQH+aI/q3WBVQraR8igawL0sKVVa8izSo2BGNEAKS"
+    "wOcXwJBhbwbt+HrHvTLH3yd3ink/EV4byFqt/VFvfxI9ETIuRQB/Ti0a2ZcQUzTyLi25aO"
+    "S9G0kUjWoVF3RSikZ0S/O2frA8jWv/KOobwcx3EDSgxDQqpHxnwmNoHLg7eYnBhijJB0TU"
+    "6RqYuT4JGWFsYh10J9/fJCeWcn/olGVqQg20BNE2UL6Kvkdf4rugPJ+gjk+ZKaZEvBjlPu"
+    "4jp1vayAK+EvvIPMVdqzYyUeTNJuv1LPcV8B2FfadGKmZWKpkZqSVGrspw8/nFvJui4ViJ"
+    "9t1dp9oSMc6db3vpS0BqlW/zLjIh3wbjUm1MPi2camOycK9OtfnikZhpG0BDWa7bMbk2d6"
+    "aTlm0DAY3It5Xmhu0433YPjbxvD2FYRIIiW4KC3lQ5EHbJG4juTrISiZ+h+vN6Nk0I3xI/"
+    "QyUrS9z6r6UqZo0rdHHgUjC4AC3SBx9uee/wkRc9wHDfzww//w+NZoUw"
+)
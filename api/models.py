@@ -105,3 +105,48 @@ class Attachment(Model):
 
     class Meta:
         table = "attachment"
+
+
+class ProjectCounter(Model):
+    id = fields.IntField(pk=True)
+    project = fields.ForeignKeyField('models.Project', related_name='counters', on_delete=fields.CASCADE)
+    dimension = fields.CharField(max_length=20)  # status, priority или assignee
+    ref_id = fields.IntField(default=0)  # 0 - задачи без статуса или приоритета
+    task_count = fields.IntField(default=0)
+
+    class Meta:
+        table = "project_counter"
+        unique_together = (("project", "dimension", "ref_id"),)
+
+
+class ChangeLog(Model):
+    id = fields.BigIntField(pk=True)
+    entity = fields.CharField(max_length=20)  # project, task, comment или attachment
+    entity_id = fields.IntField()
+    op = fields.CharField(max_length=10)  # upsert или delete
+    # Без внешних ключей: записи переживают удаление объектов
+    project_id = fields.IntField(null=True)
+    task_id = fields.IntField(null=True)
+    audience = fields.TextField(null=True)  # ",1,5," - кто видел объект до удаления или смены доступа
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "change_log"
+
+
+class AppState(Model):
+    key = fields.CharField(max_length=50, pk=True)  # например, seed - начальные данные загружены
+    value = fields.TextField(null=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "app_state"
+
+
+class RateLimitBucket(Model):
+    key = fields.CharField(max_length=200, pk=True)  # правило:user:id или правило:ip:адрес
+    tokens = fields.FloatField()
+    updated_at = fields.FloatField()  # секунды Unix по часам БД
+
+    class Meta:
+        table = "rate_limit_bucket"
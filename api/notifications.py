@@ -0,0 +1,263 @@
+"""Уведомления об изменениях задач, комментариев и вложений для /ws и /events"""
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+import changelog
+import config
+from database import get_connection
+
+logger = logging.getLogger("notifications")
+
+CHANNEL = "task_events"
+# NOTIFY ограничен 8000 байтами, оставляем запас
+NOTIFY_PAYLOAD_LIMIT = 7500
+# Пакетов событий, ожидающих рассылки в процессе
+INBOX_SIZE = 10000
+# Служебные поля события, которые не уходят клиентам
+_PRIVATE = ("audience", "revoked")
+
+RESYNC = json.dumps({"type": "resync"})
+PING = json.dumps({"type": "ping"})
+
+
+def _event(kind: str, action: str, object_id: int, task_id: int, **extra) -> dict:
+    event = {"type": f"{kind}.{action}", "id": object_id, "task_id": task_id}
+    event.update((key, value) for key, value in extra.items() if value is not None)
+    return event
+
+
+def task_event(action: str, task_id: int, project_id: int, audience: Optional[str] = None,
+               revoked: Optional[str] = None) -> dict:
+    """Событие задачи; audience - круг доступа (обязателен для удаленной), revoked - круг до изменения"""
+    return _event("task", action, task_id, task_id, project_id=project_id, audience=audience, revoked=revoked)
+
+
+def comment_event(action: str, comment_id: int, task_id: int) -> dict:
+    return _event("comment", action, comment_id, task_id)
+
+
+def attachment_event(action: str, attachment_id: int, task_id: int) -> dict:
+    return _event("attachment", action, attachment_id, task_id)
+
+
+def _user_ids(audience: Optional[str]) -> Set[int]:
+    return {int(user_id) for user_id in (audience or "").split(",") if user_id}
+
+
+class Subscription:
+    """Соединение клиента: ограниченная очередь готовых к отправке сообщений"""
+
+    __slots__ = ("user_id", "is_admin", "queue", "closed")
+
+    def __init__(self, user_id: int, is_admin: bool):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.EVENTS_QUEUE_SIZE)
+        self.closed = False
+
+    def offer(self, message: str):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: вместо роста памяти - resync и закрытие, догонит через /sync
+            self.close(RESYNC)
+
+    def close(self, message: Optional[str] = None):
+        """Очистка очереди; клиент получит message (если задано) и соединение закроется"""
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        if message:
+            self.queue.put_nowait(message)
+        self.queue.put_nowait(None)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Следующее сообщение, "" по таймауту (keepalive) или None - соединение нужно закрыть"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ""
+
+
+class Hub:
+    """Рассылка событий подписчикам процесса; с EVENTS_BACKEND=postgres - между воркерами через NOTIFY"""
+
+    def __init__(self):
+        self._by_user: Dict[int, Set[Subscription]] = {}
+        self._admins: Set[Subscription] = set()
+        self._inbox: Optional[asyncio.Queue] = None
+        self._loop = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def connections(self) -> int:
+        return len(self._admins) + sum(len(subs) for subs in self._by_user.values())
+
+    async def subscribe(self, user_id: int, user_role: Optional[str]) -> Subscription:
+        self._ensure_started()
+        subscription = Subscription(user_id, user_role == "admin")
+        if subscription.is_admin:
+            self._admins.add(subscription)
+        else:
+            self._by_user.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        if subscription.is_admin:
+            self._admins.discard(subscription)
+            return
+        subs = self._by_user.get(subscription.user_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._by_user[subscription.user_id]
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Первая подписка в этом event loop (или loop сменился, например в тестах)
+        self._by_user, self._admins = {}, set()
+        self._loop = loop
+        self._inbox = asyncio.Queue(maxsize=INBOX_SIZE)
+        self._tasks = [loop.create_task(self._dispatch_loop())]
+        if config.EVENTS_BACKEND == "postgres":
+            self._tasks.append(loop.create_task(self._listen_loop()))
+
+    async def stop(self):
+        """Закрытие соединений и фоновых задач (при остановке приложения)"""
+        for subscription in [*self._admins, *(sub for subs in self._by_user.values() for sub in subs)]:
+            subscription.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._by_user, self._admins, self._tasks = {}, set(), []
+        self._loop = self._inbox = None
+
+    async def publish(self, events: List[dict]):
+        """Публикация событий из crud после записи изменений"""
+        if not events:
+            return
+        if config.EVENTS_BACKEND == "postgres":
+            await self._notify(events)
+        elif self._loop is not None and (self._by_user or self._admins):
+            self._enqueue(events)
+
+    async def _notify(self, events: List[dict]):
+        # Остальные воркеры (и этот) получат события через LISTEN
+        connection = get_connection()
+        for payload in _payloads(events):
+            await connection.execute_query("SELECT pg_notify($1, $2)", [CHANNEL, payload])
+
+    def _enqueue(self, events: List[dict]):
+        try:
+            self._inbox.put_nowait(events)
+        except asyncio.QueueFull:
+            logger.warning("Очередь рассылки событий переполнена, клиентам отправлен resync")
+            self._close_all(RESYNC)
+
+    def _close_all(self, message: Optional[str] = None):
+        for subscription in [*self._admins, *(sub for subs in self._by_user.values() for sub in subs)]:
+            subscription.close(message)
+
+    async def _dispatch_loop(self):
+        # Одна задача на процесс сохраняет порядок событий
+        while True:
+            events = await self._inbox.get()
+            try:
+                await self.dispatch(events)
+            except Exception:
+                logger.exception("Ошибка рассылки событий")
+                self._close_all(RESYNC)
+
+    async def dispatch(self, events: List[dict]):
+        """Доставка событий подписчикам, которые видят задачу (правила crud.get_task)"""
+        if not self._by_user and not self._admins:
+            return
+        # Круг доступа вычисляется одним запросом на пакет и только если есть подписчики-не администраторы
+        unresolved = {event["task_id"] for event in events if "audience" not in event}
+        audiences = {}
+        if unresolved and self._by_user:
+            audiences = {task_id: audience for task_id, (_, audience)
+                         in (await changelog.task_audiences(task_ids=sorted(unresolved))).items()}
+
+        for event in events:
+            message = json.dumps({key: value for key, value in event.items() if key not in _PRIVATE})
+            for subscription in self._admins:
+                subscription.offer(message)
+            users = _user_ids(event.get("audience", audiences.get(event["task_id"])))
+            for user_id in users:
+                for subscription in self._by_user.get(user_id, ()):
+                    subscription.offer(message)
+            revoked = _user_ids(event.get("revoked")) - users
+            if revoked:
+                message = json.dumps({"type": "task.revoked", "id": event["task_id"], "task_id": event["task_id"]})
+                for user_id in revoked:
+                    for subscription in self._by_user.get(user_id, ()):
+                        subscription.offer(message)
+
+    async def _listen_loop(self):
+        import asyncpg
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(config.DATABASE_URL)
+                lost = asyncio.get_running_loop().create_future()
+                connection.add_termination_listener(lambda _: lost.done() or lost.set_result(None))
+                await connection.add_listener(CHANNEL, self._on_notify)
+                await lost
+                logger.warning("Соединение LISTEN %s потеряно", CHANNEL)
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except Exception:
+                logger.exception("Не удалось подписаться на %s", CHANNEL)
+            # События за время переподключения потеряны - клиенты догоняют через /sync
+            self._close_all(RESYNC)
+            await asyncio.sleep(config.EVENTS_RECONNECT_DELAY)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        if self._by_user or self._admins:
+            self._enqueue(json.loads(payload))
+
+
+def check_backend():
+    """Предупреждение при старте: с EVENTS_BACKEND=memory каждый воркер видит только свои изменения"""
+    if config.EVENTS_BACKEND != "postgres" and config.WEB_CONCURRENCY > 1:
+        logger.warning("EVENTS_BACKEND=%s при %s воркерах: клиенты /ws и /events пропустят события других "
+                       "воркеров без resync; нужен EVENTS_BACKEND=postgres", config.EVENTS_BACKEND,
+                       config.WEB_CONCURRENCY)
+
+
+def _payloads(events: List[dict]):
+    """JSON-пакеты событий, каждый не длиннее NOTIFY_PAYLOAD_LIMIT"""
+    batch, size = [], 2
+    for event in events:
+        item = json.dumps(event, separators=(",", ":"))
+        if len(item) + 2 > NOTIFY_PAYLOAD_LIMIT:
+            # Слишком большой круг доступа - получатели вычислят его сами
+            # (события удаленной задачи тогда дойдут только до администраторов)
+            event = {key: value for key, value in event.items() if key not in _PRIVATE}
+            item = json.dumps(event, separators=(",", ":"))
+        if batch and size + len(item) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            yield "[" + ",".join(batch) + "]"
+            batch, size = [], 2
+        batch.append(item)
+        size += len(item) + 1
+    if batch:
+        yield "[" + ",".join(batch) + "]"
+
+
+hub = Hub()
+
+
+async def publish(events: List[dict]):
+    await hub.publish(events)
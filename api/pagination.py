@@ -0,0 +1,38 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, status
+
+# Наибольший limit списков (и в курсорном режиме, и со skip)
+MAX_PAGE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    """Непрозрачный курсор, указывающий на последний элемент страницы"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """ID последнего элемента предыдущей страницы (None - первая страница)"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(json.loads(raw)["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+
+
+def make_page(items: list, limit: int) -> dict:
+    """Страница из limit + 1 выбранных элементов: лишний элемент означает, что есть продолжение"""
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(last["id"] if isinstance(last, dict) else last.id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,173 @@
+"""Сводка по задачам проекта для доски: счетчики по статусам, приоритетам, исполнителям и срокам"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from tortoise.transactions import in_transaction
+import config
+from database import get_connection, SQLParams
+
+DIMENSIONS = ("status", "priority", "assignee")
+# Ключ счетчика для задач без статуса или приоритета (NULL не участвует в уникальном индексе)
+NO_REF = 0
+
+
+def week_bounds(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Текущий момент и начало следующей недели (понедельник, UTC)"""
+    now = now or datetime.now(timezone.utc)
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return now, monday + timedelta(days=7)
+
+
+def _due_branches(params: SQLParams, project_id: int, now: datetime, week_end: datetime) -> str:
+    # Задачи в завершающих статусах не считаются просроченными
+    not_final = "NOT COALESCE(s.is_final, FALSE)"
+    return (
+        f"SELECT 'overdue' AS dimension, NULL AS ref_id, COUNT(*) AS task_count "
+        f"FROM task t LEFT JOIN status s ON s.id = t.status_id "
+        f"WHERE t.project_id = {params.add(project_id)} AND t.due_date < {params.add(now)} AND {not_final} "
+        f"UNION ALL "
+        f"SELECT 'due_this_week', NULL, COUNT(*) "
+        f"FROM task t LEFT JOIN status s ON s.id = t.status_id "
+        f"WHERE t.project_id = {params.add(project_id)} AND t.due_date >= {params.add(now)} "
+        f"AND t.due_date < {params.add(week_end)} AND {not_final}"
+    )
+
+
+def _grouped_counts(params: SQLParams, project_filter) -> str:
+    """Счетчики по измерениям одним запросом; project_filter(alias) - условие на проект"""
+    return (
+        f"SELECT t.project_id AS project_id, 'status' AS dimension, t.status_id AS ref_id, COUNT(*) AS task_count "
+        f"FROM task t WHERE {project_filter('t')} GROUP BY t.project_id, t.status_id "
+        f"UNION ALL "
+        f"SELECT t.project_id, 'priority', t.priority_id, COUNT(*) "
+        f"FROM task t WHERE {project_filter('t')} GROUP BY t.project_id, t.priority_id "
+        f"UNION ALL "
+        f"SELECT t.project_id, 'assignee', ta.user_id, COUNT(*) "
+        f"FROM task t JOIN task_assignee ta ON ta.task_id = t.id "
+        f"WHERE {project_filter('t')} GROUP BY t.project_id, ta.user_id"
+    )
+
+
+async def get_stats(project_id: int, now: Optional[datetime] = None) -> dict:
+    """Сводка по проекту одним SQL-запросом (из project_counter, если счетчики материализованы)"""
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    now, week_end = week_bounds(now)
+    if config.PROJECT_STATS_MATERIALIZED:
+        counts = (
+            f"SELECT dimension, ref_id, task_count FROM project_counter "
+            f"WHERE project_id = {params.add(project_id)} AND task_count <> 0"
+        )
+    else:
+        grouped = _grouped_counts(params, lambda alias: f"{alias}.project_id = {params.add(project_id)}")
+        counts = f"SELECT dimension, ref_id, task_count FROM ({grouped}) AS counts"
+    sql = f"{counts} UNION ALL {_due_branches(params, project_id, now, week_end)}"
+    rows = await connection.execute_query_dict(sql, params.values)
+
+    stats = {"project_id": project_id, "overdue": 0, "due_this_week": 0}
+    groups = {dimension: [] for dimension in DIMENSIONS}
+    for row in rows:
+        if row["dimension"] in groups:
+            groups[row["dimension"]].append({"id": row["ref_id"] or None, "count": row["task_count"]})
+        else:
+            stats[row["dimension"]] = row["task_count"]
+    for dimension, items in groups.items():
+        items.sort(key=lambda item: (item["id"] is not None, item["id"] or 0))
+        stats[f"by_{dimension}"] = items
+    stats["total"] = sum(item["count"] for item in groups["status"])
+    return stats
+
+
+class CounterDelta:
+    """Изменения материализованных счетчиков в рамках одной операции crud"""
+
+    def __init__(self):
+        self.changes: Counter = Counter()
+
+    def add(self, project_id: int, status_id: Optional[int], priority_id: Optional[int],
+            assignee_ids: Iterable[int], sign: int = 1):
+        """Учесть задачу в счетчиках проекта (sign=-1 - убрать)"""
+        self.changes[(project_id, "status", status_id or NO_REF)] += sign
+        self.changes[(project_id, "priority", priority_id or NO_REF)] += sign
+        for user_id in set(assignee_ids):
+            self.changes[(project_id, "assignee", user_id)] += sign
+
+    async def apply(self, connection=None):
+        """Один UPSERT с приращениями (атомарен при параллельных записях)"""
+        if not config.PROJECT_STATS_MATERIALIZED:
+            return
+        changes = [(key, delta) for key, delta in self.changes.items() if delta]
+        if not changes:
+            return
+        connection = connection or get_connection()
+        params = SQLParams(connection.capabilities.dialect)
+        values = ", ".join("(" + params.add_many([*key, delta]) + ")" for key, delta in changes)
+        await connection.execute_query(
+            f"INSERT INTO project_counter (project_id, dimension, ref_id, task_count) VALUES {values} "
+            f"ON CONFLICT (project_id, dimension, ref_id) "
+            f"DO UPDATE SET task_count = project_counter.task_count + excluded.task_count",
+            params.values
+        )
+        self.changes.clear()
+
+
+async def lock(connection):
+    """Блокировка project_counter до конца транзакции: приращения CounterDelta ждут окончания пересчета"""
+    if connection.capabilities.dialect == "postgres":
+        # SHARE ROW EXCLUSIVE конфликтует с ROW EXCLUSIVE (INSERT ... ON CONFLICT в apply) и с самой собой,
+        # но не с чтением: /stats до фиксации видит прежние счетчики. В SQLite запись и так одна
+        await connection.execute_query("LOCK TABLE project_counter IN SHARE ROW EXCLUSIVE MODE")
+
+
+async def rebuild(project_ids: Optional[List[int]] = None, connection=None):
+    """Пересчет материализованных счетчиков из task (все проекты или только project_ids).
+
+    Выполняется в транзакции connection (без него - в своей) под блокировкой lock: DELETE и INSERT
+    фиксируются вместе, а параллельные приращения не попадают между ними.
+    """
+    if project_ids is not None and not project_ids:
+        return
+    if connection is None:
+        async with in_transaction() as connection:
+            await rebuild(project_ids, connection)
+        return
+    await lock(connection)
+    await _recount(connection, project_ids)
+
+
+async def rebuild_referencing(dimension: str, ref_id: int, connection):
+    """Пересчет проектов, счетчики которых ссылаются на удаленный статус, приоритет или пользователя.
+
+    Вызывается в транзакции удаления после DELETE: SET NULL и каскадное удаление назначений
+    не проходят через CounterDelta.
+    """
+    if not config.PROJECT_STATS_MATERIALIZED:
+        return
+    await lock(connection)
+    # Под блокировкой видны приращения всех зафиксированных записей, в том числе после выборки задач
+    params = SQLParams(connection.capabilities.dialect)
+    rows = await connection.execute_query_dict(
+        f"SELECT DISTINCT project_id FROM project_counter "
+        f"WHERE dimension = {params.add(dimension)} AND ref_id = {params.add(ref_id)}",
+        params.values
+    )
+    project_ids = sorted(row["project_id"] for row in rows)
+    if project_ids:
+        await _recount(connection, project_ids)
+
+
+async def _recount(connection, project_ids: Optional[List[int]]):
+    delete = SQLParams(connection.capabilities.dialect)
+    insert = SQLParams(connection.capabilities.dialect)
+    if project_ids is None:
+        where = "1 = 1"
+        grouped = _grouped_counts(insert, lambda alias: "1 = 1")
+    else:
+        where = f"project_id IN ({delete.add_many(project_ids)})"
+        grouped = _grouped_counts(insert, lambda alias: f"{alias}.project_id IN ({insert.add_many(project_ids)})")
+    await connection.execute_query(f"DELETE FROM project_counter WHERE {where}", delete.values)
+    await connection.execute_query(
+        f"INSERT INTO project_counter (project_id, dimension, ref_id, task_count) "
+        f"SELECT project_id, dimension, COALESCE(ref_id, {NO_REF}), task_count FROM ({grouped}) AS counts",
+        insert.values
+    )
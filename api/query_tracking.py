@@ -0,0 +1,171 @@
+"""Контроль SQL-запросов: бюджет на маршрут и поиск повторяющихся запросов (N+1)"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import config
+import instrumentation
+
+logger = logging.getLogger("query_tracking")
+
+# Бюджет SQL-запросов на маршрут "МЕТОД шаблон", включая загрузку пользователя при холодном кэше
+# и узкий запрос версии объекта для If-None-Match / If-Match (ETag списков считается по самой странице);
+# каждая запись добавляет запрос в журнал изменений
+ROUTE_BUDGETS: Dict[str, int] = {
+    # С RATE_LIMIT_BACKEND=database маршруты с лимитом (регистрация, вход, создание задачи) - еще запрос
+    "POST /auth/register": 4,
+    "POST /auth/login": 2,
+    "POST /auth/refresh": 2,
+    "GET /auth/me": 2,
+    "GET /users/": 3,
+    "GET /users/{user_id}": 2,
+    "POST /users/": 4,
+    "PUT /users/{user_id}": 3,
+    # Пользователь под блокировкой, затронутые задачи, комментарии и вложения, DELETE и журнал;
+    # с PROJECT_STATS_MATERIALIZED - пересчет счетчиков затронутых проектов под блокировкой (четыре запроса)
+    "DELETE /users/{user_id}": 9,
+    "GET /projects/": 2,
+    "GET /projects/{project_id}": 3,
+    "GET /projects/{project_id}/stats": 3,
+    "GET /projects/{project_id}/tasks/export": 4,
+    "POST /projects/": 3,
+    # Проект под блокировкой (с проверкой If-Match), UPDATE и журнал
+    "PUT /projects/{project_id}": 4,
+    "GET /priorities/": 2,
+    "GET /priorities/{priority_id}": 1,
+    "POST /priorities/": 2,
+    "GET /statuses/": 2,
+    "GET /statuses/{status_id}": 1,
+    "POST /statuses/": 2,
+    "GET /tasks/": 4,
+    "GET /tasks/{task_id}": 10,
+    # Запись задач с PROJECT_STATS_MATERIALIZED: еще запрос счетчиков (пересчет в PATCH /tasks/bulk - четыре)
+    "POST /tasks/": 7,
+    "POST /tasks/bulk": 7,
+    "PATCH /tasks/bulk": 11,
+    # Задача под блокировкой, ссылки, UPDATE, исполнители (DELETE и INSERT) и журнал
+    "PUT /tasks/{task_id}": 7,
+    "PATCH /tasks/{task_id}/assignees": 7,
+    "DELETE /tasks/{task_id}": 5,
+    "GET /comments/task/{task_id}": 4,
+    "GET /comments/{comment_id}": 3,
+    "POST /comments/": 4,
+    "PUT /comments/{comment_id}": 6,
+    "DELETE /comments/{comment_id}": 6,
+    "GET /attachments/task/{task_id}": 4,
+    "GET /attachments/{attachment_id}": 3,
+    "POST /attachments/": 4,
+    "DELETE /attachments/{attachment_id}": 6,
+    # На SQLite с холодным индексом в памяти: задачи, комментарии и проверка доступа
+    "GET /search": 4,
+    # Журнал, токен, проверка доступа и по запросу на каждый вид объектов
+    "GET /sync": 9,
+}
+
+# Маршруты, которые повторяют запрос по построению (например, постраничная выгрузка)
+ALLOW_REPEATS = frozenset((
+    "GET /projects/{project_id}/tasks/export",
+))
+
+
+class QueryBudgetExceeded(Exception):
+    """Маршрут превысил бюджет SQL-запросов или повторял один и тот же запрос"""
+
+
+class QueryTracker:
+    """Запросы, выполненные внутри контекста (вложенные трекеры видят одни и те же запросы)"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements: List[str] = []
+        self._token = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Формы запросов, выполненные не меньше threshold раз"""
+        threshold = config.QUERY_REPEAT_THRESHOLD if threshold is None else threshold
+        shapes = Counter(instrumentation.statement_shape(sql) for sql in self.statements)
+        return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+    def problems(self, budget: Optional[int] = None, allow_repeats: bool = False) -> List[str]:
+        budget = budget_for(self.label) if budget is None else budget
+        found = []
+        if self.count > budget:
+            found.append(f"{self.label}: {self.count} SQL-запросов при бюджете {budget}")
+        if not allow_repeats:
+            for shape, count in self.repeated().items():
+                found.append(f"{self.label}: запрос повторен {count} раз (возможен N+1): {shape}")
+        return found
+
+    def check(self, budget: Optional[int] = None, mode: Optional[str] = None):
+        """Предупреждение в лог (warn) или исключение (raise) при нарушениях"""
+        mode = config.QUERY_TRACKING if mode is None else mode
+        if mode == "off":
+            return
+        found = self.problems(budget, allow_repeats=self.label in ALLOW_REPEATS)
+        if not found:
+            return
+        if mode == "raise":
+            raise QueryBudgetExceeded("; ".join(found))
+        for problem in found:
+            logger.warning(problem)
+
+    def __enter__(self):
+        instrumentation.ensure_query_hook()
+        self._token = _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, *exc):
+        _active.reset(self._token)
+
+
+_active: ContextVar[Tuple[QueryTracker, ...]] = ContextVar("query_trackers", default=())
+
+
+def _on_query(sql: str, values, duration: float):
+    for tracker in _active.get():
+        tracker.statements.append(sql)
+
+
+instrumentation.add_query_listener(_on_query)
+
+
+@contextmanager
+def untracked():
+    """Запросы внутри не учитываются трекерами (фоновая работа, запущенная из обработки запроса)"""
+    token = _active.set(())
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def track_queries(label: str = "") -> QueryTracker:
+    """Контекст подсчета запросов: with track_queries("GET /tasks/") as tracker: ..."""
+    return QueryTracker(label)
+
+
+def budget_for(route: str) -> int:
+    return ROUTE_BUDGETS.get(route, config.QUERY_BUDGET_DEFAULT)
+
+
+class QueryTrackingMiddleware:
+    """ASGI middleware: проверка бюджета SQL-запросов каждого HTTP-запроса по шаблону маршрута"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as tracker:
+            await self.app(scope, receive, send)
+        route = getattr(scope.get("route"), "path", None)
+        if route is not None:
+            tracker.label = f"{scope['method']} {route}"
+            tracker.check()
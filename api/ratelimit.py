@@ -0,0 +1,207 @@
+"""Ограничение частоты запросов: token bucket по пользователю или IP с бюджетом на маршрут"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
+import config
+import metrics
+import query_tracking
+from auth import get_current_user
+from database import get_connection, SQLParams
+
+logger = logging.getLogger("ratelimit")
+
+RATE_LIMITED = metrics.Counter("rate_limit_rejected_total", "Запросы, отклоненные ограничением частоты",
+                               labels=("rule",))
+RATE_LIMIT_ERRORS = metrics.Counter("rate_limit_errors_total",
+                                    "Ошибки хранилища лимитов (запрос пропускается без проверки)")
+
+
+class Rule:
+    """Бюджет маршрута: burst запросов подряд, восполнение со скоростью rate в секунду"""
+
+    __slots__ = ("name", "burst", "rate")
+
+    def __init__(self, name: str, burst: float, rate: float):
+        self.name = name
+        self.burst = burst
+        self.rate = rate
+
+    @classmethod
+    def parse(cls, name: str, value: str) -> "Rule":
+        """Правило из строки "N/T": N запросов за T секунд"""
+        count, period = value.split("/")
+        return cls(name, float(count), float(count) / float(period))
+
+
+RULES: Dict[str, Rule] = {
+    rule.name: rule for rule in (
+        Rule.parse("login", config.RATE_LIMIT_LOGIN),
+        Rule.parse("register", config.RATE_LIMIT_REGISTER),
+        Rule.parse("task_create", config.RATE_LIMIT_TASK_CREATE),
+    )
+}
+
+
+class MemoryBackend:
+    """Корзины в памяти воркера: LRU на max_keys ключей"""
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rule: Rule, cost: float = 1) -> float:
+        """0 - запрос пропущен, иначе через сколько секунд в корзине наберется cost"""
+        now = self.clock()
+        bucket = self._buckets.pop(key, None)
+        tokens = rule.burst if bucket is None else min(rule.burst, bucket[0] + (now - bucket[1]) * rule.rate)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rule.rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        self._buckets.clear()
+
+
+def _db_now(dialect: str) -> str:
+    """Секунды Unix по часам БД"""
+    if dialect == "postgres":
+        return "EXTRACT(EPOCH FROM clock_timestamp())::float8"
+    return "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+class DatabaseBackend:
+    """Корзины в таблице rate_limit_bucket: общие для воркеров, один запрос на проверку.
+
+    Списание атомарно (INSERT ... ON CONFLICT DO UPDATE под блокировкой строки) и идет по часам БД;
+    отказ ничего не пишет. Работает и на SQLite, поэтому проверяется в тестах без PostgreSQL.
+    Не чаще раза в prune_interval секунд воркер удаляет простаивающие корзины (prune) фоновой задачей.
+    """
+
+    def __init__(self, prune_interval: float, clock: Callable[[], float] = time.monotonic):
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self._pruned_at = clock()
+        self._prune_task: Optional[asyncio.Task] = None
+
+    async def take(self, key: str, rule: Rule, cost: float = 1) -> float:
+        connection = get_connection()
+        dialect = connection.capabilities.dialect
+        now, least = _db_now(dialect), "LEAST" if dialect == "postgres" else "MIN"
+        params = SQLParams(dialect)
+        burst, rate, cost = float(rule.burst), float(rule.rate), float(cost)
+
+        def refill() -> str:
+            # Выражение встречается дважды: плейсхолдеры PostgreSQL нумеруются в порядке текста
+            return f"{least}({params.add(burst)}, b.tokens + (excluded.updated_at - b.updated_at) * {params.add(rate)})"
+
+        rows = await connection.execute_query_dict(
+            f"INSERT INTO rate_limit_bucket AS b (key, tokens, updated_at) "
+            f"VALUES ({params.add(key)}, {params.add(burst - cost)}, {now}) "
+            f"ON CONFLICT (key) DO UPDATE SET tokens = {refill()} - {params.add(cost)}, "
+            f"updated_at = excluded.updated_at WHERE {refill()} >= {params.add(cost)} RETURNING tokens",
+            params.values,
+        )
+        self._schedule_prune()
+        # Остаток при отказе неизвестен (строка не возвращается) - оценка сверху
+        return 0.0 if rows else cost / rule.rate
+
+    async def prune(self) -> int:
+        """Удалить корзины, которые простаивали дольше полного восполнения любого правила.
+
+        Такая корзина полна и ничем не отличается от отсутствующей строки; без удаления таблица
+        растет на каждый новый адрес и пользователя. Возвращает число удаленных строк.
+        """
+        idle = max(rule.burst / rule.rate for rule in RULES.values())
+        connection = get_connection()
+        params = SQLParams(connection.capabilities.dialect)
+        deleted, _ = await connection.execute_query(
+            f"DELETE FROM rate_limit_bucket WHERE updated_at < {_db_now(params.dialect)} - {params.add(idle)}",
+            params.values,
+        )
+        return deleted
+
+    def _schedule_prune(self):
+        if self._prune_task is not None or self.clock() - self._pruned_at < self.prune_interval:
+            return
+        self._pruned_at = self.clock()
+        # Не задерживает ответ и не входит в бюджет SQL-запросов маршрута
+        self._prune_task = asyncio.get_running_loop().create_task(self._prune_in_background())
+
+    async def _prune_in_background(self):
+        try:
+            with query_tracking.untracked():
+                deleted = await self.prune()
+            logger.debug("Удалено простаивающих корзин: %s", deleted)
+        except Exception:
+            logger.exception("Не удалось удалить простаивающие корзины")
+        finally:
+            self._prune_task = None
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if config.RATE_LIMIT_BACKEND == "database":
+            _backend = DatabaseBackend(config.RATE_LIMIT_PRUNE_INTERVAL)
+        else:
+            _backend = MemoryBackend(config.RATE_LIMIT_MAX_KEYS)
+    return _backend
+
+
+def reset_backend():
+    """Сброс хранилища (при следующем обращении оно будет создано заново по config)"""
+    global _backend
+    _backend = None
+
+
+def client_ip(request: Request) -> str:
+    # За прокси адрес клиента подставляет uvicorn из X-Forwarded-For, если прокси входит в
+    # --forwarded-allow-ips (FORWARDED_ALLOW_IPS в serve.sh); иначе у всех клиентов будет адрес прокси
+    return request.client.host if request.client else "unknown"
+
+
+async def check(rule: Rule, key: str):
+    if not config.RATE_LIMIT_ENABLED:
+        return
+    try:
+        retry_after = await get_backend().take(f"{rule.name}:{key}", rule)
+    except Exception:
+        # Лимит - защита от перегрузки: отказ хранилища не должен выключать сам маршрут
+        RATE_LIMIT_ERRORS.inc()
+        logger.exception("Не удалось проверить лимит %s", rule.name)
+        return
+    if retry_after:
+        RATE_LIMITED.inc(rule=rule.name)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много запросов, повторите попытку позже",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def limit_by_ip(rule_name: str):
+    """Зависимость маршрута без авторизации: лимит RULES[rule_name] на адрес клиента"""
+    async def dependency(request: Request):
+        await check(RULES[rule_name], f"ip:{client_ip(request)}")
+    return dependency
+
+
+def limit_by_user(rule_name: str):
+    """Зависимость маршрута с авторизацией: лимит на пользователя (get_current_user не выполняется дважды)"""
+    async def dependency(current_user=Depends(get_current_user)):
+        await check(RULES[rule_name], f"user:{current_user.id}")
+    return dependency
@@ -0,0 +1,74 @@
+"""Кэш справочников (приоритеты и статусы) в памяти процесса"""
+import hashlib
+import json
+import time
+from typing import List, Optional
+import config
+import models
+
+
+class ReferenceData:
+    """Справочник, целиком загружаемый в память и сбрасываемый при изменениях"""
+
+    def __init__(self, model, order_by: str, fields: tuple):
+        self.model = model
+        self.order_by = order_by
+        self.fields = fields
+        self._items: Optional[List[dict]] = None
+        self._by_id: dict = {}
+        # ID, которых не нашлось и после перечитывания: до сброса или TTL повторно не перечитываем
+        self._missing: set = set()
+        self._etag = ""
+        self._loaded_at = 0.0
+
+    async def load(self):
+        items = await self.model.all().order_by(self.order_by).values(*self.fields)
+        self._items = items
+        self._by_id = {item["id"]: item for item in items}
+        digest = hashlib.sha1(json.dumps(items, sort_keys=True, default=str).encode()).hexdigest()
+        self._etag = f'W/"{digest}"'
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._items = None
+        self._missing.clear()
+
+    async def _ensure_loaded(self) -> bool:
+        """True, если справочник только что загружен из БД"""
+        # TTL страхует от устаревших данных, измененных в другом воркере
+        if self._items is None or time.monotonic() - self._loaded_at > config.REFDATA_TTL:
+            self._missing.clear()
+            await self.load()
+            return True
+        return False
+
+    async def all(self) -> List[dict]:
+        await self._ensure_loaded()
+        return self._items
+
+    async def get(self, item_id: Optional[int]) -> Optional[dict]:
+        if item_id is None:
+            return None
+        fresh = await self._ensure_loaded()
+        item = self._by_id.get(item_id)
+        if item is None and not fresh and item_id not in self._missing:
+            # Запись могла появиться в другом воркере - перечитываем справочник
+            await self.load()
+            item = self._by_id.get(item_id)
+            if item is None:
+                self._missing.add(item_id)
+        return item
+
+    async def etag(self) -> str:
+        await self._ensure_loaded()
+        return self._etag
+
+
+priorities = ReferenceData(models.Priority, "level", ("id", "name", "level", "color"))
+statuses = ReferenceData(models.Status, "order_num", ("id", "name", "order_num", "is_final"))
+
+
+async def load_all():
+    """Загрузка всех справочников (при старте приложения)"""
+    await priorities.load()
+    await statuses.load()
@@ -1,35 +1,42 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional, Union
 import crud
 import schemas
-from auth import get_current_user
+from pagination import MAX_PAGE, decode_cursor, make_page
+from auth import get_current_user, TaskAccess
 
 router = APIRouter(prefix="/attachments", tags=["attachments"])
 
 
-@router.get("/task/{task_id}", response_model=List[schemas.AttachmentWithUser])
+@router.get("/task/{task_id}", response_model=Union[schemas.Page[schemas.AttachmentWithUser], List[schemas.AttachmentWithUser]])
 async def read_attachments_by_task(
         task_id: int,
-        current_user=Depends(get_current_user)
+        limit: int = Query(100, ge=1, le=MAX_PAGE, description="Размер страницы в курсорном режиме"),
+        cursor: Optional[str] = Query(None, description="Курсор страницы (пустая строка - первая); ответ будет с next_cursor"),
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Получить все вложения по задаче (только если есть доступ к задаче)"""
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(task_id):
         raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
 
-    attachments = await crud.get_attachments_by_task(task_id=task_id)
-    return attachments
+    if cursor is None:
+        return await crud.get_attachments_by_task(task_id=task_id)
+
+    attachments = await crud.get_attachments_by_task(
+        task_id=task_id,
+        after_id=decode_cursor(cursor),
+        limit=limit + 1
+    )
+    return make_page(attachments, limit)
 
 
 @router.get("/{attachment_id}", response_model=schemas.Attachment)
 async def read_attachment(
         attachment_id: int,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Получить вложение по ID"""
     db_attachment = await crud.get_attachment(attachment_id=attachment_id)
@@ -37,12 +44,7 @@ async def read_attachment(
         raise HTTPException(status_code=404, detail="Вложение не найдено")
 
     # Проверяем доступ к задаче вложения
-    db_task = await crud.get_task(
-        db_attachment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(db_attachment.task_id):
         raise HTTPException(status_code=404, detail="Нет доступа к этому вложению")
 
     return db_attachment
@@ -51,16 +53,12 @@ async def read_attachment(
 @router.post("/", response_model=schemas.Attachment, status_code=status.HTTP_201_CREATED)
 async def create_attachment(
         attachment: schemas.AttachmentCreate,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Создать новое вложение (только если есть доступ к задаче)"""
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        attachment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(attachment.task_id):
         raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
 
     return await crud.create_attachment(attachment=attachment, user_id=current_user.id)
@@ -69,7 +67,8 @@ async def create_attachment(
 @router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_attachment(
         attachment_id: int,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Удалить вложение (только свое или админ может все)"""
     db_attachment = await crud.get_attachment(attachment_id=attachment_id)
@@ -77,12 +76,7 @@ async def delete_attachment(
         raise HTTPException(status_code=404, detail="Вложение не найдено")
 
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        db_attachment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(db_attachment.task_id):
         raise HTTPException(status_code=404, detail="Нет доступа к этому вложению")
 
     # Проверяем, что пользователь удаляет свое вложение
@@ -2,18 +2,22 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 import schemas
 import crud
+import ratelimit
 from auth import (
     verify_password, 
     create_access_token, 
     create_refresh_token,
+    access_token_claims,
     decode_token,
-    get_current_user
+    get_current_user,
+    Principal
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(ratelimit.limit_by_ip("register"))])
 async def register(user: schemas.UserRegister):
     """Регистрация нового пользователя"""
     # Проверяем уникальность username
@@ -44,7 +48,7 @@ async def register(user: schemas.UserRegister):
     return await crud.create_user(user=user_create)
 
 
-@router.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(ratelimit.limit_by_ip("login"))])
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Вход пользователя (получение токенов)"""
     # Ищем пользователя
@@ -58,7 +62,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     # Проверяем пароль
-    if not verify_password(form_data.password, user.password_hash):
+    if not await verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный логин или пароль",
@@ -73,7 +77,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     # Создаем токены
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=access_token_claims(user))
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
@@ -111,7 +115,7 @@ async def refresh_token(refresh_token: str):
             )
         
         # Создаем новые токены
-        new_access_token = create_access_token(data={"sub": user_id})
+        new_access_token = create_access_token(data=access_token_claims(user))
         new_refresh_token = create_refresh_token(data={"sub": user_id})
         
         return {
@@ -132,4 +136,15 @@ async def refresh_token(refresh_token: str):
 @router.get("/me", response_model=schemas.User)
 async def get_me(current_user = Depends(get_current_user)):
     """Получить информацию о текущем пользователе"""
+    # В режиме доверия к claims токена полные данные пользователя загружаются отдельно
+    if isinstance(current_user, Principal):
+        user = await crud.get_user(user_id=current_user.id)
+        if user is None:
+            # Удален после проверки активности (она кэшируется на AUTH_ACTIVE_CHECK_TTL)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Пользователь не найден",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user
     return current_user
@@ -1,35 +1,42 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional, Union
 import crud
 import schemas
-from auth import get_current_user
+from pagination import MAX_PAGE, decode_cursor, make_page
+from auth import get_current_user, TaskAccess
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
 
-@router.get("/task/{task_id}", response_model=List[schemas.CommentWithUser])
+@router.get("/task/{task_id}", response_model=Union[schemas.Page[schemas.CommentWithUser], List[schemas.CommentWithUser]])
 async def read_comments_by_task(
         task_id: int,
-        current_user=Depends(get_current_user)
+        limit: int = Query(100, ge=1, le=MAX_PAGE, description="Размер страницы в курсорном режиме"),
+        cursor: Optional[str] = Query(None, description="Курсор страницы (пустая строка - первая); ответ будет с next_cursor"),
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Получить все комментарии по задаче (только если есть доступ к задаче)"""
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(task_id):
         raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
 
-    comments = await crud.get_comments_by_task(task_id=task_id)
-    return comments
+    if cursor is None:
+        return await crud.get_comments_by_task(task_id=task_id)
+
+    comments = await crud.get_comments_by_task(
+        task_id=task_id,
+        after_id=decode_cursor(cursor),
+        limit=limit + 1
+    )
+    return make_page(comments, limit)
 
 
 @router.get("/{comment_id}", response_model=schemas.Comment)
 async def read_comment(
         comment_id: int,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Получить комментарий по ID"""
     db_comment = await crud.get_comment(comment_id=comment_id)
@@ -37,12 +44,7 @@ async def read_comment(
         raise HTTPException(status_code=404, detail="Комментарий не найден")
 
     # Проверяем доступ к задаче комментария
-    db_task = await crud.get_task(
-        db_comment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(db_comment.task_id):
         raise HTTPException(status_code=404, detail="Нет доступа к этому комментарию")
 
     return db_comment
@@ -51,16 +53,12 @@ async def read_comment(
 @router.post("/", response_model=schemas.Comment, status_code=status.HTTP_201_CREATED)
 async def create_comment(
         comment: schemas.CommentCreate,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Создать новый комментарий (только если есть доступ к задаче)"""
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        comment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(comment.task_id):
         raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
 
     return await crud.create_comment(comment=comment, user_id=current_user.id)
@@ -70,7 +68,8 @@ async def create_comment(
 async def update_comment(
         comment_id: int,
         comment: schemas.CommentUpdate,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Обновить комментарий (только свой)"""
     db_comment = await crud.get_comment(comment_id=comment_id)
@@ -78,12 +77,7 @@ async def update_comment(
         raise HTTPException(status_code=404, detail="Комментарий не найден")
 
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        db_comment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(db_comment.task_id):
         raise HTTPException(status_code=404, detail="Нет доступа к этому комментарию")
 
     # Проверяем, что пользователь редактирует свой комментарий
@@ -100,7 +94,8 @@ async def update_comment(
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
         comment_id: int,
-        current_user=Depends(get_current_user)
+        current_user=Depends(get_current_user),
+        task_access: TaskAccess = Depends()
 ):
     """Удалить комментарий (только свой или админ может все)"""
     db_comment = await crud.get_comment(comment_id=comment_id)
@@ -108,12 +103,7 @@ async def delete_comment(
         raise HTTPException(status_code=404, detail="Комментарий не найден")
 
     # Проверяем доступ к задаче
-    db_task = await crud.get_task(
-        db_comment.task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
+    if not await task_access(db_comment.task_id):
         raise HTTPException(status_code=404, detail="Нет доступа к этому комментарию")
 
     # Проверяем, что пользователь удаляет свой комментарий
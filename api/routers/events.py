@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from typing import Optional
+import config
+import notifications
+from auth import get_current_user
+
+router = APIRouter(tags=["events"])
+
+# Браузерные WebSocket и EventSource не умеют передавать заголовки - токен можно передать в ?token=
+optional_bearer = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+
+async def _authenticate(token: Optional[str]):
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Не удалось проверить учетные данные",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token)
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """События задач, комментариев и вложений, доступных пользователю (JSON-сообщения).
+
+    Сообщение {"type": "resync"} означает пропуск событий: клиент догоняет изменения через /sync.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    try:
+        user = await _authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = await notifications.hub.subscribe(user.id, user.role)
+    try:
+        while True:
+            message = await subscription.next(config.EVENTS_KEEPALIVE)
+            if message is None:
+                break
+            # Пустое сообщение - keepalive: заодно обнаруживает отключившихся клиентов
+            await websocket.send_text(message or notifications.PING)
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        notifications.hub.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def sse_events(
+    token: Optional[str] = Query(None, description="Access токен, если нельзя передать заголовок"),
+    bearer: Optional[str] = Depends(optional_bearer)
+):
+    """Те же события, что и /ws, в формате Server-Sent Events"""
+    user = await _authenticate(bearer or token)
+
+    async def stream():
+        # Подписка создается вместе с потоком: если ответ не начнет отправляться, она не останется в hub
+        subscription = await notifications.hub.subscribe(user.id, user.role)
+        try:
+            yield ": connected\n\n"
+            while True:
+                message = await subscription.next(config.EVENTS_KEEPALIVE)
+                if message is None:
+                    break
+                if message:
+                    yield f"data: {message}\n\n"
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            notifications.hub.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
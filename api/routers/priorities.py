@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List
 import crud
+import etags
+import refdata
 import schemas
 from auth import get_current_user, require_admin
 
@@ -8,10 +10,17 @@ router = APIRouter(prefix="/priorities", tags=["priorities"])
 
 
 @router.get("/", response_model=List[schemas.Priority])
-async def read_priorities(current_user = Depends(get_current_user)):
+async def read_priorities(
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user)
+):
     """Получить список всех приоритетов"""
-    priorities = await crud.get_priorities()
-    return priorities
+    etag = await refdata.priorities.etag()
+    if etags.none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return await refdata.priorities.all()
 
 
 @router.get("/{priority_id}", response_model=schemas.Priority)
@@ -20,7 +29,7 @@ async def read_priority(
     current_user = Depends(get_current_user)
 ):
     """Получить приоритет по ID"""
-    db_priority = await crud.get_priority(priority_id=priority_id)
+    db_priority = await refdata.priorities.get(priority_id)
     if db_priority is None:
         raise HTTPException(status_code=404, detail="Приоритет не найден")
     return db_priority
@@ -32,7 +41,9 @@ async def create_priority(
     current_user = Depends(require_admin)
 ):
     """Создать новый приоритет (только для админов)"""
-    return await crud.create_priority(priority=priority)
+    db_priority = await crud.create_priority(priority=priority)
+    refdata.priorities.invalidate()
+    return db_priority
 
 
 @router.put("/{priority_id}", response_model=schemas.Priority)
@@ -45,6 +56,7 @@ async def update_priority(
     db_priority = await crud.update_priority(priority_id=priority_id, priority=priority)
     if db_priority is None:
         raise HTTPException(status_code=404, detail="Приоритет не найден")
+    refdata.priorities.invalidate()
     return db_priority
 
 
@@ -57,4 +69,5 @@ async def delete_priority(
     db_priority = await crud.delete_priority(priority_id=priority_id)
     if db_priority is None:
         raise HTTPException(status_code=404, detail="Приоритет не найден")
+    refdata.priorities.invalidate()
     return None
@@ -1,34 +1,63 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
 import crud
+import etags
+import export
+import project_stats
 import schemas
+import visibility
+from pagination import MAX_PAGE, decode_cursor, make_page
 from auth import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
-@router.get("/", response_model=List[schemas.Project])
+@router.get("/", response_model=Union[schemas.Page[schemas.Project], List[schemas.Project]])
 async def read_projects(
-    skip: int = 0, 
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE),
+    cursor: Optional[str] = Query(None, description="Курсор страницы (пустая строка - первая); ответ будет с next_cursor"),
     current_user = Depends(get_current_user)
 ):
     """Получить список проектов (пользователи видят только свои, админы - все)"""
+    after_id = decode_cursor(cursor)
     projects = await crud.get_projects(
         skip=skip, 
-        limit=limit, 
+        limit=limit if cursor is None else limit + 1,
         user_id=current_user.id,
-        user_role=current_user.role
+        user_role=current_user.role,
+        after_id=after_id
     )
-    return projects
+    result = projects if cursor is None else make_page(projects, limit)
+    items, next_cursor = (projects, None) if cursor is None else (result["items"], result["next_cursor"])
+    # Все поля проекта меняются вместе с updated_at
+    etag = etags.list_etag("projects", items, next_cursor)
+    if etags.none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return result
 
 
 @router.get("/{project_id}", response_model=schemas.Project)
 async def read_project(
     project_id: int,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user)
 ):
     """Получить проект по ID (только свой или все для админа)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await crud.get_project_version(project_id, user_id=current_user.id, user_role=current_user.role)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Проект не найден")
+        etag = etags.object_etag("project", project_id, version["updated_at"])
+        if etags.none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
     db_project = await crud.get_project(
         project_id=project_id,
         user_id=current_user.id,
@@ -36,9 +65,57 @@ async def read_project(
     )
     if db_project is None:
         raise HTTPException(status_code=404, detail="Проект не найден")
+    response.headers["ETag"] = etags.object_etag("project", db_project.id, db_project.updated_at)
     return db_project
 
 
+@router.get("/{project_id}/stats", response_model=schemas.ProjectStats)
+async def read_project_stats(
+    project_id: int,
+    current_user = Depends(get_current_user)
+):
+    """Сводка по задачам проекта: по статусам, приоритетам, исполнителям, просроченные и на эту неделю"""
+    db_project = await crud.get_project(
+        project_id=project_id,
+        user_id=current_user.id,
+        user_role=current_user.role
+    )
+    if db_project is None:
+        raise HTTPException(status_code=404, detail="Проект не найден")
+    return await project_stats.get_stats(project_id)
+
+
+@router.get("/{project_id}/tasks/export")
+async def export_project_tasks(
+    project_id: int,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user = Depends(get_current_user)
+):
+    """Выгрузить задачи проекта потоком в NDJSON или CSV (только свой проект или все для админа)"""
+    db_project = await crud.get_project(
+        project_id=project_id,
+        user_id=current_user.id,
+        user_role=current_user.role
+    )
+    if db_project is None:
+        raise HTTPException(status_code=404, detail="Проект не найден")
+
+    tasks = visibility.iter_project_tasks(
+        project_id,
+        user_id=current_user.id,
+        user_role=current_user.role
+    )
+    if export_format == "csv":
+        body, media_type = export.csv_lines(tasks), "text/csv"
+    else:
+        body, media_type = export.ndjson_lines(tasks), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-tasks.{export_format}"'}
+    )
+
+
 @router.post("/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: schemas.ProjectCreate,
@@ -52,17 +129,25 @@ async def create_project(
 async def update_project(
     project_id: int, 
     project: schemas.ProjectUpdate,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user)
 ):
-    """Обновить проект (только свой или все для админа)"""
-    db_project = await crud.update_project(
-        project_id=project_id, 
-        project=project,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
+    """Обновить проект (только свой или все для админа; If-Match - только если проект не менялся)"""
+    # Доступ и If-Match проверяются в транзакции записи, под блокировкой строки проекта
+    try:
+        db_project = await crud.update_project(
+            project_id=project_id,
+            project=project,
+            user_id=current_user.id,
+            user_role=current_user.role,
+            if_match=request.headers.get("if-match")
+        )
+    except crud.WriteError as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Проект не найден или нет доступа")
+    response.headers["ETag"] = etags.object_etag("project", db_project.id, db_project.updated_at)
     return db_project
 
 
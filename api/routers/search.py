@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+import fulltext
+import schemas
+from auth import get_current_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=List[schemas.SearchHit])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user)
+):
+    """Поиск по названиям и описаниям задач и комментариям (только в доступных пользователю задачах)"""
+    return await fulltext.search(q, user_id=current_user.id, user_role=current_user.role, skip=skip,
+                                 limit=limit)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List
 import crud
+import etags
+import refdata
 import schemas
 from auth import get_current_user, require_admin
 
@@ -8,10 +10,17 @@ router = APIRouter(prefix="/statuses", tags=["statuses"])
 
 
 @router.get("/", response_model=List[schemas.Status])
-async def read_statuses(current_user = Depends(get_current_user)):
+async def read_statuses(
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user)
+):
     """Получить список всех статусов"""
-    statuses = await crud.get_statuses()
-    return statuses
+    etag = await refdata.statuses.etag()
+    if etags.none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return await refdata.statuses.all()
 
 
 @router.get("/{status_id}", response_model=schemas.Status)
@@ -20,7 +29,7 @@ async def read_status(
     current_user = Depends(get_current_user)
 ):
     """Получить статус по ID"""
-    db_status = await crud.get_status(status_id=status_id)
+    db_status = await refdata.statuses.get(status_id)
     if db_status is None:
         raise HTTPException(status_code=404, detail="Статус не найден")
     return db_status
@@ -32,7 +41,9 @@ async def create_status(
     current_user = Depends(require_admin)
 ):
     """Создать новый статус (только для админов)"""
-    return await crud.create_status(status=status_data)
+    db_status = await crud.create_status(status=status_data)
+    refdata.statuses.invalidate()
+    return db_status
 
 
 @router.put("/{status_id}", response_model=schemas.Status)
@@ -45,6 +56,7 @@ async def update_status(
     db_status = await crud.update_status(status_id=status_id, status=status_data)
     if db_status is None:
         raise HTTPException(status_code=404, detail="Статус не найден")
+    refdata.statuses.invalidate()
     return db_status
 
 
@@ -57,4 +69,5 @@ async def delete_status(
     db_status = await crud.delete_status(status_id=status_id)
     if db_status is None:
         raise HTTPException(status_code=404, detail="Статус не найден")
+    refdata.statuses.invalidate()
     return None
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+import changelog
+import schemas
+from pagination import decode_cursor
+from auth import get_current_user
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=schemas.SyncResult)
+async def sync(
+    since: Optional[str] = Query(None, description="Токен предыдущей синхронизации (без него - только текущий токен)"),
+    limit: int = Query(500, ge=1, le=5000, description="Максимум записей журнала за запрос"),
+    current_user = Depends(get_current_user)
+):
+    """Изменения проектов, задач, комментариев и вложений после токена (удаленные - в deleted).
+
+    Первая синхронизация: получить токен без since, затем загрузить данные списками и дальше
+    запрашивать /sync?since=<next_token>, пока has_more. Объекты могут прийти повторно - их нужно
+    применять как upsert; удаление задачи означает удаление ее комментариев и вложений.
+    """
+    return await changelog.changes_since(
+        decode_cursor(since),
+        user_id=current_user.id,
+        user_role=current_user.role,
+        limit=limit
+    )
@@ -1,40 +1,72 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
+from typing import List, Optional, Union
 import crud
+import etags
+import ratelimit
 import schemas
+from pagination import MAX_PAGE, decode_cursor, make_page
+from serialization import TrustedSerializer
 from auth import get_current_user
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Список собирается из SQL в форме схемы - повторная валидация (в том числе email исполнителей) не нужна
+task_list_json = TrustedSerializer(List[schemas.TaskWithDetails])
+task_page_json = TrustedSerializer(schemas.Page[schemas.TaskWithDetails])
 
-@router.get("/", response_model=List[schemas.TaskWithDetails])
+
+@router.get("/", response_model=Union[schemas.Page[schemas.TaskWithDetails], List[schemas.TaskWithDetails]])
 async def read_tasks(
-        skip: int = 0,
-        limit: int = 100,
+        request: Request,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=MAX_PAGE),
+        cursor: Optional[str] = Query(None, description="Курсор страницы (пустая строка - первая); ответ будет с next_cursor"),
         project_id: Optional[int] = Query(None, description="Фильтр по ID проекта"),
         status_id: Optional[int] = Query(None, description="Фильтр по ID статуса"),
         priority_id: Optional[int] = Query(None, description="Фильтр по ID приоритета"),
         current_user=Depends(get_current_user)
 ):
     """Получить список задач (пользователи видят только свои/назначенные, админы - все)"""
+    after_id = decode_cursor(cursor)
     tasks = await crud.get_tasks(
         skip=skip,
-        limit=limit,
+        limit=limit if cursor is None else limit + 1,
         project_id=project_id,
         status_id=status_id,
         priority_id=priority_id,
         user_id=current_user.id,
-        user_role=current_user.role
+        user_role=current_user.role,
+        after_id=after_id
     )
-    return tasks
+    if cursor is None:
+        body = task_list_json.dumps(tasks)
+    else:
+        body = task_page_json.dumps(make_page(tasks, limit))
+    # ETag по телу: в него входят и исполнители, и справочники, и next_cursor
+    etag = etags.body_etag("tasks", body)
+    if etags.none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.get("/{task_id}", response_model=schemas.TaskWithDetails)
 async def read_task(
         task_id: int,
+        request: Request,
+        response: Response,
         current_user=Depends(get_current_user)
 ):
     """Получить задачу по ID (только с доступом или все для админа)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Условный запрос проверяется узким запросом версии, без загрузки задачи со связями
+        version = await crud.get_task_version(task_id, user_id=current_user.id, user_role=current_user.role)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
+        etag = etags.object_etag("task", task_id, version["updated_at"])
+        if etags.none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
     db_task = await crud.get_task(
         task_id=task_id,
         user_id=current_user.id,
@@ -42,76 +74,100 @@ async def read_task(
     )
     if db_task is None:
         raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
+    response.headers["ETag"] = etags.object_etag("task", db_task.id, db_task.updated_at)
     return db_task
 
 
-@router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(ratelimit.limit_by_user("task_create"))])
 async def create_task(
         task: schemas.TaskCreate,
         current_user=Depends(get_current_user)
 ):
     """Создать новую задачу (только в своих проектах)"""
-    # Проверяем существование проекта и доступ к нему
-    db_project = await crud.get_project(
-        task.project_id,
+    # Проект, приоритет и статус проверяются в транзакции записи
+    try:
+        return await crud.create_task(task=task, user_id=current_user.id, user_role=current_user.role)
+    except crud.TaskWriteError as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_tasks_bulk(
+        bulk: schemas.TaskBulkCreate,
+        current_user=Depends(get_current_user)
+):
+    """Массово создать задачи (результат по каждому элементу, запись одной транзакцией)"""
+    results = await crud.create_tasks_bulk(
+        tasks=bulk.items,
         user_id=current_user.id,
         user_role=current_user.role
     )
-    if not db_project:
-        raise HTTPException(status_code=404, detail="Проект не найден или нет доступа")
+    return {"results": results}
 
-    # Проверяем существование приоритета (если указан)
-    if task.priority_id and not await crud.get_priority(task.priority_id):
-        raise HTTPException(status_code=404, detail="Приоритет не найден")
 
-    # Проверяем существование статуса (если указан)
-    if task.status_id and not await crud.get_status(task.status_id):
-        raise HTTPException(status_code=404, detail="Статус не найден")
-
-    return await crud.create_task(task=task, user_id=current_user.id)
+@router.patch("/bulk", response_model=schemas.BulkResult)
+async def update_tasks_bulk(
+        bulk: schemas.TaskBulkUpdate,
+        current_user=Depends(get_current_user)
+):
+    """Массово обновить задачи (результат по каждому элементу, запись одной транзакцией)"""
+    results = await crud.update_tasks_bulk(
+        items=bulk.items,
+        user_id=current_user.id,
+        user_role=current_user.role
+    )
+    return {"results": results}
 
 
 @router.put("/{task_id}", response_model=schemas.Task)
 async def update_task(
         task_id: int,
         task: schemas.TaskUpdate,
+        request: Request,
+        response: Response,
         current_user=Depends(get_current_user)
 ):
-    """Обновить задачу (только с доступом или все для админа)"""
-    # Проверяем существование задачи и доступ к ней
-    db_task = await crud.get_task(
-        task_id,
-        user_id=current_user.id,
-        user_role=current_user.role
-    )
-    if not db_task:
-        raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
-
-    # Проверяем существование проекта (если указан)
-    if task.project_id:
-        db_project = await crud.get_project(
-            task.project_id,
+    """Обновить задачу (только с доступом или все для админа; If-Match - только если задача не менялась)"""
+    # Доступ, If-Match и ссылки проверяются в транзакции записи, под блокировкой строки задачи
+    try:
+        updated_task = await crud.update_task(
+            task_id=task_id,
+            task=task,
             user_id=current_user.id,
-            user_role=current_user.role
+            user_role=current_user.role,
+            if_match=request.headers.get("if-match")
         )
-        if not db_project:
-            raise HTTPException(status_code=404, detail="Проект не найден или нет доступа")
-
-    # Проверяем существование приоритета (если указан)
-    if task.priority_id and not await crud.get_priority(task.priority_id):
-        raise HTTPException(status_code=404, detail="Приоритет не найден")
+    except crud.TaskWriteError as error:
+        raise HTTPException(status_code=error.status_code, detail=error.detail)
+    if updated_task is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
+    response.headers["ETag"] = etags.object_etag("task", updated_task["id"], updated_task["updated_at"])
+    return updated_task
 
-    # Проверяем существование статуса (если указан)
-    if task.status_id and not await crud.get_status(task.status_id):
-        raise HTTPException(status_code=404, detail="Статус не найден")
 
-    updated_task = await crud.update_task(
+@router.patch("/{task_id}/assignees", response_model=schemas.TaskWithAssigneeIds)
+async def update_task_assignees(
+        task_id: int,
+        changes: schemas.TaskAssigneesUpdate,
+        response: Response,
+        current_user=Depends(get_current_user)
+):
+    """Добавить и снять исполнителей, не передавая весь набор (несуществующие пользователи пропускаются)"""
+    if set(changes.add) & set(changes.remove):
+        raise HTTPException(status_code=400, detail="Пользователь указан одновременно в add и remove")
+    result = await crud.update_task_assignees(
         task_id=task_id,
-        task=task,
+        add=changes.add,
+        remove=changes.remove,
         user_id=current_user.id,
         user_role=current_user.role
     )
-    return updated_task
+    if result is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена или нет доступа")
+    db_task, assignee_ids = result
+    response.headers["ETag"] = etags.object_etag("task", db_task["id"], db_task["updated_at"])
+    return {**db_task, "assignee_ids": assignee_ids}
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,21 +1,29 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional, Union
 import crud
 import schemas
+from pagination import MAX_PAGE, decode_cursor, make_page
 from auth import get_current_user, require_admin
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("/", response_model=List[schemas.User])
+@router.get("/", response_model=Union[schemas.Page[schemas.User], List[schemas.User]])
 async def read_users(
-    skip: int = 0, 
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE),
+    cursor: Optional[str] = Query(None, description="Курсор страницы (пустая строка - первая); ответ будет с next_cursor"),
     current_user = Depends(require_admin)
 ):
     """Получить список всех пользователей (только для админов)"""
-    users = await crud.get_users(skip=skip, limit=limit)
-    return users
+    users = await crud.get_users(
+        skip=skip,
+        limit=limit if cursor is None else limit + 1,
+        after_id=decode_cursor(cursor)
+    )
+    if cursor is None:
+        return users
+    return make_page(users, limit)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
@@ -1,7 +1,14 @@
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import Optional, List
+from typing import Optional, List, Generic, TypeVar
 from datetime import datetime
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 
 class Token(BaseModel):
     access_token: str
@@ -145,6 +152,34 @@ class TaskUpdate(BaseModel):
     assignee_ids: Optional[List[int]] = None
 
 
+class TaskAssigneesUpdate(BaseModel):
+    add: List[int] = []
+    remove: List[int] = []
+
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=10000)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+
 class Task(TaskBase):
     id: int
     project_id: int
@@ -157,6 +192,10 @@ class Task(TaskBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TaskWithAssigneeIds(Task):
+    assignee_ids: List[int] = []
+
+
 class TaskWithDetails(Task):
     priority: Optional[Priority] = None
     status: Optional[Status] = None
@@ -218,3 +257,46 @@ class AttachmentWithUser(Attachment):
     user: Optional[User] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SearchHit(BaseModel):
+    type: str  # task или comment
+    task_id: int
+    comment_id: Optional[int] = None
+    snippet: str  # экранированный HTML, найденные слова в <b></b>
+    snippet: str
+    rank: float
+
+
+class CountItem(BaseModel):
+    id: Optional[int] = None
+    count: int
+
+
+class ProjectStats(BaseModel):
+    project_id: int
+    total: int
+    by_status: List[CountItem]
+    by_priority: List[CountItem]
+    by_assignee: List[CountItem]
+    overdue: int
+    due_this_week: int
+
+
+class SyncTask(TaskWithAssigneeIds):
+    pass
+
+
+class SyncTombstone(BaseModel):
+    entity: str  # project, task, comment или attachment
+    id: int
+
+
+class SyncResult(BaseModel):
+    next_token: str
+    has_more: bool
+    projects: List[Project] = []
+    tasks: List[SyncTask] = []
+    comments: List[Comment] = []
+    attachments: List[Attachment] = []
+    deleted: List[SyncTombstone] = []
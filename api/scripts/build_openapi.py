@@ -0,0 +1,18 @@
+"""Сборка схемы OpenAPI в файл при сборке образа: воркеры загружают ее вместо генерации.
+
+Запуск из каталога api (подключение к БД не нужно):
+    python -m scripts.build_openapi
+"""
+import config
+import startup
+from main import app
+
+
+def main():
+    path = startup.API_DIR / (config.OPENAPI_SCHEMA_FILE or "openapi.json")
+    startup.write_openapi(app, path)
+    print(f"Схема OpenAPI сохранена в {path} ({len(app.openapi()['paths'])} путей)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Планы выполнения SQL-запросов crud на синтетических данных: проверка использования индексов.
+
+Каждый сценарий выполняется через crud, его SELECT-запросы перехватываются и повторяются с
+EXPLAIN (ANALYZE, BUFFERS) на PostgreSQL или EXPLAIN QUERY PLAN на SQLite.
+Запуск из каталога api (после aerich upgrade):
+    DATABASE_URL=postgres://... python -m scripts.explain --users 1000 --tasks 100000
+"""
+import argparse
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+import crud
+import instrumentation
+import models
+import visibility
+from database import close_db, get_connection
+from benchmarks.common import setup_db, seed
+
+SEQ_SCAN_MARKERS = ("Seq Scan", "SCAN ")
+
+
+async def _first_batch(project_id: int, user_id: int):
+    async for _ in visibility.iter_project_tasks(project_id, user_id, "user"):
+        return
+
+
+async def build_cases() -> List[Tuple[str, Callable[[], Awaitable]]]:
+    """Сценарии crud от лица обычного пользователя с задачами и от лица админа"""
+    task = await models.Task.filter(title__startswith="bench task", created_by_id__not_isnull=True).order_by(
+        "-id").first()
+    user_id, project_id, status_id = task.created_by_id, task.project_id, task.status_id
+    return [
+        ("get_tasks (пользователь)", lambda: crud.get_tasks(user_id=user_id, user_role="user", limit=20)),
+        ("get_tasks (пользователь, курсор)",
+         lambda: crud.get_tasks(user_id=user_id, user_role="user", limit=20, after_id=task.id // 2)),
+        ("get_tasks (пользователь, проект)",
+         lambda: crud.get_tasks(user_id=user_id, user_role="user", limit=20, project_id=project_id)),
+        ("get_tasks (админ, проект и статус)",
+         lambda: crud.get_tasks(user_role="admin", limit=20, project_id=project_id, status_id=status_id)),
+        ("get_task", lambda: crud.get_task(task.id, user_id=user_id, user_role="user")),
+        ("can_access_task", lambda: crud.can_access_task(task.id, user_id=user_id, user_role="user")),
+        ("get_projects (пользователь)", lambda: crud.get_projects(user_id=user_id, user_role="user")),
+        ("get_comments_by_task", lambda: crud.get_comments_by_task(task.id, limit=20)),
+        ("get_attachments_by_task", lambda: crud.get_attachments_by_task(task.id, limit=20)),
+        ("iter_project_tasks (первая пачка)", lambda: _first_batch(project_id, user_id)),
+    ]
+
+
+async def capture(call) -> List[Tuple[str, list]]:
+    """SELECT-запросы, выполненные вызовом (повторы одной формы не дублируются)"""
+    captured, shapes = [], set()
+
+    def listener(sql, values, duration):
+        shape = instrumentation.statement_shape(sql)
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")) and shape not in shapes:
+            shapes.add(shape)
+            captured.append((sql, list(values or [])))
+
+    instrumentation.ensure_query_hook()
+    instrumentation.add_query_listener(listener)
+    try:
+        await call()
+    finally:
+        instrumentation.remove_query_listener(listener)
+    return captured
+
+
+async def explain(sql: str, values: list, analyze: bool) -> List[str]:
+    connection = get_connection()
+    if connection.capabilities.dialect == "postgres":
+        options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+        rows = await connection.execute_query_dict(f"EXPLAIN ({options}) {sql}", values)
+        return [row["QUERY PLAN"] for row in rows]
+    rows = await connection.execute_query_dict(f"EXPLAIN QUERY PLAN {sql}", values)
+    return [row["detail"] for row in rows]
+
+
+async def run(args):
+    await setup_db()
+    try:
+        await seed(users=args.users, projects=args.projects, tasks=args.tasks, comments_per_task=args.comments)
+        connection = get_connection()
+        if connection.capabilities.dialect == "postgres":
+            # Свежая статистика, иначе планировщик оценивает таблицы как пустые
+            await connection.execute_script("ANALYZE")
+
+        seq_scans = []
+        for label, call in await build_cases():
+            print(f"=== {label}")
+            for sql, values in await capture(call):
+                plan = await explain(sql, values, analyze=not args.no_analyze)
+                print(f"--- {sql}\n    параметры: {values}")
+                print("\n".join(f"    {line}" for line in plan))
+                seq_scans.extend(f"{label}: {line.strip()}" for line in plan
+                                 if any(marker in line for marker in SEQ_SCAN_MARKERS))
+            print()
+
+        print("Последовательные сканирования:" if seq_scans else "Последовательных сканирований нет")
+        for line in seq_scans:
+            print(f"  {line}")
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--comments", type=int, default=1, help="Комментариев на задачу")
+    parser.add_argument("--no-analyze", action="store_true", help="Только план, без выполнения запросов")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Пересчет материализованных счетчиков задач проектов (project_counter) из таблицы task.
+
+Нужен после включения PROJECT_STATS_MATERIALIZED на базе, где задачи менялись в обход crud
+(init_data, бенчмарки, ручные правки). Запуск из каталога api:
+    DATABASE_URL=postgres://... python -m scripts.rebuild_project_counters
+"""
+import asyncio
+from tortoise.transactions import in_transaction
+import project_stats
+from database import init_db, close_db
+
+
+async def run():
+    await init_db()
+    try:
+        async with in_transaction() as connection:
+            await project_stats.rebuild(connection=connection)
+        print("Счетчики проектов пересчитаны")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+"""Отчет о времени запуска процесса: импорт модулей (по данным python -X importtime) и фазы lifespan.
+
+Импорт main замеряется в отдельном процессе с -X importtime: время разбивается по прямым импортам
+main (с вложенными) и по пакетам верхнего уровня (собственное время модулей). Затем в этом процессе
+выполняется lifespan и печатаются фазы startup.PHASES - те же, что в app_startup_seconds на /metrics.
+Запуск из каталога api:
+    DATABASE_URL=postgres://... python -m scripts.startup_report --top 15
+"""
+import argparse
+import asyncio
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Tuple
+
+API_DIR = Path(__file__).resolve().parent.parent
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def importtime(module: str) -> List[Tuple[str, int, int, int]]:
+    """Строки -X importtime: (модуль, собственное время, с вложенными - мкс, глубина)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=API_DIR,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    return rows
+
+
+def print_table(title: str, items: List[Tuple[str, float]], total: float, top: int):
+    print(title)
+    for name, value in items[:top]:
+        print(f"  {name:<40} {value / 1000:>8.1f} мс {value / total * 100:>5.1f}%")
+
+
+async def lifespan_phases():
+    import startup
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        pass
+    return startup.PHASES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = importtime(args.module)
+    # Модуль печатается после своих вложенных импортов: блок args.module - строки после предыдущего
+    # модуля верхнего уровня (до него - импорты самого интерпретатора, site и .pth)
+    end = next(index for index, row in enumerate(rows) if row[0] == args.module and row[3] == 0)
+    start = max((index for index in range(end) if rows[index][3] == 0), default=-1) + 1
+    rows = rows[start:end + 1]
+    total = rows[-1][2]
+    print(f"Импорт {args.module}: {total / 1000:.1f} мс, модулей {len(rows)}")
+
+    direct = sorted(((name, cumulative) for name, _, cumulative, depth in rows if depth == 1),
+                    key=lambda item: -item[1])
+    print_table(f"Прямые импорты {args.module} (с вложенными):", direct, total, args.top)
+
+    packages = defaultdict(int)
+    for name, own, _, _ in rows:
+        packages[name.split(".")[0]] += own
+    print_table("Пакеты (собственное время модулей):", sorted(packages.items(), key=lambda item: -item[1]),
+                total, args.top)
+
+    phases = asyncio.run(lifespan_phases())
+    print("Фазы запуска в этом процессе:")
+    for name, seconds in phases.items():
+        print(f"  {name:<40} {seconds * 1000:>8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
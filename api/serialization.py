@@ -0,0 +1,65 @@
+"""Сериализация списков в JSON без валидации pydantic: словари из SQL сразу в orjson"""
+from datetime import datetime
+from inspect import isclass
+from typing import Callable, List, Optional, Union, get_args, get_origin
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Формат дат как у pydantic: UTC с суффиксом Z, наивные - без смещения
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _to_datetime(value):
+    # SQLite в сыром SQL возвращает время строкой
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _optional(convert: Callable) -> Callable:
+    return lambda value: None if value is None else convert(value)
+
+
+def _model(model) -> Callable:
+    fields = [(name, _converter(field.annotation)) for name, field in model.model_fields.items()]
+
+    def convert(row):
+        return {name: row[name] if convert_field is None else convert_field(row[name])
+                for name, convert_field in fields}
+    return convert
+
+
+def _converter(annotation) -> Optional[Callable]:
+    """Функция приведения значения к виду, который выдал бы pydantic (None - значение уже подходит)"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        convert = _converter(args[0]) if len(args) == 1 else None
+        return _optional(convert) if convert else None
+    if origin in (list, List):
+        convert = _converter(get_args(annotation)[0])
+        return (lambda values: [convert(value) for value in values]) if convert else None
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return _model(annotation)
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is bool:
+        # SQLite возвращает 0/1
+        return bool
+    return None
+
+
+class TrustedSerializer:
+    """JSON по схеме ответа для данных, собранных самим сервером (без проверки и создания моделей).
+
+    Ключи и значения приводятся к тому же виду, что у response_model, но без валидации:
+    словари должны содержать все поля схемы.
+    """
+
+    def __init__(self, annotation):
+        self._convert = _converter(annotation) or (lambda value: value)
+
+    def dumps(self, content) -> bytes:
+        return orjson.dumps(self._convert(content), option=ORJSON_OPTIONS)
+
+    def response(self, content, headers: Optional[dict] = None) -> Response:
+        return Response(self.dumps(content), media_type="application/json", headers=headers)
@@ -0,0 +1,39 @@
+#!/bin/bash
+# Запуск uvicorn в режиме SERVER_MODE: dev - один процесс с --reload, prod - несколько воркеров
+set -e
+HOST="${HOST:-0.0.0.0}"
+PORT="${PORT:-8000}"
+# Адреса прокси, которым доверяются X-Forwarded-For/-Proto: по нему считаются лимиты по IP.
+# Доверять всем ("*") можно, только если до uvicorn нельзя достучаться в обход прокси
+FORWARDED_ALLOW_IPS="${FORWARDED_ALLOW_IPS:-127.0.0.1}"
+
+if [ "${SERVER_MODE:-dev}" != "prod" ]; then
+    # --reload запускает один процесс, сколько бы воркеров ни было задано
+    WEB_CONCURRENCY=1 exec uvicorn main:app --host "$HOST" --port "$PORT" --reload \
+        --forwarded-allow-ips "$FORWARDED_ALLOW_IPS"
+fi
+
+# У каждого воркера свой пул соединений: WEB_CONCURRENCY * DB_POOL_MAX_SIZE (+1 на LISTEN
+# при EVENTS_BACKEND=postgres) должно помещаться в max_connections PostgreSQL
+WORKERS="${WEB_CONCURRENCY:-$(nproc)}"
+export WEB_CONCURRENCY="$WORKERS"
+# С memory события /ws и /events не выходят за пределы воркера: между воркерами - LISTEN/NOTIFY
+export EVENTS_BACKEND="${EVENTS_BACKEND:-postgres}"
+ACCESS_LOG="--no-access-log"
+if [ "${UVICORN_ACCESS_LOG:-false}" = "true" ]; then
+    ACCESS_LOG="--access-log"
+fi
+
+# keep-alive дольше idle-таймаута балансировщика (обычно 60 с), иначе он получает обрывы соединений.
+# exec: SIGTERM получает сам uvicorn - воркеры перестают принимать соединения, дожидаются
+# текущих запросов (не дольше UVICORN_GRACEFUL_TIMEOUT) и выполняют shutdown lifespan (close_db)
+echo "Запуск в режиме prod: воркеров $WORKERS, события через $EVENTS_BACKEND"
+exec uvicorn main:app --host "$HOST" --port "$PORT" \
+    --workers "$WORKERS" \
+    --forwarded-allow-ips "$FORWARDED_ALLOW_IPS" \
+    --loop uvloop \
+    --http httptools \
+    --timeout-keep-alive "${UVICORN_KEEPALIVE:-65}" \
+    --backlog "${UVICORN_BACKLOG:-2048}" \
+    --timeout-graceful-shutdown "${UVICORN_GRACEFUL_TIMEOUT:-20}" \
+    $ACCESS_LOG
@@ -0,0 +1,77 @@
+"""Время запуска процесса по фазам и предсобранная схема OpenAPI"""
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+import orjson
+import config
+import metrics
+
+# Логгер uvicorn: итог запуска попадает в его вывод без отдельной настройки logging
+logger = logging.getLogger("uvicorn.error")
+
+API_DIR = Path(__file__).resolve().parent
+
+# Отсчет от импорта модуля: main импортирует его первым, а сам модуль не тянет FastAPI и pydantic
+STARTED = time.perf_counter()
+# {фаза: секунды}; imports - импорт приложения, остальные - шаги lifespan
+PHASES: Dict[str, float] = {}
+
+STARTUP_SECONDS = metrics.Gauge(
+    "app_startup_seconds", "Длительность фаз запуска процесса", ("phase",),
+    callback=lambda: {(name,): round(seconds, 6) for name, seconds in PHASES.items()},
+)
+
+
+def mark(name: str):
+    """Фаза от начала отсчета до текущего момента"""
+    PHASES[name] = time.perf_counter() - STARTED
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASES[name] = time.perf_counter() - started
+
+
+def report():
+    """Итог запуска в лог; total - от импорта main до готовности принимать запросы"""
+    mark("total")
+    logger.info("Запуск за %.3f с: %s", PHASES["total"],
+                ", ".join(f"{name}={seconds:.3f}" for name, seconds in PHASES.items() if name != "total"))
+
+
+def source_fingerprint() -> str:
+    """Хеш исходников приложения и версий FastAPI и pydantic, от которых зависит схема"""
+    import fastapi
+    import pydantic
+
+    digest = hashlib.sha256(f"{fastapi.__version__}:{pydantic.VERSION}".encode())
+    for path in sorted([*API_DIR.glob("*.py"), *API_DIR.glob("routers/*.py")]):
+        digest.update(path.relative_to(API_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def write_openapi(app, path: Path):
+    path.write_bytes(orjson.dumps({"fingerprint": source_fingerprint(), "schema": app.openapi()}))
+
+
+def load_openapi(app) -> bool:
+    """Схема из OPENAPI_SCHEMA_FILE вместо генерации в каждом воркере; файл от других исходников не берется"""
+    if not config.OPENAPI_SCHEMA_FILE:
+        return False
+    path = API_DIR / config.OPENAPI_SCHEMA_FILE
+    if not path.exists():
+        return False
+    document = orjson.loads(path.read_bytes())
+    if document.get("fingerprint") != source_fingerprint():
+        logger.warning("Схема OpenAPI в %s собрана для других исходников, будет сгенерирована заново", path)
+        return False
+    app.openapi_schema = document["schema"]
+    return True
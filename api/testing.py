@@ -0,0 +1,150 @@
+"""Pytest-фикстуры: приложение на SQLite в памяти или локальном PostgreSQL с контролем SQL-запросов.
+
+Подключен в tests/conftest.py (pytest_plugins = ["testing"]); запуск тестов из каталога api: pytest.
+База берется из TEST_DATABASE_URL (по умолчанию sqlite://:memory:). Каждый HTTP-запрос проверяется
+по бюджетам query_tracking; режим задается QUERY_TRACKING (по умолчанию raise - тест падает).
+"""
+import os
+
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("QUERY_TRACKING", "raise")
+# Все запросы тестов идут с одного адреса; проверки лимитов включают фикстурой rate_limits
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from tortoise import Tortoise  # noqa: E402
+import auth  # noqa: E402
+import config  # noqa: E402
+import fulltext  # noqa: E402
+import models  # noqa: E402
+import ratelimit  # noqa: E402
+import refdata  # noqa: E402
+from database import init_db, close_db, get_connection  # noqa: E402
+from hashing import hash_password, shutdown_pool  # noqa: E402
+from main import app  # noqa: E402
+from query_tracking import track_queries  # noqa: E402
+
+TEST_PASSWORD = "password123"
+
+
+def _table_names():
+    tables = set()
+    for model in Tortoise.apps["models"].values():
+        if model.__module__ != "models":
+            continue
+        tables.add(model._meta.db_table)
+        tables.update(model._meta.fields_map[name].through for name in model._meta.m2m_fields)
+    return sorted(tables)
+
+
+class _AsyncioBackend:
+    @pytest.fixture(scope="module")
+    def anyio_backend(self):
+        return "asyncio"
+
+
+def pytest_configure(config):
+    # Регистрируется позже плагина anyio и переопределяет его набор бэкендов: Tortoise работает только на asyncio
+    config.pluginmanager.register(_AsyncioBackend(), "testing_asyncio_backend")
+
+
+@pytest.fixture
+async def db(anyio_backend):
+    """Чистая база на время теста: SQLite создается заново, таблицы PostgreSQL очищаются перед тестом"""
+    await init_db()
+    connection = get_connection()
+    await Tortoise.generate_schemas(safe=True)
+    if connection.capabilities.dialect == "postgres":
+        tables = ", ".join(f'"{table}"' for table in _table_names())
+        await connection.execute_script(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+    try:
+        yield connection
+    finally:
+        auth.user_cache.clear()
+        auth.token_cache.clear()
+        auth.active_cache.clear()
+        refdata.priorities.invalidate()
+        refdata.statuses.invalidate()
+        fulltext.invalidate()
+        ratelimit.reset_backend()
+        await close_db()
+        shutdown_pool()
+
+
+@pytest.fixture
+def password_hash():
+    return hash_password(TEST_PASSWORD)
+
+
+@pytest.fixture
+def make_user(db, password_hash):
+    """Фабрика пользователей: await make_user("bob", role="admin")"""
+    async def factory(username: str, role: str = "user", **kwargs) -> models.User:
+        return await models.User.create(username=username, email=f"{username}@example.com",
+                                        password_hash=password_hash, role=role, **kwargs)
+    return factory
+
+
+@pytest.fixture
+async def client_for(db):
+    """Фабрика HTTP-клиентов приложения: await client_for(user) или await client_for() без токена"""
+    clients = []
+
+    async def factory(user: models.User = None) -> httpx.AsyncClient:
+        headers = {}
+        if user is not None:
+            token = auth.create_access_token(data=auth.access_token_claims(user))
+            headers["Authorization"] = f"Bearer {token}"
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test",
+                                   headers=headers)
+        clients.append(client)
+        return client
+
+    try:
+        yield factory
+    finally:
+        for client in clients:
+            await client.aclose()
+
+
+@pytest.fixture
+async def seeded(make_user):
+    """Типовой набор данных: админ, владелец проекта, исполнитель, посторонний, проект и задача"""
+    admin = await make_user("admin", role="admin")
+    owner = await make_user("owner")
+    assignee = await make_user("assignee")
+    outsider = await make_user("outsider")
+    priority = await models.Priority.create(name="Высокий", level=3)
+    status = await models.Status.create(name="Новая", order_num=1)
+    project = await models.Project.create(name="Проект", created_by=owner)
+    task = await models.Task.create(title="Задача", project=project, priority=priority, status=status,
+                                    created_by=owner)
+    await task.assignees.add(assignee)
+    # Справочники загружаются, как при старте приложения
+    await refdata.load_all()
+    return {"admin": admin, "owner": owner, "assignee": assignee, "outsider": outsider,
+            "priority": priority, "status": status, "project": project, "task": task}
+
+
+@pytest.fixture
+def rate_limits(db, monkeypatch):
+    """Ограничение частоты на чистом хранилище; правила - monkeypatch.setitem(ratelimit.RULES, ...)"""
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    ratelimit.reset_backend()
+    return ratelimit.get_backend()
+
+
+async def request_route(client: httpx.AsyncClient, route: str, url: str, **kwargs) -> httpx.Response:
+    """Запрос к маршруту "МЕТОД шаблон" с проверкой его бюджета SQL-запросов (QueryBudgetExceeded)"""
+    with track_queries(route) as tracker:
+        response = await client.request(route.split(" ", 1)[0], url, **kwargs)
+    tracker.check(mode="raise")
+    return response
+
+
+@pytest.fixture
+async def query_tracker(db):
+    """Все SQL-запросы теста: query_tracker.count, query_tracker.repeated()"""
+    with track_queries("test") as tracker:
+        yield tracker
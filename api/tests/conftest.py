@@ -0,0 +1,2 @@
+# Фикстуры приложения и проверка бюджетов SQL-запросов (QUERY_TRACKING=raise) - в testing.py
+pytest_plugins = ["testing"]
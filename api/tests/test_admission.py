@@ -0,0 +1,57 @@
+import asyncio
+import httpx
+import pytest
+import admission
+import config
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def controlled(monkeypatch):
+    """Приложение за AdmissionMiddleware с одним слотом и одним местом в очереди; /slow ждет release"""
+    controller = admission.AdmissionController(concurrency=1, queue_size=1, timeout=0.2)
+    monkeypatch.setattr(admission, "controller", controller)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    transport = httpx.ASGITransport(app=admission.AdmissionMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client, controller, release
+
+
+async def test_overload_rejected_with_retry_after(controlled):
+    client, controller, release = controlled
+    slow = asyncio.create_task(client.get("/slow"))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(client.get("/fast"))
+    await asyncio.sleep(0.05)
+
+    response = await client.get("/fast")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(config.ADMISSION_RETRY_AFTER)
+    # Служебные пути не ждут допуска
+    assert (await client.get("/health")).status_code == 200
+    # Ожидание в очереди дольше timeout - тоже 503
+    assert (await queued).status_code == 503
+
+    release.set()
+    assert (await slow).status_code == 200
+    assert (controller.active, controller.waiting) == (0, 0)
+
+
+async def test_queued_request_admitted(controlled):
+    client, controller, release = controlled
+    slow = asyncio.create_task(client.get("/slow"))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(client.get("/fast"))
+    await asyncio.sleep(0.05)
+    release.set()
+    assert (await slow).status_code == 200
+    assert (await queued).status_code == 200
+    assert (controller.active, controller.waiting) == (0, 0)
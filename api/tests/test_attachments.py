@@ -0,0 +1,34 @@
+import pytest
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_attachment_lifecycle(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    assignee = await client_for(seeded["assignee"])
+    outsider = await client_for(seeded["outsider"])
+    task_id = seeded["task"].id
+    body = {"task_id": task_id, "filename": "plan.pdf", "filepath": "/files/plan.pdf"}
+
+    response = await request_route(assignee, "POST /attachments/", "/attachments/", json=body)
+    assert response.status_code == 201, response.text
+    attachment_id = response.json()["id"]
+    assert (await request_route(outsider, "POST /attachments/", "/attachments/", json=body)).status_code == 404
+
+    response = await request_route(owner, "GET /attachments/task/{task_id}", f"/attachments/task/{task_id}")
+    assert response.status_code == 200
+    assert [attachment["id"] for attachment in response.json()] == [attachment_id]
+    response = await request_route(outsider, "GET /attachments/task/{task_id}", f"/attachments/task/{task_id}")
+    assert response.status_code == 404
+
+    response = await request_route(owner, "GET /attachments/{attachment_id}", f"/attachments/{attachment_id}")
+    assert response.status_code == 200
+    assert response.json()["filename"] == "plan.pdf"
+
+    response = await request_route(owner, "DELETE /attachments/{attachment_id}", f"/attachments/{attachment_id}")
+    assert response.status_code == 403
+    response = await request_route(assignee, "DELETE /attachments/{attachment_id}",
+                                   f"/attachments/{attachment_id}")
+    assert response.status_code == 204
+    assert (await owner.get(f"/attachments/{attachment_id}")).status_code == 404
@@ -0,0 +1,73 @@
+import pytest
+import auth
+import config
+import models
+from testing import TEST_PASSWORD, request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_register_login_refresh_me(seeded, client_for):
+    anonymous = await client_for()
+    response = await request_route(anonymous, "POST /auth/register", "/auth/register",
+                                   json={"username": "newbie", "email": "newbie@example.com",
+                                         "password": TEST_PASSWORD})
+    assert response.status_code == 201, response.text
+    assert response.json()["role"] == "user"
+
+    response = await request_route(anonymous, "POST /auth/register", "/auth/register",
+                                   json={"username": "newbie", "email": "other@example.com",
+                                         "password": TEST_PASSWORD})
+    assert response.status_code == 400
+
+    response = await request_route(anonymous, "POST /auth/login", "/auth/login",
+                                   data={"username": "newbie", "password": TEST_PASSWORD})
+    assert response.status_code == 200, response.text
+    tokens = response.json()
+
+    response = await request_route(anonymous, "POST /auth/refresh", "/auth/refresh",
+                                   params={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+    response = await request_route(anonymous, "GET /auth/me", "/auth/me",
+                                   headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "newbie"
+
+
+async def test_login_rejects_wrong_password(seeded, client_for):
+    anonymous = await client_for()
+    response = await request_route(anonymous, "POST /auth/login", "/auth/login",
+                                   data={"username": "owner", "password": "wrong-password"})
+    assert response.status_code == 401
+    assert (await anonymous.get("/auth/me")).status_code == 401
+
+
+async def test_trusted_claims_revocation(seeded, client_for, monkeypatch):
+    monkeypatch.setattr(config, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    assignee, outsider = seeded["assignee"], seeded["outsider"]
+    client = await client_for(assignee)
+    response = await request_route(client, "GET /auth/me", "/auth/me")
+    assert response.status_code == 200 and response.json()["id"] == assignee.id
+
+    # Удаление через API сбрасывает кэш проверки активности в этом воркере
+    admin = await client_for(seeded["admin"])
+    assert (await admin.delete(f"/users/{assignee.id}")).status_code == 204
+    assert (await client.get("/auth/me")).status_code == 401
+    assert (await client.get("/tasks/")).status_code == 401
+
+    # Деактивация в обход API - не позже AUTH_ACTIVE_CHECK_TTL (здесь кэш сброшен вручную)
+    client = await client_for(outsider)
+    assert (await client.get("/tasks/")).status_code == 200
+    await models.User.filter(id=outsider.id).update(is_active=False)
+    auth.active_cache.clear()
+    assert (await client.get("/tasks/")).status_code == 401
+
+
+async def test_trusted_claims_user_deleted_after_check(seeded, client_for, monkeypatch):
+    monkeypatch.setattr(config, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    assignee = seeded["assignee"]
+    auth.active_cache.set(assignee.id, True)
+    await models.User.filter(id=assignee.id).delete()
+    client = await client_for(assignee)
+    assert (await client.get("/auth/me")).status_code == 401
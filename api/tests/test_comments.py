@@ -0,0 +1,45 @@
+import pytest
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_comment_lifecycle(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    assignee = await client_for(seeded["assignee"])
+    outsider = await client_for(seeded["outsider"])
+    task_id = seeded["task"].id
+
+    response = await request_route(assignee, "POST /comments/", "/comments/",
+                                   json={"task_id": task_id, "content": "Первый"})
+    assert response.status_code == 201, response.text
+    comment_id = response.json()["id"]
+    response = await request_route(outsider, "POST /comments/", "/comments/",
+                                   json={"task_id": task_id, "content": "Чужой"})
+    assert response.status_code == 404
+
+    response = await request_route(owner, "GET /comments/task/{task_id}", f"/comments/task/{task_id}")
+    assert response.status_code == 200
+    assert [comment["id"] for comment in response.json()] == [comment_id]
+    assert response.json()[0]["user"]["id"] == seeded["assignee"].id
+    response = await request_route(owner, "GET /comments/task/{task_id}", f"/comments/task/{task_id}",
+                                   params={"cursor": ""})
+    assert response.json()["next_cursor"] is None
+    response = await request_route(outsider, "GET /comments/task/{task_id}", f"/comments/task/{task_id}")
+    assert response.status_code == 404
+
+    response = await request_route(owner, "GET /comments/{comment_id}", f"/comments/{comment_id}")
+    assert response.status_code == 200
+    response = await request_route(owner, "PUT /comments/{comment_id}", f"/comments/{comment_id}",
+                                   json={"content": "Не свой"})
+    assert response.status_code == 403
+    response = await request_route(assignee, "PUT /comments/{comment_id}", f"/comments/{comment_id}",
+                                   json={"content": "Исправлен"})
+    assert response.status_code == 200
+    assert response.json()["content"] == "Исправлен"
+
+    response = await request_route(outsider, "DELETE /comments/{comment_id}", f"/comments/{comment_id}")
+    assert response.status_code == 404
+    response = await request_route(assignee, "DELETE /comments/{comment_id}", f"/comments/{comment_id}")
+    assert response.status_code == 204
+    assert (await owner.get(f"/comments/{comment_id}")).status_code == 404
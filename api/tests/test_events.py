@@ -0,0 +1,73 @@
+import asyncio
+import json
+import pytest
+import config
+import notifications
+
+pytestmark = pytest.mark.anyio
+
+
+async def received(subscription) -> list:
+    # Рассылка идет фоновой задачей hub
+    await asyncio.sleep(0.2)
+    messages = []
+    while not subscription.queue.empty():
+        message = subscription.queue.get_nowait()
+        messages.append(message if message is None else json.loads(message))
+    return messages
+
+
+@pytest.fixture
+async def hub(db):
+    try:
+        yield notifications.hub
+    finally:
+        await notifications.hub.stop()
+
+
+async def test_events_follow_task_access(hub, seeded, client_for):
+    owner, assignee, outsider = seeded["owner"], seeded["assignee"], seeded["outsider"]
+    client = await client_for(owner)
+    owner_events = await hub.subscribe(owner.id, owner.role)
+    assignee_events = await hub.subscribe(assignee.id, assignee.role)
+    outsider_events = await hub.subscribe(outsider.id, outsider.role)
+    admin_events = await hub.subscribe(seeded["admin"].id, "admin")
+
+    task_id = (await client.post("/tasks/", json={"title": "Новая", "project_id": seeded["project"].id,
+                                                  "assignee_ids": [assignee.id]})).json()["id"]
+    await client.post("/comments/", json={"task_id": task_id, "content": "Привет"})
+    # Круг доступа комментария вычисляется при рассылке - она должна пройти до снятия исполнителя
+    await asyncio.sleep(0.2)
+    await client.put(f"/tasks/{task_id}", json={"assignee_ids": []})
+
+    assert [event["type"] for event in await received(owner_events)] == [
+        "task.created", "comment.created", "task.updated"]
+    # Снятый исполнитель узнает, что задача ему больше не видна
+    assert [event["type"] for event in await received(assignee_events)] == [
+        "task.created", "comment.created", "task.revoked"]
+    assert await received(outsider_events) == []
+    assert len(await received(admin_events)) == 3
+
+
+async def test_slow_subscriber_gets_resync(hub, db):
+    subscription = await hub.subscribe(1, "user")
+    for _ in range(config.EVENTS_QUEUE_SIZE + 1):
+        subscription.offer("{}")
+    assert subscription.closed
+    assert await received(subscription) == [{"type": "resync"}, None]
+
+
+async def test_events_require_token(seeded, client_for):
+    client = await client_for()
+    assert (await client.get("/events")).status_code == 401
+
+
+def test_memory_backend_with_workers_warns(monkeypatch, caplog):
+    monkeypatch.setattr(config, "EVENTS_BACKEND", "memory")
+    monkeypatch.setattr(config, "WEB_CONCURRENCY", 4)
+    notifications.check_backend()
+    assert "EVENTS_BACKEND=memory" in caplog.text
+    caplog.clear()
+    monkeypatch.setattr(config, "EVENTS_BACKEND", "postgres")
+    notifications.check_backend()
+    assert caplog.text == ""
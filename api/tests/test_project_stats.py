@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+import config
+import models
+import project_stats
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=[False, True], ids=["live", "materialized"])
+async def materialized(request, seeded, monkeypatch):
+    monkeypatch.setattr(config, "PROJECT_STATS_MATERIALIZED", request.param)
+    if request.param:
+        await project_stats.rebuild()
+    return request.param
+
+
+async def assert_counters_fresh(project_id: int):
+    """Материализованные счетчики совпадают с подсчетом по task"""
+    stats = await project_stats.get_stats(project_id)
+    if config.PROJECT_STATS_MATERIALIZED:
+        config.PROJECT_STATS_MATERIALIZED = False
+        try:
+            assert await project_stats.get_stats(project_id) == stats
+        finally:
+            config.PROJECT_STATS_MATERIALIZED = True
+    return stats
+
+
+async def test_counters_follow_writes(materialized, seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    done = await models.Status.create(name="Готово", order_num=9, is_final=True)
+    response = await request_route(owner, "POST /tasks/", "/tasks/", json={
+        "title": "Вторая", "project_id": project_id, "status_id": done.id,
+        "assignee_ids": [seeded["assignee"].id, seeded["owner"].id]})
+    task_id = response.json()["id"]
+    await request_route(owner, "PATCH /tasks/bulk", "/tasks/bulk",
+                        json={"items": [{"id": task_id, "priority_id": seeded["priority"].id}]})
+
+    stats = await assert_counters_fresh(project_id)
+    assert stats["total"] == 2
+    assert {item["id"]: item["count"] for item in stats["by_status"]} == {seeded["status"].id: 1, done.id: 1}
+    assert {item["id"]: item["count"] for item in stats["by_assignee"]} == {
+        seeded["assignee"].id: 2, seeded["owner"].id: 1}
+
+
+async def test_counters_after_reference_deletes(materialized, seeded, client_for):
+    admin = await client_for(seeded["admin"])
+    project_id = seeded["project"].id
+    other = await models.Project.create(name="Без ссылок", created_by=seeded["outsider"])
+    await models.Task.create(title="Чужая", project=other, created_by=seeded["outsider"])
+    if materialized:
+        await project_stats.rebuild()
+
+    response = await request_route(admin, "DELETE /statuses/{status_id}", f"/statuses/{seeded['status'].id}")
+    assert response.status_code == 204
+    response = await request_route(admin, "DELETE /priorities/{priority_id}",
+                                   f"/priorities/{seeded['priority'].id}")
+    assert response.status_code == 204
+    response = await request_route(admin, "DELETE /users/{user_id}", f"/users/{seeded['assignee'].id}")
+    assert response.status_code == 204
+
+    stats = await assert_counters_fresh(project_id)
+    assert stats["by_status"] == [{"id": None, "count": 1}]
+    assert stats["by_priority"] == [{"id": None, "count": 1}]
+    assert stats["by_assignee"] == []
+    assert (await assert_counters_fresh(other.id))["total"] == 1
+
+
+async def test_rebuild_concurrent_with_writes(materialized, seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    admin = await client_for(seeded["admin"])
+    project_id = seeded["project"].id
+    statuses = [await models.Status.create(name=f"Статус {index}", order_num=index) for index in range(3)]
+    creates = [owner.post("/tasks/", json={"title": f"t{index}", "project_id": project_id,
+                                           "status_id": seeded["status"].id,
+                                           "assignee_ids": [seeded["assignee"].id]})
+               for index in range(10)]
+    deletes = [admin.delete(f"/statuses/{status.id}") for status in statuses]
+    responses = await asyncio.gather(*creates, *deletes)
+    assert [response.status_code for response in responses] == [201] * 10 + [204] * 3
+    assert (await assert_counters_fresh(project_id))["total"] == 11
@@ -0,0 +1,112 @@
+import asyncio
+import csv
+import io
+import json
+import pytest
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_project_crud_and_access(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    outsider = await client_for(seeded["outsider"])
+    project_id = seeded["project"].id
+
+    response = await request_route(owner, "POST /projects/", "/projects/", json={"name": "Второй"})
+    assert response.status_code == 201
+    created_id = response.json()["id"]
+
+    response = await request_route(owner, "GET /projects/", "/projects/")
+    assert response.status_code == 200
+    assert {project["id"] for project in response.json()} == {project_id, created_id}
+    assert (await request_route(outsider, "GET /projects/", "/projects/")).json() == []
+
+    response = await request_route(owner, "GET /projects/{project_id}", f"/projects/{project_id}")
+    assert response.status_code == 200
+    response = await request_route(outsider, "GET /projects/{project_id}", f"/projects/{project_id}")
+    assert response.status_code == 404
+
+    response = await request_route(owner, "PUT /projects/{project_id}", f"/projects/{created_id}",
+                                   json={"name": "Переименован"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Переименован"
+    response = await request_route(outsider, "PUT /projects/{project_id}", f"/projects/{created_id}",
+                                   json={"name": "Чужой"})
+    assert response.status_code == 404
+
+    response = await request_route(owner, "DELETE /projects/{project_id}", f"/projects/{created_id}")
+    assert response.status_code == 204
+    assert (await owner.get(f"/projects/{created_id}")).status_code == 404
+
+
+async def test_project_etag(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    etag = (await owner.get(f"/projects/{project_id}")).headers["etag"]
+
+    response = await request_route(owner, "GET /projects/{project_id}", f"/projects/{project_id}",
+                                   headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    list_etag = (await owner.get("/projects/")).headers["etag"]
+    response = await request_route(owner, "GET /projects/", "/projects/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 304
+
+    response = await request_route(owner, "PUT /projects/{project_id}", f"/projects/{project_id}",
+                                   json={"name": "Новое имя"}, headers={"If-Match": '"stale"'})
+    assert response.status_code == 412
+    response = await request_route(owner, "PUT /projects/{project_id}", f"/projects/{project_id}",
+                                   json={"name": "Новое имя"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert (await owner.get("/projects/", headers={"If-None-Match": list_etag})).status_code == 200
+
+
+async def test_project_stats(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    response = await request_route(owner, "GET /projects/{project_id}/stats", f"/projects/{project_id}/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total"] == 1
+    assert stats["by_assignee"] == [{"id": seeded["assignee"].id, "count": 1}]
+    outsider = await client_for(seeded["outsider"])
+    assert (await outsider.get(f"/projects/{project_id}/stats")).status_code == 404
+
+
+async def test_export_formats(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    response = await request_route(owner, "GET /projects/{project_id}/tasks/export",
+                                   f"/projects/{project_id}/tasks/export")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [seeded["task"].id]
+    assert rows[0]["assignee_ids"] == [seeded["assignee"].id]
+    # Время в одном формате на SQLite и PostgreSQL
+    assert "T" in rows[0]["created_at"] and rows[0]["created_at"].endswith("+00:00")
+
+    response = await request_route(owner, "GET /projects/{project_id}/tasks/export",
+                                   f"/projects/{project_id}/tasks/export", params={"format": "csv"})
+    assert response.status_code == 200
+    header, row = list(csv.reader(io.StringIO(response.text)))
+    assert row[header.index("created_at")] == rows[0]["created_at"]
+
+    # Чужой проект не выгружается и не выдает своего существования
+    outsider = await client_for(seeded["outsider"])
+    for export_format in ("ndjson", "csv"):
+        response = await request_route(outsider, "GET /projects/{project_id}/tasks/export",
+                                       f"/projects/{project_id}/tasks/export", params={"format": export_format})
+        assert response.status_code == 404
+        missing = await outsider.get("/projects/99999/tasks/export", params={"format": export_format})
+        assert missing.json() == response.json()
+
+
+async def test_concurrent_if_match(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    etag = (await owner.get(f"/projects/{project_id}")).headers["etag"]
+    # Один ETag - одна запись: остальные параллельные запросы получают 412
+    responses = await asyncio.gather(*(owner.put(f"/projects/{project_id}", json={"name": f"p{index}"},
+                                                 headers={"If-Match": etag}) for index in range(5)))
+    assert sorted(response.status_code for response in responses) == [200] + [412] * 4
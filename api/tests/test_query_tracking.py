@@ -0,0 +1,18 @@
+import pytest
+import query_tracking
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_budget_exceeded_fails_request(seeded, client_for, monkeypatch):
+    monkeypatch.setitem(query_tracking.ROUTE_BUDGETS, "GET /tasks/", 1)
+    client = await client_for(seeded["owner"])
+    with pytest.raises(query_tracking.QueryBudgetExceeded, match="GET /tasks/"):
+        await client.get("/tasks/")
+
+
+async def test_repeated_queries_reported(query_tracker):
+    query_tracker.statements.extend(["SELECT * FROM task WHERE id = 1", "SELECT * FROM task WHERE id = 2",
+                                     "SELECT * FROM task WHERE id = 3"])
+    assert list(query_tracker.repeated().values()) == [3]
+    assert any("N+1" in problem for problem in query_tracker.problems(budget=10))
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+import config
+import models
+import ratelimit
+from testing import TEST_PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["memory", "database"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_BACKEND", request.param)
+    return request.param
+
+
+async def test_memory_refill():
+    now = [0.0]
+    backend = ratelimit.MemoryBackend(2, clock=lambda: now[0])
+    rule = ratelimit.Rule("x", 2, 1.0)
+    assert await backend.take("a", rule) == 0
+    assert await backend.take("a", rule) == 0
+    assert await backend.take("a", rule) == pytest.approx(1.0)
+    now[0] = 0.5
+    assert await backend.take("a", rule) == pytest.approx(0.5)
+    now[0] = 1.0
+    assert await backend.take("a", rule) == 0
+    # Сверх max_keys вытесняется самый давний ключ
+    await backend.take("b", rule)
+    await backend.take("c", rule)
+    assert list(backend._buckets) == ["b", "c"]
+
+
+async def test_database_backend_concurrent(db):
+    backend = ratelimit.DatabaseBackend(prune_interval=3600)
+    rule = ratelimit.Rule("x", 5, 0.0001)
+    results = await asyncio.gather(*(backend.take("x:k", rule) for _ in range(20)))
+    assert results.count(0) == 5
+    assert all(result == pytest.approx(1 / rule.rate) for result in results if result)
+
+
+async def test_database_backend_refill(db):
+    backend = ratelimit.DatabaseBackend(prune_interval=3600)
+    rule = ratelimit.Rule("x", 1, 1.0)
+    assert await backend.take("x:k", rule) == 0
+    assert await backend.take("x:k", rule) > 0
+    # Восполнение идет по часам БД: корзина "простояла" две секунды
+    bucket = await models.RateLimitBucket.get(key="x:k")
+    await models.RateLimitBucket.filter(key="x:k").update(updated_at=bucket.updated_at - 2)
+    assert await backend.take("x:k", rule) == 0
+
+
+async def test_database_backend_prune(db, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RULES", {"x": ratelimit.Rule("x", 10, 1.0)})
+    now = [0.0]
+    backend = ratelimit.DatabaseBackend(prune_interval=60, clock=lambda: now[0])
+    rule = ratelimit.RULES["x"]
+    await backend.take("x:idle", rule)
+    await backend.take("x:active", rule)
+    bucket = await models.RateLimitBucket.get(key="x:idle")
+    # Дольше полного восполнения (burst / rate = 10 с) - корзина полна, ее строка не нужна
+    await models.RateLimitBucket.filter(key="x:idle").update(updated_at=bucket.updated_at - 11)
+    assert backend._prune_task is None
+
+    now[0] = 60
+    await backend.take("x:active", rule)
+    await backend._prune_task
+    assert await models.RateLimitBucket.all().values_list("key", flat=True) == ["x:active"]
+
+
+async def test_login_limited_by_ip(backend, rate_limits, seeded, client_for, monkeypatch):
+    monkeypatch.setitem(ratelimit.RULES, "login", ratelimit.Rule("login", 2, 0.01))
+    assert isinstance(rate_limits, ratelimit.MemoryBackend if backend == "memory" else ratelimit.DatabaseBackend)
+    client = await client_for()
+    codes = []
+    for _ in range(3):
+        response = await client.post("/auth/login", data={"username": "owner", "password": TEST_PASSWORD})
+        codes.append(response.status_code)
+    assert codes == [200, 200, 429]
+    assert int(response.headers["retry-after"]) == 100
+
+
+async def test_task_create_limited_by_user(backend, rate_limits, seeded, client_for, monkeypatch):
+    monkeypatch.setitem(ratelimit.RULES, "task_create", ratelimit.Rule("task_create", 1, 0.001))
+    owner = await client_for(seeded["owner"])
+    admin = await client_for(seeded["admin"])
+    body = {"title": "Задача", "project_id": seeded["project"].id}
+    assert (await owner.post("/tasks/", json=body)).status_code == 201
+    response = await owner.post("/tasks/", json=body)
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    assert (await admin.post("/tasks/", json=body)).status_code == 201
+
+
+async def test_disabled_in_tests(seeded, client_for):
+    client = await client_for()
+    for _ in range(30):
+        response = await client.post("/auth/login", data={"username": "owner", "password": "wrong"})
+        assert response.status_code == 401
@@ -0,0 +1,56 @@
+import pytest
+import refdata
+from query_tracking import track_queries
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("kind, body, update", [
+    ("priorities", {"name": "Низкий", "level": 1}, {"name": "Самый низкий"}),
+    ("statuses", {"name": "Готово", "order_num": 9, "is_final": True}, {"name": "Закрыта"}),
+])
+async def test_reference_data(seeded, client_for, kind, body, update):
+    admin = await client_for(seeded["admin"])
+    owner = await client_for(seeded["owner"])
+    key = "priority_id" if kind == "priorities" else "status_id"
+
+    response = await request_route(admin, f"POST /{kind}/", f"/{kind}/", json=body)
+    assert response.status_code == 201, response.text
+    item_id = response.json()["id"]
+    assert (await request_route(owner, f"POST /{kind}/", f"/{kind}/", json=body)).status_code == 403
+
+    response = await request_route(owner, f"GET /{kind}/", f"/{kind}/")
+    assert response.status_code == 200
+    assert item_id in {item["id"] for item in response.json()}
+    etag = response.headers["etag"]
+    for header in (etag, etag[2:], f'"other", {etag}', "*"):
+        response = await request_route(owner, f"GET /{kind}/", f"/{kind}/", headers={"If-None-Match": header})
+        assert response.status_code == 304
+
+    response = await request_route(owner, f"GET /{kind}/{{{key}}}", f"/{kind}/{item_id}")
+    assert response.status_code == 200
+    response = await request_route(admin, f"PUT /{kind}/{{{key}}}", f"/{kind}/{item_id}", json=update)
+    assert response.status_code == 200
+    assert response.json()["name"] == update["name"]
+    response = await request_route(admin, f"DELETE /{kind}/{{{key}}}", f"/{kind}/{item_id}")
+    assert response.status_code == 204
+    assert (await owner.get(f"/{kind}/{item_id}")).status_code == 404
+
+
+@pytest.mark.parametrize("kind", ["priorities", "statuses"])
+async def test_missing_id_cached(db, kind):
+    reference = getattr(refdata, kind)
+    await reference.load()
+    with track_queries() as tracker:
+        assert await reference.get(99999) is None
+    # Один раз перечитывается (запись могла появиться в другом воркере), дальше - без запросов
+    assert tracker.count == 1
+    with track_queries() as tracker:
+        assert await reference.get(99999) is None
+        assert await reference.get(99999) is None
+    assert tracker.count == 0
+    reference.invalidate()
+    with track_queries() as tracker:
+        assert await reference.get(99999) is None
+    assert tracker.count == 1
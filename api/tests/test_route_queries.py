@@ -0,0 +1,34 @@
+"""Регрессия числа SQL-запросов маршрутов комментариев и вложений (бюджеты - query_tracking.ROUTE_BUDGETS)"""
+import pytest
+import auth
+import query_tracking
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_comment_and_attachment_routes_within_budget(seeded, client_for):
+    # Исполнитель задачи - не администратор: доступ проверяется запросом к БД
+    client = await client_for(seeded["assignee"])
+    task_id = seeded["task"].id
+    comment_id = (await client.post("/comments/", json={"task_id": task_id, "content": "x"})).json()["id"]
+    attachment_id = (await client.post("/attachments/", json={"task_id": task_id, "filename": "a.txt",
+                                                              "filepath": "/a.txt"})).json()["id"]
+    checks = [
+        ("POST /comments/", "/comments/", {"json": {"task_id": task_id, "content": "y"}}, 201),
+        ("GET /comments/task/{task_id}", f"/comments/task/{task_id}", {}, 200),
+        ("GET /comments/{comment_id}", f"/comments/{comment_id}", {}, 200),
+        ("PUT /comments/{comment_id}", f"/comments/{comment_id}", {"json": {"content": "z"}}, 200),
+        ("DELETE /comments/{comment_id}", f"/comments/{comment_id}", {}, 204),
+        ("POST /attachments/", "/attachments/",
+         {"json": {"task_id": task_id, "filename": "b.txt", "filepath": "/b.txt"}}, 201),
+        ("GET /attachments/task/{task_id}", f"/attachments/task/{task_id}", {}, 200),
+        ("GET /attachments/{attachment_id}", f"/attachments/{attachment_id}", {}, 200),
+        ("DELETE /attachments/{attachment_id}", f"/attachments/{attachment_id}", {}, 204),
+    ]
+    for route, url, kwargs, expected in checks:
+        assert route in query_tracking.ROUTE_BUDGETS, route
+        # Холодный кэш пользователей - худший случай, под который рассчитан бюджет
+        auth.user_cache.clear()
+        response = await request_route(client, route, url, **kwargs)
+        assert response.status_code == expected, (route, response.text)
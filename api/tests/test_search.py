@@ -0,0 +1,43 @@
+import pytest
+import models
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_respects_access(seeded, client_for):
+    owner, outsider, task = seeded["owner"], seeded["outsider"], seeded["task"]
+    task.title = "Починить сборку релиза"
+    task.description = "Сборка падает на этапе тестов"
+    await task.save()
+    await models.Comment.create(task=task, user=owner, content="Сборка снова зеленая")
+    other = await models.Project.create(name="Чужой", created_by=outsider)
+    await models.Task.create(title="Сборка чужая", project=other, created_by=outsider)
+
+    client = await client_for(owner)
+    response = await request_route(client, "GET /search", "/search", params={"q": "сборка"})
+    assert response.status_code == 200
+    hits = response.json()
+    assert {hit["type"] for hit in hits} == {"task", "comment"}
+    assert all(hit["task_id"] == task.id for hit in hits)
+
+    response = await request_route(client, "GET /search", "/search", params={"q": "сборка релиза"})
+    assert len(response.json()) == 1
+    assert (await request_route(client, "GET /search", "/search", params={"q": ""})).status_code == 422
+
+    response = await request_route(await client_for(outsider), "GET /search", "/search", params={"q": "сборка"})
+    assert len(response.json()) == 1 and response.json()[0]["task_id"] != task.id
+
+
+async def test_snippet_escapes_html(seeded, client_for):
+    task = seeded["task"]
+    task.title = "Сборка <script>alert(1)</script>"
+    task.description = 'Шаблон "сборка" & <b>разметка</b>'
+    await task.save()
+
+    client = await client_for(seeded["owner"])
+    response = await request_route(client, "GET /search", "/search", params={"q": "сборка"})
+    snippet = response.json()[0]["snippet"]
+    assert "<script>" not in snippet and "<b>разметка</b>" not in snippet
+    assert "&lt;script&gt;" in snippet and "&amp;" in snippet
+    assert "<b>Сборка</b>" in snippet
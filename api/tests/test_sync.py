@@ -0,0 +1,88 @@
+import pytest
+import config
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def settled(monkeypatch):
+    # Записи журнала сразу считаются зафиксированными: токен продвигается без ожидания
+    monkeypatch.setattr(config, "SYNC_SETTLE_SECONDS", -1)
+
+
+async def sync(client, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    response = await request_route(client, "GET /sync", "/sync", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def tombstones(result) -> set:
+    return {(item["entity"], item["id"]) for item in result["deleted"]}
+
+
+async def test_changes_and_tombstones(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    assignee = await client_for(seeded["assignee"])
+    outsider = await client_for(seeded["outsider"])
+    project_id, task_id = seeded["project"].id, seeded["task"].id
+    start = (await sync(owner))["next_token"]
+    assignee_start = (await sync(assignee))["next_token"]
+
+    created = (await owner.post("/tasks/", json={"title": "Новая", "project_id": project_id,
+                                                 "assignee_ids": [seeded["assignee"].id]})).json()["id"]
+    comment_id = (await owner.post("/comments/", json={"task_id": created, "content": "Привет"})).json()["id"]
+    await owner.put(f"/tasks/{task_id}", json={"title": "Переименована"})
+
+    result = await sync(owner, start)
+    assert {task["id"] for task in result["tasks"]} == {created, task_id}
+    assert [comment["id"] for comment in result["comments"]] == [comment_id]
+    assert not result["deleted"]
+    assert (await sync(outsider, start))["tasks"] == []
+    token = result["next_token"]
+    assert (await sync(owner, token))["tasks"] == []
+    assert (await sync(owner, start, limit=2))["has_more"]
+
+    # Снятый исполнитель получает надгробие, как и для удаленной задачи
+    await owner.put(f"/tasks/{task_id}", json={"assignee_ids": []})
+    await owner.delete(f"/comments/{comment_id}")
+    await owner.delete(f"/tasks/{created}")
+    assert tombstones(await sync(assignee, assignee_start)) == {("task", created), ("task", task_id)}
+    # Комментарии удаленной задачи клиент удаляет вместе с ней
+    assert tombstones(await sync(owner, token)) == {("task", created)}
+
+    token = (await sync(owner))["next_token"]
+    assert (await owner.delete(f"/projects/{project_id}")).status_code == 204
+    assert tombstones(await sync(owner, token)) == {("project", project_id), ("task", task_id)}
+
+
+async def test_invalid_token(seeded, client_for):
+    client = await client_for(seeded["owner"])
+    assert (await client.get("/sync", params={"since": "garbage"})).status_code == 400
+
+
+async def test_reference_deletes_logged(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    admin = await client_for(seeded["admin"])
+    task_id = seeded["task"].id
+    assignee = await client_for(seeded["assignee"])
+    comment_id = (await assignee.post("/comments/", json={"task_id": task_id,
+                                                          "content": "От исполнителя"})).json()["id"]
+
+    token = (await sync(owner))["next_token"]
+    assert (await admin.delete(f"/priorities/{seeded['priority'].id}")).status_code == 204
+    result = await sync(owner, token)
+    assert [(task["id"], task["priority_id"]) for task in result["tasks"]] == [(task_id, None)]
+
+    token = result["next_token"]
+    assert (await admin.delete(f"/statuses/{seeded['status'].id}")).status_code == 204
+    assert [task["status_id"] for task in (await sync(owner, token))["tasks"]] == [None]
+
+    # Удаление исполнителя: каскадно снято назначение, у его комментария обнулен автор
+    token = (await sync(owner))["next_token"]
+    assert (await admin.delete(f"/users/{seeded['assignee'].id}")).status_code == 204
+    result = await sync(owner, token)
+    assert [(task["id"], task["assignee_ids"]) for task in result["tasks"]] == [(task_id, [])]
+    assert [(comment["id"], comment["user_id"]) for comment in result["comments"]] == [(comment_id, None)]
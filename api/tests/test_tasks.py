@@ -0,0 +1,152 @@
+import asyncio
+import pytest
+import models
+from testing import request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_task_crud(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    assignee = await client_for(seeded["assignee"])
+    outsider = await client_for(seeded["outsider"])
+    project_id = seeded["project"].id
+
+    response = await request_route(owner, "POST /tasks/", "/tasks/",
+                                   json={"title": "Новая", "project_id": project_id,
+                                         "priority_id": seeded["priority"].id,
+                                         "assignee_ids": [seeded["assignee"].id]})
+    assert response.status_code == 201, response.text
+    task_id = response.json()["id"]
+    response = await request_route(owner, "POST /tasks/", "/tasks/", json={"title": "x", "project_id": 99999})
+    assert response.status_code == 404
+
+    response = await request_route(assignee, "GET /tasks/", "/tasks/")
+    assert response.status_code == 200
+    assert {task["id"] for task in response.json()} == {seeded["task"].id, task_id}
+    assert (await request_route(outsider, "GET /tasks/", "/tasks/")).json() == []
+
+    response = await request_route(assignee, "GET /tasks/{task_id}", f"/tasks/{task_id}")
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["assignees"]] == [seeded["assignee"].id]
+    assert (await request_route(outsider, "GET /tasks/{task_id}", f"/tasks/{task_id}")).status_code == 404
+
+    response = await request_route(owner, "PUT /tasks/{task_id}", f"/tasks/{task_id}",
+                                   json={"title": "Изменена", "status_id": 99999})
+    assert response.status_code == 404
+    response = await request_route(owner, "PUT /tasks/{task_id}", f"/tasks/{task_id}",
+                                   json={"title": "Изменена", "assignee_ids": [seeded["outsider"].id]})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Изменена"
+    assert (await request_route(assignee, "GET /tasks/{task_id}", f"/tasks/{task_id}")).status_code == 404
+
+    await models.Comment.create(task_id=task_id, user=seeded["owner"], content="К удалению")
+    response = await request_route(owner, "DELETE /tasks/{task_id}", f"/tasks/{task_id}")
+    assert response.status_code == 204
+    assert not await models.Task.exists(id=task_id)
+    assert not await models.Comment.exists(task_id=task_id)
+
+
+async def test_if_match(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    task_id = seeded["task"].id
+    etag = (await owner.get(f"/tasks/{task_id}")).headers["etag"]
+    response = await request_route(owner, "GET /tasks/{task_id}", f"/tasks/{task_id}",
+                                   headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await request_route(owner, "PUT /tasks/{task_id}", f"/tasks/{task_id}",
+                                   json={"title": "a"}, headers={"If-Match": '"stale"'})
+    assert response.status_code == 412
+    # Один ETag - одна запись: остальные параллельные запросы получают 412
+    responses = await asyncio.gather(*(owner.put(f"/tasks/{task_id}", json={"title": f"t{index}"},
+                                                 headers={"If-Match": etag}) for index in range(5)))
+    assert sorted(response.status_code for response in responses) == [200] + [412] * 4
+
+
+async def test_patch_assignees_diff(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    task_id = seeded["task"].id
+    assignee_id, outsider_id = seeded["assignee"].id, seeded["outsider"].id
+    etag = (await owner.get(f"/tasks/{task_id}")).headers["etag"]
+
+    response = await request_route(owner, "PATCH /tasks/{task_id}/assignees", f"/tasks/{task_id}/assignees",
+                                   json={"add": [outsider_id, 99999], "remove": [assignee_id]})
+    assert response.status_code == 200, response.text
+    assert response.json()["assignee_ids"] == [outsider_id]
+    assert response.headers["etag"] != etag
+
+    response = await request_route(owner, "PATCH /tasks/{task_id}/assignees", f"/tasks/{task_id}/assignees",
+                                   json={"add": [outsider_id]})
+    assert response.json()["assignee_ids"] == [outsider_id]
+    response = await owner.patch(f"/tasks/{task_id}/assignees", json={"add": [outsider_id], "remove": [outsider_id]})
+    assert response.status_code == 400
+    assignee = await client_for(seeded["assignee"])
+    response = await assignee.patch(f"/tasks/{task_id}/assignees", json={"add": [assignee_id]})
+    assert response.status_code == 404
+
+
+async def test_bulk(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    project_id = seeded["project"].id
+    response = await request_route(owner, "POST /tasks/bulk", "/tasks/bulk", json={"items": [
+        {"title": "Первая", "project_id": project_id, "assignee_ids": [seeded["assignee"].id]},
+        {"title": "Вторая", "project_id": project_id},
+        {"title": "Чужая", "project_id": 99999},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [201, 201, 404]
+
+    response = await request_route(owner, "PATCH /tasks/bulk", "/tasks/bulk", json={"items": [
+        {"id": results[0]["id"], "title": "Переименована", "assignee_ids": []},
+        {"id": results[1]["id"], "status_id": seeded["status"].id},
+        {"id": 99999, "title": "Нет такой"},
+    ]})
+    assert response.status_code == 200
+    assert [result["status_code"] for result in response.json()["results"]] == [200, 200, 404]
+    task = await models.Task.get(id=results[0]["id"]).prefetch_related("assignees")
+    assert task.title == "Переименована" and list(task.assignees) == []
+
+    # null в обязательном поле отклоняется только для своего элемента, остальные записываются
+    response = await request_route(owner, "PATCH /tasks/bulk", "/tasks/bulk", json={"items": [
+        {"id": results[0]["id"], "project_id": None},
+        {"id": results[1]["id"], "title": None},
+        {"id": results[1]["id"], "title": "Записана"},
+    ]})
+    assert response.status_code == 200
+    assert [result["status_code"] for result in response.json()["results"]] == [422, 422, 200]
+    assert (await models.Task.get(id=results[1]["id"])).title == "Записана"
+    response = await request_route(owner, "PUT /tasks/{task_id}", f"/tasks/{results[0]['id']}",
+                                   json={"project_id": None})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("url", ["/tasks/", "/projects/", "/users/"])
+async def test_list_limit_bounds(seeded, client_for, url):
+    admin = await client_for(seeded["admin"])
+    for limit in (0, -1, 1001):
+        response = await admin.get(url, params={"cursor": "", "limit": limit})
+        assert response.status_code == 422
+    assert (await admin.get(url, params={"skip": -1})).status_code == 422
+    response = await admin.get(url, params={"cursor": "", "limit": 1})
+    assert response.status_code == 200 and len(response.json()["items"]) == 1
+
+
+async def test_list_etag(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    response = await request_route(owner, "GET /tasks/", "/tasks/", params={"cursor": ""})
+    etag = response.headers["etag"]
+    response = await request_route(owner, "GET /tasks/", "/tasks/", params={"cursor": ""},
+                                   headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+    # Курсор проверяется до сравнения ETag
+    response = await owner.get("/tasks/", params={"cursor": "мусор"}, headers={"If-None-Match": "*"})
+    assert response.status_code == 400
+
+    task = seeded["task"]
+    response = await request_route(owner, "PUT /tasks/{task_id}", f"/tasks/{task.id}", json={"title": "Другое"})
+    assert response.status_code == 200
+    response = await request_route(owner, "GET /tasks/", "/tasks/", params={"cursor": ""},
+                                   headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
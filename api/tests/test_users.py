@@ -0,0 +1,41 @@
+import pytest
+from testing import TEST_PASSWORD, request_route
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_admin_manages_users(seeded, client_for):
+    admin = await client_for(seeded["admin"])
+    response = await request_route(admin, "GET /users/", "/users/")
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+
+    response = await request_route(admin, "GET /users/", "/users/", params={"cursor": "", "limit": 3})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3 and response.json()["next_cursor"]
+
+    response = await request_route(admin, "POST /users/", "/users/",
+                                   json={"username": "fifth", "email": "fifth@example.com",
+                                         "password": TEST_PASSWORD})
+    assert response.status_code == 201, response.text
+    user_id = response.json()["id"]
+
+    response = await request_route(admin, "PUT /users/{user_id}", f"/users/{user_id}",
+                                   json={"full_name": "Пятый"})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Пятый"
+
+    response = await request_route(admin, "GET /users/{user_id}", f"/users/{user_id}")
+    assert response.status_code == 200
+
+    response = await request_route(admin, "DELETE /users/{user_id}", f"/users/{user_id}")
+    assert response.status_code == 204
+    assert (await admin.get(f"/users/{user_id}")).status_code == 404
+
+
+async def test_regular_user_cannot_list_or_edit_others(seeded, client_for):
+    owner = await client_for(seeded["owner"])
+    assert (await request_route(owner, "GET /users/", "/users/")).status_code == 403
+    response = await request_route(owner, "PUT /users/{user_id}", f"/users/{seeded['outsider'].id}",
+                                   json={"full_name": "X"})
+    assert response.status_code == 403
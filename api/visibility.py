@@ -0,0 +1,169 @@
+"""Выборка задач с проверкой доступа на стороне SQL (правила те же, что в crud.get_task)"""
+from typing import List, Optional
+import refdata
+from database import get_connection, SQLParams
+
+TASK_COLUMNS = ("id", "title", "description", "project_id", "priority_id", "status_id",
+                "created_by_id", "due_date", "created_at", "updated_at")
+PROJECT_COLUMNS = ("id", "name", "description", "created_by_id", "created_at", "updated_at")
+USER_COLUMNS = ("id", "username", "email", "full_name", "role", "is_active", "created_at")
+
+
+def visibility_predicate(params: SQLParams, user_id: Optional[int], user_role: Optional[str],
+                         task_alias: str = "t", project_alias: str = "p") -> str:
+    """SQL-условие видимости задачи (проект должен быть присоединен под project_alias)"""
+    if user_role == "admin" or not user_id:
+        return "1 = 1"
+    return (
+        f"({project_alias}.created_by_id = {params.add(user_id)}"
+        f" OR {task_alias}.created_by_id = {params.add(user_id)}"
+        f" OR EXISTS (SELECT 1 FROM task_assignee ta"
+        f" WHERE ta.task_id = {task_alias}.id AND ta.user_id = {params.add(user_id)}))"
+    )
+
+
+def _select_list() -> str:
+    columns = [f"t.{column}" for column in TASK_COLUMNS]
+    columns.extend(f"p.{column} AS project__{column}" for column in PROJECT_COLUMNS)
+    return ", ".join(columns)
+
+
+def _project(row: dict) -> dict:
+    return {column: row[f"project__{column}"] for column in PROJECT_COLUMNS}
+
+
+async def task_visible(task_id: int, user_id: Optional[int], user_role: Optional[str]) -> bool:
+    """Видна ли задача пользователю (один EXISTS-запрос по индексам)"""
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    sql = (
+        f"SELECT EXISTS (SELECT 1 FROM task t JOIN project p ON p.id = t.project_id "
+        f"WHERE t.id = {params.add(task_id)} AND {visibility_predicate(params, user_id, user_role)}) AS visible"
+    )
+    rows = await connection.execute_query_dict(sql, params.values)
+    return bool(rows[0]["visible"])
+
+
+async def task_version(task_id: int, user_id: Optional[int], user_role: Optional[str]) -> Optional[dict]:
+    """updated_at задачи, если она видна пользователю (для ETag без загрузки задачи)"""
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    sql = (
+        f"SELECT t.updated_at AS updated_at FROM task t JOIN project p ON p.id = t.project_id "
+        f"WHERE t.id = {params.add(task_id)} AND {visibility_predicate(params, user_id, user_role)}"
+    )
+    rows = await connection.execute_query_dict(sql, params.values)
+    return rows[0] if rows else None
+
+
+async def visible_task_ids(task_ids, user_id: Optional[int], user_role: Optional[str]) -> set:
+    """Подмножество task_ids, видимое пользователю (один запрос)"""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return set()
+
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    sql = (
+        f"SELECT t.id AS id FROM task t JOIN project p ON p.id = t.project_id "
+        f"WHERE t.id IN ({params.add_many(task_ids)}) "
+        f"AND {visibility_predicate(params, user_id, user_role)}"
+    )
+    return {row["id"] for row in await connection.execute_query_dict(sql, params.values)}
+
+
+async def fetch_assignees(task_ids: List[int]) -> dict:
+    """Исполнители для набора задач одним запросом: {task_id: [user, ...]}"""
+    assignees = {task_id: [] for task_id in task_ids}
+    if not task_ids:
+        return assignees
+
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+    user_columns = ", ".join(f"u.{column}" for column in USER_COLUMNS)
+    sql = (
+        f'SELECT ta.task_id AS task_id, {user_columns} FROM task_assignee ta '
+        f'JOIN "user" u ON u.id = ta.user_id '
+        f'WHERE ta.task_id IN ({params.add_many(task_ids)}) ORDER BY ta.task_id, u.id'
+    )
+    for row in await connection.execute_query_dict(sql, params.values):
+        assignees[row["task_id"]].append({column: row[column] for column in USER_COLUMNS})
+    return assignees
+
+
+async def iter_project_tasks(project_id: int, user_id: Optional[int], user_role: Optional[str],
+                             batch_size: int = 1000):
+    """Потоковый обход видимых задач проекта пачками по ID (память не зависит от числа задач)"""
+    connection = get_connection()
+    last_id = 0
+    while True:
+        params = SQLParams(connection.capabilities.dialect)
+        columns = ", ".join(f"t.{column}" for column in TASK_COLUMNS)
+        sql = (
+            f"SELECT {columns} FROM task t JOIN project p ON p.id = t.project_id "
+            f"WHERE t.project_id = {params.add(project_id)} AND t.id > {params.add(last_id)} "
+            f"AND {visibility_predicate(params, user_id, user_role)} "
+            f"ORDER BY t.id LIMIT {params.add(batch_size)}"
+        )
+        rows = await connection.execute_query_dict(sql, params.values)
+        if not rows:
+            return
+
+        assignees = await fetch_assignees([row["id"] for row in rows])
+        for row in rows:
+            task = {column: row[column] for column in TASK_COLUMNS}
+            task["assignee_ids"] = [user["id"] for user in assignees[row["id"]]]
+            yield task
+
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def _task_filters(params: SQLParams, project_id: Optional[int], status_id: Optional[int],
+                  priority_id: Optional[int], user_id: Optional[int], user_role: Optional[str]) -> List[str]:
+    conditions = [visibility_predicate(params, user_id, user_role)]
+    if project_id:
+        conditions.append(f"t.project_id = {params.add(project_id)}")
+    if status_id:
+        conditions.append(f"t.status_id = {params.add(status_id)}")
+    if priority_id:
+        conditions.append(f"t.priority_id = {params.add(priority_id)}")
+    return conditions
+
+
+async def fetch_task_page(skip: int = 0, limit: int = 100, project_id: Optional[int] = None,
+                          status_id: Optional[int] = None, priority_id: Optional[int] = None,
+                          user_id: Optional[int] = None, user_role: Optional[str] = None,
+                          after_id: Optional[int] = None) -> List[dict]:
+    """Страница видимых пользователю задач в форме TaskWithDetails (не более двух запросов)"""
+    # Приоритет и статус берутся из кэша справочников, в SQL присоединяется только проект
+    connection = get_connection()
+    params = SQLParams(connection.capabilities.dialect)
+
+    conditions = _task_filters(params, project_id, status_id, priority_id, user_id, user_role)
+    # Курсорный режим: продолжаем после последнего ID вместо OFFSET
+    if after_id is not None:
+        conditions.append(f"t.id > {params.add(after_id)}")
+        skip = 0
+
+    sql = (
+        f"SELECT {_select_list()} FROM task t "
+        f"JOIN project p ON p.id = t.project_id "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY t.id LIMIT {params.add(limit)} OFFSET {params.add(skip)}"
+    )
+    rows = await connection.execute_query_dict(sql, params.values)
+
+    tasks = []
+    for row in rows:
+        task = {column: row[column] for column in TASK_COLUMNS}
+        task["priority"] = await refdata.priorities.get(task["priority_id"])
+        task["status"] = await refdata.statuses.get(task["status_id"])
+        task["project"] = _project(row)
+        tasks.append(task)
+
+    assignees = await fetch_assignees([task["id"] for task in tasks])
+    for task in tasks:
+        task["assignees"] = assignees[task["id"]]
+    return tasks
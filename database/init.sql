@@ -1,3 +1,7 @@
+DROP TABLE IF EXISTS rate_limit_bucket CASCADE;
+DROP TABLE IF EXISTS app_state CASCADE;
+DROP TABLE IF EXISTS change_log CASCADE;
+DROP TABLE IF EXISTS project_counter CASCADE;
 DROP TABLE IF EXISTS attachment CASCADE;
 DROP TABLE IF EXISTS comment CASCADE;
 DROP TABLE IF EXISTS task_assignee CASCADE;
@@ -55,6 +59,10 @@ CREATE TABLE task (
     due_date TIMESTAMPTZ,
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED,
     CONSTRAINT fk_task_project FOREIGN KEY (project_id)
         REFERENCES project(id) ON DELETE CASCADE,
     CONSTRAINT fk_task_priority FOREIGN KEY (priority_id)
@@ -83,12 +91,51 @@ CREATE TABLE comment (
     content TEXT NOT NULL,
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', coalesce(content, ''))) STORED,
     CONSTRAINT fk_comment_task FOREIGN KEY (task_id)
         REFERENCES task(id) ON DELETE CASCADE,
     CONSTRAINT fk_comment_user FOREIGN KEY (user_id)
         REFERENCES "user"(id) ON DELETE SET NULL
 );
 
+-- Материализованные счетчики задач проекта (PROJECT_STATS_MATERIALIZED), ref_id = 0 - без значения
+CREATE TABLE project_counter (
+    id SERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    dimension VARCHAR(20) NOT NULL,
+    ref_id INTEGER NOT NULL DEFAULT 0,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT fk_project_counter_project FOREIGN KEY (project_id)
+        REFERENCES project(id) ON DELETE CASCADE,
+    CONSTRAINT uq_project_counter UNIQUE (project_id, dimension, ref_id)
+);
+
+-- Журнал изменений для /sync: без внешних ключей, записи переживают удаление объектов
+CREATE TABLE change_log (
+    id BIGSERIAL PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    op VARCHAR(10) NOT NULL,
+    project_id INTEGER,
+    task_id INTEGER,
+    audience TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Служебные отметки приложения: seed - начальные данные загружены (entrypoint.sh пропускает init-скрипты)
+CREATE TABLE app_state (
+    key VARCHAR(50) PRIMARY KEY,
+    value TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Корзины ограничения частоты (RATE_LIMIT_BACKEND=database): UNLOGGED - без WAL, после сбоя не нужны
+CREATE UNLOGGED TABLE rate_limit_bucket (
+    key VARCHAR(200) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at DOUBLE PRECISION NOT NULL
+);
+
 CREATE TABLE attachment (
     id SERIAL PRIMARY KEY,
     task_id INTEGER NOT NULL,
@@ -104,19 +151,34 @@ CREATE TABLE attachment (
         REFERENCES "user"(id) ON DELETE SET NULL
 );
 
-CREATE INDEX idx_task_project ON task(project_id);
+-- Составные индексы (фильтр, id) обслуживают и фильтр, и курсорную пагинацию по id
+CREATE INDEX idx_task_project ON task(project_id, id);
 CREATE INDEX idx_task_status ON task(status_id);
 CREATE INDEX idx_task_priority ON task(priority_id);
-CREATE INDEX idx_task_created_by ON task(created_by_id);
+CREATE INDEX idx_task_created_by ON task(created_by_id, id);
 CREATE INDEX idx_task_due_date ON task(due_date);
-CREATE INDEX idx_comment_task ON comment(task_id);
-CREATE INDEX idx_attachment_task ON attachment(task_id);
-CREATE INDEX idx_project_creator ON project(created_by_id);
+CREATE INDEX idx_comment_task ON comment(task_id, id);
+CREATE INDEX idx_attachment_task ON attachment(task_id, id);
+CREATE INDEX idx_project_creator ON project(created_by_id, id);
+-- Те же индексы, что в миграции aerich 1_add_lookup_indexes
+CREATE INDEX idx_task_assignee_user ON task_assignee(user_id, task_id);
+CREATE INDEX idx_task_project_status ON task(project_id, status_id, id);
+CREATE INDEX idx_task_project_created ON task(project_id, created_at);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_task_title_trgm ON task USING gin (title gin_trgm_ops);
+-- Полнотекстовый поиск (миграция 2_add_search_vectors)
+CREATE INDEX idx_task_search ON task USING gin (search_vector);
+CREATE INDEX idx_comment_search ON comment USING gin (search_vector);
+-- Сроки задач проекта для /projects/{id}/stats (миграция 3_add_project_counters)
+CREATE INDEX idx_task_project_due ON task(project_id, due_date);
 
+-- Время ставится, только если UPDATE не задал его сам: приложение знает updated_at без перечитывания (ETag)
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
-    NEW.updated_at = CURRENT_TIMESTAMP;
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;